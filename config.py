@@ -45,6 +45,71 @@ PRICE_SELECTORS = [
     ".c-jobListItem__price"
 ]
 
+DEADLINE_SELECTORS = [
+    ".c-media__deadline",
+    ".deadline",
+    ".c-jobListItem__deadline"
+]
+
+APPLICANT_SELECTORS = [
+    ".c-media__applicant",
+    ".applicant",
+    ".c-jobListItem__applicant"
+]
+
+# 案件リンクから closest で辿るカード（価格・締切・応募数はこの中で探す）
+CARD_SELECTORS = [
+    ".c-media",
+    ".c-jobListItem",
+    ".p-jobList__item",
+    "article",
+    "li"
+]
+
+MORE_BUTTON_SELECTORS = [
+    ".more-button",
+    ".load-more"
+]
+
+# 候補がどれも当たらないとき、クラス名にこの語を含む要素からセレクタを割り出す（selector_resolver.py）
+SELECTOR_CLASS_HINTS = {
+    "price": "price",
+    "deadline": "deadline",
+    "applicant": "applicant",
+    "more": "more"
+}
+
+# 案件詳細ページ（lancers_detail.py）。ページ全体ではなく、その案件自身の要素だけを読む
+# この中は読まない（関連案件・おすすめ・サイドバーなど）。他の案件へのリンクを含む CARD_SELECTORS の要素も読まない
+DETAIL_EXCLUDE_SELECTORS = [
+    "aside",
+    "nav",
+    "header",
+    "footer",
+    "[class*='related']",
+    "[class*='recommend']",
+    "[class*='sidebar']"
+]
+
+# 見出しと値の組（dt/dd・th/td・「〜__term」と次の要素）の見出し
+DETAIL_LABELS = {
+    "price": ["予算", "報酬", "金額"],
+    "deadline": ["募集期限", "締め切り", "締切", "期限"],
+    "applicant_count": ["提案数", "応募数", "提案"],
+    "recruitment_count": ["募集人数"],
+    "status": ["募集状況", "状況", "ステータス"]
+}
+
+# 見出しで見つからない項目の要素（候補の順に探す）
+DETAIL_FIELD_SELECTORS = {
+    "price": [".p-work-detail__budget", "[class*='budget']", "[class*='price']"],
+    "deadline": [".p-work-detail__deadline", "[class*='deadline']"],
+    "applicant_count": [".p-work-detail__proposal", "[class*='proposal']", "[class*='applicant']"],
+    "recruitment_count": [".p-work-detail__recruitment", "[class*='recruit']"],
+    "status": [".p-work-detail__status", "[class*='status']"],
+    "urgency": ["h1", "[class*='urgent']", "[class*='badge']"]
+}
+
 # ユーザーエージェント
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
@@ -13,53 +13,11 @@ TEAMS_WEBHOOK_URL = os.getenv("TEAMS_WEBHOOK_URL", "")
 NOTIFICATION_TITLE = "🚀 Lancers週次案件通知"
 NOTIFICATION_COLOR = "28A745"  # 緑色
 
-# 弊社スキルセット（優先度付き）
-COMPANY_SKILLS = {
-    "高優先度": [
-        "AI", "GPT", "Python", "API", "Django", 
-        "Next.js", "TypeScript", "Java", "機械学習"
-    ],
-    "中優先度": [
-        "Talend", "コンサル", "開発", "システム開発",
-        "React", "Node.js", "PostgreSQL", "MySQL"
-    ],
-    "低優先度": [
-        "Render", "ロリッポップ", "WordPress", "PHP"
-    ]
-}
-
-# 除外キーワード（求人・コンペ・デザイン系を除外）
-EXCLUDE_KEYWORDS = [
-    # 求人関連
-    "求人", "採用", "転職", "正社員", "アルバイト", "派遣",
-    
-    # コンペ関連
-    "コンペ", "コンペティション", "コンテスト", "募集",
-    
-    # デザイン関連（システム開発以外）
-    "ロゴ", "デザイン", "バナー", "チラシ", "名刺", 
-    "イラスト", "写真", "動画編集", "音声", "BGM",
-    
-    # その他除外
-    "テスト", "練習", "サンプル", "学習", "勉強"
-]
-
-# 必須条件
-REQUIRED_CONDITIONS = ["募集中", "応募受付中"]
+# スキルセット・除外キーワード・配点（急募加点など）は rules.json に集約（rule_pack.py で読み込み）
 
 # 価格フィルタ（最低金額）
 MIN_PRICE_FILTER = 30000  # 3万円以上
 
-# スキルマッチング設定
-SKILL_MATCH_WEIGHTS = {
-    "高優先度": 10,
-    "中優先度": 5,
-    "低優先度": 2
-}
-
-# 急募案件の追加ポイント
-URGENT_BONUS = 3
-
 # ファイル設定
 DATA_DIR = "data"
 JOBS_DATA_PREFIX = "jobs_data"
@@ -11,6 +11,9 @@ import traceback
 from datetime import datetime, timedelta
 from playwright.async_api import async_playwright
 
+from rule_pack import load_rules
+from selector_resolver import DEFAULT_SELECTORS, SelectorResolver, print_report
+
 # デバッグモード
 DEBUG = True
 
@@ -24,26 +27,14 @@ LANCERS_SEARCH_URL = "https://www.lancers.jp/work/search/system?budget_from=&bud
 MAX_JOBS_TO_FETCH = 20  # デバッグ用に少なくする
 HEADLESS_MODE = False  # デバッグ用にブラウザを表示
 
-# 弊社スキルセット（検索ワード優先版）
-COMPANY_SKILLS = {
-    "超高優先度": ["AI", "GPT", "ChatGPT", "Python", "API", "Django", "Next.js","React","TypeScript", "機械学習"],
-    "高優先度": ["bot", "Talend", "Java", "スマホアプリ", "モバイル開発", "人工知能"],
-    "中優先度": ["効率化", "ツール", "開発", "システム開発", "React", "Node.js", "自動化", "スクレイピング"],
-    "低優先度": ["PostgreSQL", "MySQL", "社内ツール", "業務改善", "アプリ", "サイト", "管理"],
-    "最低優先度": ["Render", "ロリッポップ", "WordPress", "PHP"]
-}
-
-# 除外キーワード
-EXCLUDE_KEYWORDS = [
-    "求人", "採用", "転職", "正社員", "アルバイト", "派遣",
-    "コンペ", "コンペティション", "コンテスト",
-    "募集終了", "終了", "締切", "CAD",
-]
+# 除外キーワード（本体と同じ rules.json を使う）
+EXCLUDE_KEYWORDS = load_rules().exclude_keywords
 
 class CompleteJobsNotifier:
     def __init__(self):
         self.jobs_data = []
         self.seen_links = set()
+        self.selectors = dict(DEFAULT_SELECTORS)
         debug_print("CompleteJobsNotifier初期化完了")
         
     async def test_basic_connection(self):
@@ -124,28 +115,23 @@ class CompleteJobsNotifier:
                 
                 await page.wait_for_timeout(5000)
                 
+                # セレクタ候補をすべて試し直し、当たり数を表示（結果はキャッシュにも保存）
+                debug_print("セレクタ候補を判定中...")
+                resolved = await SelectorResolver().resolve(page, force=True)
+                self.selectors = resolved.selectors
+                if resolved.report:
+                    print_report(resolved.report)
+                
                 # スクロールして読み込み
                 debug_print("ページをスクロール中...")
                 await self.scroll_and_load_more(page)
                 
                 # 案件リンクを取得
-                job_elements = await page.query_selector_all("a[href*='/work/detail/']")
-                debug_print(f"📊 {len(job_elements)} 個の案件候補を発見")
+                job_elements = await page.query_selector_all(self.selectors["job"])
+                debug_print(f"📊 {len(job_elements)} 個の案件候補を発見（{self.selectors['job']}）")
                 
                 if len(job_elements) == 0:
-                    debug_print("❌ 案件が見つかりませんでした。ページ構造を確認します...")
-                    
-                    # 代替セレクタを試す
-                    alternative_selectors = [
-                        "a[href*='work']",
-                        ".job-item a",
-                        ".work-item a",
-                        "a[href*='detail']"
-                    ]
-                    
-                    for selector in alternative_selectors:
-                        alt_elements = await page.query_selector_all(selector)
-                        debug_print(f"代替セレクタ '{selector}': {len(alt_elements)}個")
+                    debug_print("❌ 案件が見つかりませんでした。上の判定結果を確認し、config.py のセレクタ候補を追加してください")
                 
                 all_jobs = []
                 
@@ -187,7 +173,7 @@ class CompleteJobsNotifier:
                 await page.wait_for_timeout(2000)
             
             # もっと見るボタンを探す
-            more_button = await page.query_selector(".more-button, .load-more, [class*='more']")
+            more_button = await page.query_selector(self.selectors["more"]) if self.selectors["more"] else None
             if more_button:
                 debug_print("「もっと見る」ボタンをクリック")
                 await more_button.click()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+「ランサーズ」シートから外れた行の月別アーカイブ
+
+作業用ブックには今の一覧だけを残し、シートから外れた行（一覧から消えた・期限切れ・再掲載・保持期間超過）は
+取得月ごとのアーカイブに移します。作業用ブックの大きさは履歴の量に関係なく一定のままです。
+
+- 外れた行はまず月ごとの JSON Lines（pending_YYYY-MM.jsonl）に追記するだけ（ブックは開かない）
+- 月が終わって猶予期間が過ぎたら、その月の行を1つの xlsx（案件情報_YYYY-MM.xlsx）に一度だけ書き出す
+  （write_only で作成し、以後読み込み・上書きはしない。同じURLは最後の行だけ残す）
+- 書き出し後に遅れて届いた行は 案件情報_YYYY-MM_2.xlsx のように別ファイルにする
+
+使い方:
+    python excel_archive.py                 # アーカイブの状況
+    python excel_archive.py --rotate        # 書き出し可能な月を xlsx にする
+"""
+
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import openpyxl
+
+ARCHIVE_GRACE = timedelta(days=7)  # 月末からこの期間が過ぎたら月の xlsx を書き出す
+SHEET_HEADER = ["取得日時", "タイトル", "カテゴリ", "価格", "締切", "URL", "優先度スコア", "スキル概要"]
+ROW_KEYS = ["date", "title", "category", "price", "deadline", "url", "score", "skills"]
+ARCHIVE_HEADER = SHEET_HEADER + ["アーカイブ理由", "アーカイブ日時"]
+
+_PENDING = re.compile(r"^pending_(\d{4}-\d{2})\.jsonl$")
+
+
+def default_archive_dir(excel_path: str) -> Path:
+    """作業用ブックと同じ場所の「<ブック名>_archive」"""
+    path = Path(excel_path)
+    return path.parent / f"{path.stem}_archive"
+
+
+def row_month(row: dict, fallback: datetime) -> str:
+    value = row.get("date")
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m")
+    m = re.match(r"(\d{4})-(\d{2})", str(value or ""))
+    return f"{m.group(1)}-{m.group(2)}" if m else fallback.strftime("%Y-%m")
+
+
+def _month_end(month: str) -> datetime:
+    year, mon = map(int, month.split("-"))
+    return datetime(year + mon // 12, mon % 12 + 1, 1)
+
+
+class ExcelArchive:
+    def __init__(self, excel_path: str, archive_dir: str = None):
+        self.stem = Path(excel_path).stem
+        self.dir = Path(archive_dir) if archive_dir else default_archive_dir(excel_path)
+
+    def add(self, rows, reason: str, now: datetime = None) -> int:
+        """行（ROW_KEYS の辞書）を取得月ごとの待機ファイルに追記する"""
+        now = now or datetime.now()
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row_month(row, now), []).append(row)
+        if not by_month:
+            return 0
+        self.dir.mkdir(parents=True, exist_ok=True)
+        stamp = now.strftime("%Y-%m-%d %H:%M:%S")
+        for month, items in by_month.items():
+            with open(self.dir / f"pending_{month}.jsonl", "a", encoding="utf-8") as f:
+                for row in items:
+                    record = {k: _plain(row.get(k)) for k in ROW_KEYS}
+                    record.update(reason=reason, archived_at=stamp)
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return sum(len(items) for items in by_month.values())
+
+    def _pending_paths(self) -> dict:
+        """待機中の月 → 待機ファイル"""
+        if not self.dir.exists():
+            return {}
+        return {m.group(1): path for path in sorted(self.dir.iterdir()) if (m := _PENDING.match(path.name))}
+
+    def pending_months(self) -> dict:
+        """待機中の月 → 行数"""
+        result = {}
+        for month, path in self._pending_paths().items():
+            with open(path, encoding="utf-8") as f:
+                result[month] = sum(1 for _ in f)
+        return result
+
+    def month_files(self) -> list:
+        return sorted(self.dir.glob(f"{self.stem}_*.xlsx")) if self.dir.exists() else []
+
+    def rotate(self, now: datetime = None) -> list:
+        """月末＋猶予を過ぎた月を xlsx に書き出し、書き出したファイルのリストを返す"""
+        now = now or datetime.now()
+        written = []
+        for month, pending in self._pending_paths().items():
+            if now < _month_end(month) + ARCHIVE_GRACE:
+                continue
+            written.append(self._write_month(month, _read_records(pending)))
+            pending.unlink()
+        return written
+
+    def _write_month(self, month: str, records: list) -> Path:
+        path = self.dir / f"{self.stem}_{month}.xlsx"
+        part = 2
+        while path.exists():
+            path = self.dir / f"{self.stem}_{month}_{part}.xlsx"
+            part += 1
+        # 同じURLは最後にアーカイブされた行だけ残し、取得日時の新しい順に並べる
+        latest = {}
+        for record in records:
+            latest[record.get("url") or id(record)] = record
+        rows = sorted(latest.values(), key=lambda r: str(r.get("date") or ""), reverse=True)
+
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet(month)
+        ws.append(ARCHIVE_HEADER)
+        for r in rows:
+            ws.append([r.get(k) for k in ROW_KEYS] + [r.get("reason"), r.get("archived_at")])
+        tmp = path.with_name(path.name + ".tmp")
+        wb.save(tmp)
+        os.replace(tmp, path)
+        print(f"🗄️ アーカイブを書き出し: {path}（{len(rows)}件）")
+        return path
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def _read_records(path: Path) -> list:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # 書き込み途中で止まった行
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="「ランサーズ」シートの月別アーカイブ")
+    parser.add_argument("--excel", default=os.getenv("EXCEL_PATH", "案件情報.xlsx"))
+    parser.add_argument("--rotate", action="store_true", help="書き出し可能な月を xlsx にする")
+    args = parser.parse_args()
+
+    archive = ExcelArchive(args.excel)
+    if args.rotate:
+        written = archive.rotate()
+        print(f"✅ 書き出し {len(written)}ファイル")
+    print(f"📁 {archive.dir}")
+    for month, count in archive.pending_months().items():
+        print(f"   待機中 {month}: {count}件")
+    for path in archive.month_files():
+        print(f"   {path.name}（{path.stat().st_size // 1024}KB）")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,32 @@ import aiohttp
 import json
 import re
 import os
+import time
 import openpyxl
+from collections import Counter
+from contextlib import contextmanager, suppress
 from pathlib import Path
 from typing import List
 from openpyxl.utils import get_column_letter
 from datetime import datetime, timedelta
-from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
+
+from job_model import Job, SkillMatch, jobs_from_dicts, jobs_to_dicts, parse_job_id
+from job_stats import RunStats, update_trends
+from snapshot_store import SnapshotStore, list_snapshot_paths, load_snapshot
+from near_duplicates import NearDuplicateIndex, collapse_reposts
+from lancers_rss import (DEFAULT_RSS_URL, FeedState, fetch_detail_fields, fetch_feed,
+                         is_local_source, parse_feed, parse_listing_text)
+from probe import DEFAULT_SEARCH_URL, PROBE_STATE_PATH, ProbeResult, probe_listing
+from profiles import ProfileSet, load_profiles, profile_view
+from scrape_journal import JOURNAL_PATH, ScrapeJournal
+from revisit_scheduler import OpenJobTracker, revisit
+from excel_archive import ExcelArchive
+from xlsx_stream import has_sheet, read_rows, upsert_rows
+from text_normalize import clean_price_text, clean_title, normalize
+from rule_pack import RULES_PATH, get_rules
+from selector_resolver import DEFAULT_SELECTORS, SELECTOR_CACHE_PATH, SelectorResolver, load_cache
+from run_shards import write_shard
 
 # =============================
 # 環境判定
@@ -21,10 +41,81 @@ IS_GITHUB_ACTIONS = os.getenv('GITHUB_ACTIONS') == 'true'
 # =============================
 # 設定値
 # =============================
-LANCERS_SEARCH_URL = "https://www.lancers.jp/work/search/system?budget_from=&budget_to=&work_rank%5B%5D=&work_rank%5B%5D=&work_rank%5B%5D=&keyword=&sort=work_post_date"
-MAX_JOBS_TO_FETCH = 100
+LANCERS_SEARCH_URL = os.getenv("LANCERS_SEARCH_URL", DEFAULT_SEARCH_URL)  # 負荷試験ではローカルの代替サーバーを指定
+MAX_JOBS_TO_FETCH = int(os.getenv("MAX_JOBS_TO_FETCH", "100"))
 HEADLESS_MODE = os.getenv("HEADLESS", "true").lower() != "false"  # 環境変数で上書き可
 
+# 記録/再生モード（HAR）
+#   LANCERS_HAR_MODE=record : 実サイトへの通信をHARに記録
+#   LANCERS_HAR_MODE=replay : 記録済みHARから応答を返す（ネットワーク不要）
+HAR_MODE = os.getenv("LANCERS_HAR_MODE", "").lower()
+HAR_PATH = os.getenv("LANCERS_HAR_PATH", "fixtures/lancers_search.har")
+REPLAY_WAIT_MS = 200  # 再生時の待機上限（ミリ秒）
+
+# 一覧の追加読み込み（scroll_and_load_more）。案件数が増えない回がこの回数続いたら打ち切る
+SCROLL_WAIT_MS = 3000
+SCROLL_STALL_LIMIT = 2
+BROWSER_SLOW_MO_MS = int(os.getenv("BROWSER_SLOW_MO_MS", "300"))  # 操作ごとの待機（負荷試験では 0）
+
+# スナップショット保存形式
+#   store : snapshots/ に重複排除・圧縮して保存（既定）
+#   json  : 従来どおり all_jobs_*.json をそのまま保存
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "store").lower()
+
+# 並び替えの基準
+#   score : calculate_comprehensive_score の手動重み（既定）
+#   tfidf : 過去案件で学習した TF-IDF 関連度（relevance_ranking.py・要 numpy）
+RANKING_ENGINE = os.getenv("RANKING_ENGINE", "score").lower()
+
+# 取得方式
+#   browser : 検索ページをブラウザで取得（既定）
+#   rss     : RSSを先に確認し、新着があるときだけ詳細取得（fetch_jobs_tiered）
+#   sharded : ページ・検索キーワードごとに複数プロセスで並列取得（sharded_crawl.py）
+FETCH_MODE = os.getenv("FETCH_MODE", "browser").lower()
+LANCERS_RSS_URL = os.getenv("LANCERS_RSS_URL", DEFAULT_RSS_URL)  # ローカルのXMLファイルも指定可
+LANCERS_DETAIL_DIR = os.getenv("LANCERS_DETAIL_DIR")  # 詳細ページを <案件ID>.html から読む（ローカルXMLでの検証用）
+RSS_STATE_PATH = os.getenv("RSS_STATE_PATH", "rss_state.json")
+DETAIL_CONCURRENCY = 4  # 詳細ページの同時取得数
+
+# 変更検知プローブ（probe.py）: 1ページ目の案件IDが前回と同じなら何もせず終了
+CHANGE_PROBE = os.getenv("CHANGE_PROBE", "false").lower() == "true"
+# 前のステップで実行した probe.py の結果（JSON）。指定があれば同じ確認を繰り返さずにそれを使う
+PROBE_RESULT = os.getenv("PROBE_RESULT", "")
+
+# 取得の途中経過（scrape_journal.py）。失敗・中断した実行は次回ここから再開
+SCRAPE_JOURNAL_PATH = os.getenv("SCRAPE_JOURNAL_PATH", JOURNAL_PATH)
+MAX_CARD_ERRORS = int(os.getenv("MAX_CARD_ERRORS", "10"))  # カード単位のエラー許容数
+CARD_TIMEOUT_SEC = 15  # カード1枚の抽出にかける上限（秒）
+SCRAPE_ATTEMPTS = int(os.getenv("SCRAPE_ATTEMPTS", "3"))  # ページ・ブラウザが落ちたとき、同じ実行の中で開き直す回数（初回を含む）
+
+# 募集中の案件の再確認（revisit_scheduler.py）。1回の実行で確認する詳細ページ数の上限
+OPEN_JOBS_PATH = os.getenv("OPEN_JOBS_PATH", "open_jobs.json")
+REVISIT_BUDGET = int(os.getenv("REVISIT_BUDGET", "20"))
+
+# シートから外れた行の月別アーカイブ（excel_archive.py）。未指定ならブックと同じ場所の「<ブック名>_archive」
+EXCEL_ARCHIVE_DIR = os.getenv("EXCEL_ARCHIVE_DIR")
+EXCEL_RETENTION_DAYS = 30  # これより前に取得した行はアーカイブへ移す
+
+# 「ランサーズ」シートの書き込み方式
+#   openpyxl : ブック全体を読み込み、シートを作り直して保存（既定。列幅も自動調整）
+#   stream   : シートのXMLだけを流し読みし、変わった行だけを書き換える（xlsx_stream.py。行の並びと列幅はそのまま）
+EXCEL_WRITER = os.getenv("EXCEL_WRITER", "openpyxl").lower()
+
+# 追加の配信先プロファイル（profiles.py）。無ければ既定の1チームのみ
+PROFILES_PATH = os.getenv("PROFILES_PATH", "profiles.json")
+
+# 結果の書き出し方
+#   direct : スナップショット・Excel・追跡状態をその場で更新（既定）
+#   shard  : 実行ごとの結果シャード（run_shards/）を1ファイル書くだけ。反映は run_shards.py compact でまとめて行う
+OUTPUT_MODE = os.getenv("OUTPUT_MODE", "direct").lower()
+
+# Teams の送信先をファイルに切り替える（offline_replay.py などの再生用）。指定するとペイロードをJSONで書き出す
+TEAMS_OUTBOX = os.getenv("TEAMS_OUTBOX")
+
+# Webhook の送信制限（429）の再送。Retry-After の秒数だけ待つ（上限 TEAMS_MAX_RETRY_WAIT 秒）
+TEAMS_MAX_RETRIES = int(os.getenv("TEAMS_MAX_RETRIES", "3"))
+TEAMS_MAX_RETRY_WAIT = 30.0
+
 # =============================
 # 保存先（環境により切替）＋上書き対応
 # =============================
@@ -65,42 +156,28 @@ else:
 print(f"📄 EXCEL_PATH = {EXCEL_PATH}")
 
 # =============================
-# スキル設定 / 除外キーワード
+# スキル設定 / 除外キーワード（rules.json → rule_pack.py）
 # =============================
-COMPANY_SKILLS = {
-    "超高優先度": ["AI", "GPT", "ChatGPT", "Python", "API", "Django", "Next.js","React","TypeScript", "機械学習"],
-    "高優先度": ["bot", "Talend", "Java", "スマホアプリ", "モバイル開発", "人工知能"],
-    "中優先度": ["効率化", "ツール", "開発", "システム開発", "React", "Node.js", "自動化", "スクレイピング"],
-    "低優先度": ["PostgreSQL", "MySQL", "社内ツール", "業務改善", "アプリ", "サイト", "管理"],
-    "最低優先度": ["Render", "ロリッポップ", "WordPress", "PHP"]
-}
-
-EXCLUDE_KEYWORDS = [
-    "求人", "採用", "転職", "正社員", "アルバイト", "派遣",
-    "コンペ", "コンペティション", "コンテスト",
-    "募集終了", "終了", "締切", "CAD",
-    'デザイン', 'イラスト', 'ロゴ', '動画編集', '写真', '撮影', 'Photoshop',
-    'Illustrator', 'After Effects', 'Premiere', 'グラフィック', 'UI/UX',
-    'XD', 'Sketch', 'Canva', 'バナー', 'チラシ', 'ポスター',
-    '求人', '採用', 'リクルート', 'スカウト', '人材', 'コンペ', 'コンテスト',
-    '懸賞', '応募者多数', '選考', '審査', 'ライティング', '記事作成', 'ゲーム',
-    'ブログ記事', 'SEO記事', 'コピーライティング', 'シナリオ', '脚本',
-    '翻訳', '通訳', 'アンケート', 'モニター', 'レビュー',
-    'テレアポ', '営業', 'カスタマーサポート', 'サポート業務', '事務',
-    '経理', '秘書', 'アシスタント', '内職', '簡単作業', '軽作業'
-]
+# 判定は常に get_rules(RULES_PATH) の現在の内容で行う（ファイルを更新すれば常駐プロセスにも反映）。
+# 別のファイルを使う場合は環境変数 RULES_PATH で指定
+# 以下の名前は読み込み時点の値で、他モジュールからの参照用
+_RULES = get_rules(RULES_PATH)
+COMPANY_SKILLS = _RULES.company_skills
+ADDITIONAL_KEYWORDS = _RULES.additional_keywords   # タイトル表記ゆれ等で追加するスキル
+PRIORITY_KEYWORD_BONUS = _RULES.keyword_bonus      # タイトルに含まれると加点するキーワード（小文字）
+EXCLUDE_KEYWORDS = _RULES.exclude_keywords
 
 # =============================
 # Excel ヘルパ
 # =============================
-def _format_skill_matches_compact_for_excel(skill_matches: List[dict]) -> str:
+def _format_skill_matches_compact_for_excel(skill_matches: List[SkillMatch]) -> str:
     if not skill_matches:
         return ""
-    ultra = [m.get("skill") for m in skill_matches if m.get("priority") == "超高優先度"]
-    high  = [m.get("skill") for m in skill_matches if m.get("priority") == "高優先度"]
-    mid   = [m.get("skill") for m in skill_matches if m.get("priority") == "中優先度"]
-    low   = [m.get("skill") for m in skill_matches if m.get("priority") == "低優先度"]
-    lowst = [m.get("skill") for m in skill_matches if m.get("priority") == "最低優先度"]
+    ultra = [m.skill for m in skill_matches if m.priority == "超高優先度"]
+    high  = [m.skill for m in skill_matches if m.priority == "高優先度"]
+    mid   = [m.skill for m in skill_matches if m.priority == "中優先度"]
+    low   = [m.skill for m in skill_matches if m.priority == "低優先度"]
+    lowst = [m.skill for m in skill_matches if m.priority == "最低優先度"]
     parts = []
     if ultra: parts.append("🔥" + ",".join(ultra[:2]))
     if high:  parts.append("★" + ",".join(high[:2]))
@@ -138,178 +215,478 @@ def _ensure_book_and_sheets(path: Path):
             stat.append(["timestamp","count","type","skill_match_rate","no_skill_match","multi_skill_match","high_priority"])
     return wb
 
-def replace_lancers_sheet(data: dict, excel_path: str = EXCEL_PATH):
+def _sheet_rows(ws):
+    """「ランサーズ」シートの行（URLのあるもの）を辞書で返す"""
+    rows = []
+    for values in ws.iter_rows(min_row=2, max_col=8, values_only=True):
+        values = list(values) + [None] * (8 - len(values))
+        if values[5]:
+            rows.append({
+                'date': values[0],
+                'title': values[1],
+                'category': values[2],
+                'price': values[3],
+                'deadline': values[4],
+                'url': values[5],
+                'score': values[6],
+                'skills': values[7]
+            })
+    return rows
+
+def _job_row(job: Job, now_str: str) -> dict:
+    """「ランサーズ」シートの1行（excel_archive.ROW_KEYS の辞書）"""
+    return {
+        'date': now_str,
+        'title': job.title,
+        'category': job.category,
+        'price': job.price,
+        'deadline': job.deadline,
+        'url': job.link,
+        'score': job.priority_score,
+        'skills': _format_skill_matches_compact_for_excel(job.skill_matches)
+    }
+
+def replace_lancers_sheet(data: dict, excel_path: str = EXCEL_PATH, now: datetime = None):
     try:
         path = Path(excel_path)
-        wb = _ensure_book_and_sheets(path)
-
-        if "ランサーズ" in wb.sheetnames:
-            del wb["ランサーズ"]
+        now = now or datetime.now()
+        now_str = now.strftime("%Y-%m-%d %H:%M:%S")
+        rows = [_job_row(Job.coerce(job), now_str) for job in data.get("jobs", [])]
+        # 今回の一覧に無い行はアーカイブへ（上書きで消えないように）
+        new_urls = {row['url'] for row in rows}
+
+        if EXCEL_WRITER == "stream" and path.exists() and has_sheet(path):
+            # 同じURLの行はその場で置き換え、新しい行は先頭に追加、一覧に無い行は削除
+            dropped = [row for row in read_rows(path) if row['url'] not in new_urls]
+            result = upsert_rows(path, rows, remove_urls={row['url'] for row in dropped}, dedupe=True)
+            print(f"✅ 『ランサーズ』シートを更新しました（追加 {result['inserted']} / 置換 {result['replaced']} / 削除 {result['deleted']}）: {excel_path}")
+        else:
+            wb = _ensure_book_and_sheets(path)
+            dropped = []
+            if "ランサーズ" in wb.sheetnames:
+                dropped = [row for row in _sheet_rows(wb["ランサーズ"]) if row['url'] not in new_urls]
+                del wb["ランサーズ"]
+
+            ws = wb.create_sheet("ランサーズ", 0)
+            ws.append(["取得日時","タイトル","カテゴリ","価格","締切","URL","優先度スコア","スキル概要"])
 
-        ws = wb.create_sheet("ランサーズ", 0)
-        ws.append(["取得日時","タイトル","カテゴリ","価格","締切","URL","優先度スコア","スキル概要"])
+            for row in rows:
+                ws.append([row['date'], row['title'], row['category'], row['price'], row['deadline'], row['url'], row['score'], row['skills']])
+                last = ws.max_row
+                if row['url']:
+                    ws.cell(row=last, column=6).hyperlink = row['url']
+                    ws.cell(row=last, column=6).style = "Hyperlink"
 
-        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        for job in data.get("jobs", []):
-            url = job.get("link", "")
-            ws.append([
-                now_str,
-                job.get("title", ""),
-                job.get("category", ""),
-                job.get("price", ""),
-                job.get("deadline", ""),
-                url,
-                job.get("priority_score", ""),
-                _format_skill_matches_compact_for_excel(job.get("skill_matches", []))
-            ])
-            last = ws.max_row
-            if url:
-                ws.cell(row=last, column=6).hyperlink = url
-                ws.cell(row=last, column=6).style = "Hyperlink"
-
-        _autosize_columns(ws)
-        wb.save(path)
-        print(f"✅ 『ランサーズ』シートを上書き保存しました: {excel_path}")
+            _autosize_columns(ws)
+            wb.save(path)
+            print(f"✅ 『ランサーズ』シートを上書き保存しました: {excel_path}")
+        if dropped:
+            ExcelArchive(excel_path, EXCEL_ARCHIVE_DIR).add(dropped, "一覧から除外", now)
+            print(f"🗄️ 一覧から外れた {len(dropped)}件をアーカイブへ移しました")
 
     except Exception as e:
         print(f"❌ ランサーズ上書きエラー: {e}")
 
 
+def retry_after_seconds(header, attempt: int) -> float:
+    """Retry-After（秒数）を待機秒に。無い・読めない場合は 1, 2, 4... 秒（上限 TEAMS_MAX_RETRY_WAIT）"""
+    try:
+        delay = float(header)
+    except (TypeError, ValueError):
+        delay = 2.0 ** attempt
+    return min(max(delay, 0.0), TEAMS_MAX_RETRY_WAIT)
+
+
+_COUNT_JOBS_JS = "sel => new Set([...document.querySelectorAll(sel)].map(a => a.getAttribute('href'))).size"
+
 # =============================
 # 取得・通知クラス
 # =============================
 class CompleteJobsNotifier:
-    def __init__(self):
+    def __init__(self, har_mode: str = HAR_MODE, har_path: str = HAR_PATH, teams_outbox: str = TEAMS_OUTBOX):
         self.jobs_data = []
         self.seen_links = set()
+        self.har_mode = har_mode
+        self.har_path = har_path
+        self.teams_outbox = teams_outbox
+        self.feed_state = None
+        self.candidate_jobs = []  # 除外判定前の全案件（追加プロファイルの判定用）
+        self.clock = datetime.now  # 実行時刻（再生モードではスナップショットの取得時刻に固定）
+        self.selectors = dict(DEFAULT_SELECTORS)  # 一覧ページのセレクタ（selector_resolver.py で判定）
+        self.revisited_entries = {}  # revisit_open_jobs(save=False) で再確認した追跡レコード
+
+    async def new_browser_context(self, browser):
+        """記録/再生モードに応じたブラウザコンテキストを作成"""
+        options = {
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "locale": "ja-JP",
+        }
+        if self.har_mode == "record":
+            _ensure_parent_dir(self.har_path)
+            options["record_har_path"] = self.har_path
+            options["record_har_content"] = "embed"
+            print(f"🎙️ HAR記録モード: {self.har_path}")
+        context = await browser.new_context(**options)
+        if self.har_mode == "replay":
+            if not Path(self.har_path).exists():
+                raise FileNotFoundError(f"HARファイルがありません: {self.har_path}")
+            # HARに無い通信は遮断し、完全オフラインで再現する
+            await context.route_from_har(self.har_path, not_found="abort")
+            print(f"▶️ HAR再生モード: {self.har_path}")
+        return context
+
+    async def wait(self, page, ms: int):
+        """待機（再生モードでは応答の反映に必要な分だけに短縮）"""
+        if self.har_mode == "replay":
+            ms = min(ms, REPLAY_WAIT_MS)
+        await page.wait_for_timeout(ms)
 
     async def fetch_jobs(self):
         print("🚀 Lancers全案件取得を開始...")
+        all_jobs = await self.collect_jobs()
+        return self.finalize_jobs(all_jobs) if all_jobs else []
+
+    async def collect_jobs(self, url: str = None, journal_path: str = None):
+        """
+        検索ページ1つ分の案件を集める（並び替え・再掲載の集約は呼び出し側の finalize_jobs で行う）。
+        sharded_crawl.py のワーカーはページ・検索条件ごとにこれを呼ぶ。
+        ページの読み込み・ブラウザのクラッシュ・タイムアウトで止まった場合は、同じ実行の中でページを開き直し、
+        ジャーナルに記録済みの案件を読み飛ばして続きから抽出する（SCRAPE_ATTEMPTS 回まで）。
+        """
+        url = url or LANCERS_SEARCH_URL
+        slow_mo = 0 if self.har_mode == "replay" else BROWSER_SLOW_MO_MS
+        journal = ScrapeJournal(journal_path or SCRAPE_JOURNAL_PATH, url)
+        all_jobs = []
+        for job_info in journal.resume():
+            self.seen_links.add(job_info.link)
+            self.add_candidate(job_info, all_jobs)
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=HEADLESS_MODE, slow_mo=300)
+            for attempt in range(1, SCRAPE_ATTEMPTS + 1):
+                browser = None
+                context = None
+                try:
+                    browser = await p.chromium.launch(headless=HEADLESS_MODE, slow_mo=slow_mo)
+                    context = await self.new_browser_context(browser)
+                    if await self.extract_listing(context, url, journal, all_jobs):
+                        journal.complete()
+                    return all_jobs  # カードのエラーが上限に達した場合はジャーナルを残し、次回続きから
+
+                except Exception as e:
+                    print(f"❌ エラー: {e}")
+                finally:
+                    journal.close()
+                    # HARはコンテキストのクローズ時に書き出される（クラッシュ後のクローズ失敗は無視）
+                    for target in (context, browser):
+                        if target is not None:
+                            with suppress(Exception):
+                                await target.close()
+                if attempt < SCRAPE_ATTEMPTS:
+                    print(f"🔄 ページを開き直して続きから取得します（{attempt + 1}/{SCRAPE_ATTEMPTS}回目・"
+                          f"記録済みの {len(self.seen_links)}件は読み飛ばし）")
+
+        if all_jobs:
+            # 取得済みの分は捨てない（ジャーナルは残し、次回はその続きから）
+            print(f"⚠️ 取得済みの {len(all_jobs)}件で続行します")
+        return all_jobs
+
+    async def extract_listing(self, context, url: str, journal: ScrapeJournal, all_jobs: list) -> bool:
+        """
+        検索ページを開いてカードを抽出し、ジャーナルに1件ずつ記録する。
+        既に抽出した案件（seen_links）は読み飛ばす。全カードを処理できたら True（エラー上限で打ち切ったら False）
+        """
+        page = await context.new_page()
+        crashed = []
+        page.on("crash", lambda _: crashed.append(True))
+        print(f"📡 アクセス中: {url}")
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        print(f"✅ ページ読み込み完了 (ステータス: {response.status})")
+
+        await self.wait(page, 5000)
+        resolver = SelectorResolver()
+        resolved = await resolver.resolve(page)
+        self.selectors = resolved.selectors
+        await self.scroll_and_load_more(page)
+
+        job_elements = await page.query_selector_all(self.selectors["job"])
+        if not job_elements and not resolved.probed:
+            # キャッシュのセレクタで見つからなければ、同じ指紋でも判定し直す
+            resolved = await resolver.resolve(page, force=True)
+            self.selectors = resolved.selectors
+            job_elements = await page.query_selector_all(self.selectors["job"])
+        print(f"📊 {len(job_elements)} 個の案件候補を発見")
+
+        card_errors = 0
+        for element in job_elements[:MAX_JOBS_TO_FETCH]:
             try:
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                    locale="ja-JP"
-                )
-                page = await context.new_page()
-                print(f"📡 アクセス中: {LANCERS_SEARCH_URL}")
-                response = await page.goto(LANCERS_SEARCH_URL, wait_until="domcontentloaded", timeout=60000)
-                print(f"✅ ページ読み込み完了 (ステータス: {response.status})")
-
-                await page.wait_for_timeout(5000)
-                await self.scroll_and_load_more(page)
-
-                job_elements = await page.query_selector_all("a[href*='/work/detail/']")
-                print(f"📊 {len(job_elements)} 個の案件候補を発見")
-
-                all_jobs = []
-                for element in job_elements[:MAX_JOBS_TO_FETCH]:
-                    job_info = await self.extract_job_info(element, page)
-                    if job_info and self.should_include_job_minimal(job_info):
-                        all_jobs.append(job_info)
-                        skill_info = self.format_skill_matches(job_info["skill_matches"])
-                        print(f"📝 案件 {len(all_jobs)}: {job_info['title'][:40]}... | {skill_info}")
-
-                sorted_jobs = self.sort_by_skill_relevance(all_jobs)
-                print(f"✅ 全 {len(sorted_jobs)} 件の案件を取得しました")
-                self.jobs_data = sorted_jobs
-                return sorted_jobs
-
+                job_info = await asyncio.wait_for(self.extract_job_info(element, page), CARD_TIMEOUT_SEC)
             except Exception as e:
-                print(f"❌ エラー: {e}")
-                return []
-            finally:
-                await browser.close()
+                if crashed or page.is_closed() or not (context.browser and context.browser.is_connected()):
+                    raise  # カードではなくページ・ブラウザが落ちた場合は、呼び出し側で開き直す
+                card_errors += 1
+                print(f"⚠️ 案件抽出エラー ({card_errors}/{MAX_CARD_ERRORS}): {e!r}")
+                if card_errors >= MAX_CARD_ERRORS:
+                    print("⚠️ カードのエラーが上限に達したため、ここまでの案件で続行します")
+                    return False
+                continue
+            if job_info:
+                journal.record(job_info)
+                self.add_candidate(job_info, all_jobs)
+        return True
+
+    def add_candidate(self, job_info: Job, all_jobs: list):
+        """抽出済みの案件を候補に加え、条件に合えば通知対象にも加える"""
+        self.candidate_jobs.append(job_info)
+        if self.should_include_job_minimal(job_info):
+            all_jobs.append(job_info)
+            skill_info = self.format_skill_matches(job_info.skill_matches)
+            print(f"📝 案件 {len(all_jobs)}: {job_info.title[:40]}... | {skill_info}")
+
+    def replay_snapshot(self, path):
+        """
+        保存済みスナップショットを取得結果として読み込む（ブラウザ・ネットワークなし）。
+        スキル判定・スコア・除外判定は現在のルールで build_job からやり直し、時刻は取得時のものに固定する。
+        """
+        data = load_snapshot(path)
+        taken_at = datetime.fromisoformat(data["timestamp"])
+        self.clock = lambda: taken_at
+        print(f"⏪ スナップショットを再生: {Path(path).name}（{taken_at:%Y-%m-%d %H:%M}・{len(data.get('jobs', []))}件）")
+        fields = list(self.default_recruitment_info())
+        all_jobs = []
+        for job in jobs_from_dicts(data.get("jobs", [])):
+            rebuilt = self.build_job(job.title, job.link, {k: getattr(job, k) for k in fields})
+            rebuilt.scraped_at = job.scraped_at
+            self.seen_links.add(rebuilt.link)
+            self.add_candidate(rebuilt, all_jobs)
+        return self.finalize_jobs(all_jobs) if all_jobs else []
+
+    def finalize_jobs(self, all_jobs):
+        all_jobs = self.link_reposts(all_jobs)
+        all_jobs = self.apply_relevance_ranking(all_jobs)
+        sorted_jobs = self.sort_by_skill_relevance(all_jobs)
+        print(f"✅ 全 {len(sorted_jobs)} 件の案件を取得しました")
+        self.jobs_data = sorted_jobs
+        return sorted_jobs
+
+    # =============================
+    # 段階的取得（RSS → 詳細ページ → ブラウザ）
+    # =============================
+    async def fetch_jobs_tiered(self):
+        """
+        RSSを先に確認し、未読の案件があるときだけ続きを行う。
+        - 未読なし           : None を返す（ブラウザ・Excel・Teams をすべて省略）
+        - 既読の案件         : 前回スナップショットの内容をそのまま使う
+        - 未読の案件         : フィードに無い項目（価格・応募数など）だけ詳細ページから取得
+        - フィードが取れない : 従来のブラウザ取得に切り替える
+        """
+        print(f"📰 RSS確認中: {LANCERS_RSS_URL}")
+        state = FeedState(RSS_STATE_PATH)
+        try:
+            feed = parse_feed(await fetch_feed(LANCERS_RSS_URL))
+        except Exception as e:
+            print(f"⚠️ RSS取得エラー（ブラウザ取得に切り替えます）: {e}")
+            return await self.fetch_jobs()
+
+        new_items = state.unseen(feed)
+        print(f"📊 RSS {len(feed)}件（未読 {len(new_items)}件）")
+        if not new_items:
+            return None
+
+        previous = self.load_previous_jobs()
+        new_ids = {item["job_id"] for item in new_items}
+        details = await self.fetch_missing_details(new_items)
+
+        all_jobs = []
+        for item in feed:
+            title = self.clean_title(item["title"])
+            if not title or len(title) < 5 or item["link"] in self.seen_links:
+                continue
+            self.seen_links.add(item["link"])
+            job_info = previous.get(item["job_id"])
+            if job_info is None or item["job_id"] in new_ids:
+                recruitment_info = self.default_recruitment_info()
+                recruitment_info.update(parse_listing_text(item["description"]))
+                recruitment_info.update(details.get(item["job_id"], {}))
+                if recruitment_info["price"] != "価格情報なし":
+                    recruitment_info["price"] = self.clean_price_text(recruitment_info["price"])
+                job_info = self.build_job(title, item["link"], recruitment_info)
+            self.candidate_jobs.append(job_info)
+            if self.should_include_job_minimal(job_info):
+                all_jobs.append(job_info)
+
+        # 既読は後続の処理が終わってから記録する（途中で失敗したら次回もう一度扱う）
+        state.mark_seen(item["job_id"] for item in feed)
+        self.feed_state = state
+        return self.finalize_jobs(all_jobs)
+
+    async def fetch_missing_details(self, items):
+        """説明文だけでは価格・応募数が分からない未読案件について詳細ページを取得"""
+        needed = [item for item in items
+                  if not {"price", "applicant_count"} <= parse_listing_text(item["description"]).keys()]
+        if not needed or (is_local_source(LANCERS_RSS_URL) and not LANCERS_DETAIL_DIR):
+            return {}  # ローカルXMLでの検証時はネットワークに出ない（LANCERS_DETAIL_DIR があればそこから読む）
+        print(f"🔎 詳細ページを取得: {len(needed)}件")
+        semaphore = asyncio.Semaphore(DETAIL_CONCURRENCY)
+        details = {}
+        async with aiohttp.ClientSession(headers={"User-Agent": "Mozilla/5.0"}) as session:
+            async def fetch_one(item):
+                async with semaphore:
+                    try:
+                        details[item["job_id"]] = await fetch_detail_fields(session, item["link"], LANCERS_DETAIL_DIR)
+                    except Exception as e:
+                        print(f"⚠️ 詳細ページ取得エラー ({item['job_id']}): {e}")
+            await asyncio.gather(*(fetch_one(item) for item in needed))
+        return details
+
+    def load_previous_jobs(self):
+        """直近スナップショットの案件（案件ID → Job）"""
+        try:
+            paths = list_snapshot_paths()
+            if not paths:
+                return {}
+            return {job.job_id: job for job in jobs_from_dicts(load_snapshot(paths[-1])["jobs"])}
+        except Exception as e:
+            print(f"⚠️ 前回スナップショットの読み込みエラー: {e}")
+            return {}
+
+    def save_feed_state(self):
+        if self.feed_state is not None:
+            self.feed_state.save()
+
+    async def count_cards(self, page) -> int:
+        """読み込み済みの案件数（同じ案件への複数のリンクは1件）"""
+        return await page.evaluate(_COUNT_JOBS_JS, self.selectors["job"])
+
+    async def wait_for_more_cards(self, page, count: int, ms: int) -> int:
+        """案件リンクが count より増えるまで最大 ms 待ち、待機後の件数を返す"""
+        if self.har_mode == "replay":
+            ms = min(ms, REPLAY_WAIT_MS)
+        try:
+            await page.wait_for_function(f"([sel, n]) => ({_COUNT_JOBS_JS})(sel) > n",
+                                         arg=[self.selectors["job"], count], timeout=ms)
+        except PlaywrightTimeoutError:
+            pass
+        return await self.count_cards(page)
 
     async def scroll_and_load_more(self, page):
+        """
+        案件数が増えなくなるか MAX_JOBS_TO_FETCH に達するまで、スクロールと「もっと見る」で読み込む。
+        増えなかった回が SCROLL_STALL_LIMIT 回続いたら終わり（読み込みを待つのは1回あたり SCROLL_WAIT_MS まで）
+        """
         try:
-            for _ in range(5):
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
-            more_button = await page.query_selector(".more-button, .load-more, [class*='more']")
-            if more_button:
-                await more_button.click()
-                await page.wait_for_timeout(3000)
-            for _ in range(3):
+            count = await self.count_cards(page)
+            stalls = 0
+            while count < MAX_JOBS_TO_FETCH and stalls < SCROLL_STALL_LIMIT:
                 await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
+                loaded = await self.wait_for_more_cards(page, count, SCROLL_WAIT_MS)
+                if loaded <= count and self.selectors["more"]:
+                    more_button = await page.query_selector(self.selectors["more"])
+                    if more_button and await more_button.is_visible():
+                        await more_button.click()
+                        loaded = await self.wait_for_more_cards(page, count, SCROLL_WAIT_MS)
+                stalls = stalls + 1 if loaded <= count else 0
+                count = loaded
+            print(f"📜 読み込み済みの案件リンク: {count}件")
         except Exception as e:
             print(f"⚠️ スクロール読み込みエラー: {e}")
 
     async def extract_job_info(self, element, page):
+        """カード1枚から案件を作る（対象外なら None。例外は呼び出し側のエラー上限で扱う）"""
+        title_text = await element.text_content()
+        href = await element.get_attribute("href")
+        if not title_text or not href:
+            return None
+        title = self.clean_title(title_text)
+        if not title or len(title) < 5:
+            return None
+        if href.startswith("/"):
+            href = "https://www.lancers.jp" + href
+        if href in self.seen_links:
+            return None
+
+        recruitment_info = await self.extract_recruitment_details(element)
+        self.seen_links.add(href)
+        return self.build_job(title, href, recruitment_info)
+
+    def build_job(self, title, href, recruitment_info):
+        skill_matches = self.find_all_skill_matches(title)
+        return Job(
+            title=title,
+            link=href,
+            price=recruitment_info["price"],
+            deadline=recruitment_info["deadline"],
+            applicant_count=recruitment_info["applicant_count"],
+            recruitment_count=recruitment_info["recruitment_count"],
+            client_name=recruitment_info["client_name"],
+            status=recruitment_info["status"],
+            urgency=recruitment_info["urgency"],
+            category=recruitment_info["category"],
+            skill_matches=skill_matches,
+            priority_score=self.calculate_comprehensive_score(title, recruitment_info, skill_matches),
+            scraped_at=datetime.now().isoformat()
+        )
+
+    def link_reposts(self, jobs):
+        """再掲載を1件にまとめ、過去の案件IDを previous_ids に記録"""
         try:
-            title_text = await element.text_content()
-            href = await element.get_attribute("href")
-            if not title_text or not href:
-                return None
-            title = self.clean_title(title_text)
-            if not title or len(title) < 5:
-                return None
-            if href.startswith("/"):
-                href = "https://www.lancers.jp" + href
-            if href in self.seen_links:
-                return None
-            self.seen_links.add(href)
-
-            recruitment_info = await self.extract_recruitment_details(element)
-            skill_matches = self.find_all_skill_matches(title)
-            job_info = {
-                "title": title,
-                "link": href,
-                "price": recruitment_info["price"],
-                "deadline": recruitment_info["deadline"],
-                "applicant_count": recruitment_info["applicant_count"],
-                "recruitment_count": recruitment_info["recruitment_count"],
-                "client_name": recruitment_info["client_name"],
-                "status": recruitment_info["status"],
-                "urgency": recruitment_info["urgency"],
-                "category": recruitment_info["category"],
-                "skill_matches": skill_matches,
-                "skill_count": len(skill_matches),
-                "priority_score": self.calculate_comprehensive_score(title, recruitment_info, skill_matches),
-                "scraped_at": datetime.now().isoformat()
-            }
-            return job_info
+            index = NearDuplicateIndex.load_or_build()
         except Exception as e:
-            print(f"⚠️ 案件抽出エラー: {e}")
-            return None
+            print(f"⚠️ 近似重複索引の作成エラー（実行内のみで照合）: {e}")
+            index = None
+        return collapse_reposts(jobs, index)
+
+    def apply_relevance_ranking(self, jobs):
+        """RANKING_ENGINE=tfidf のとき、実行分をまとめてスコアリングし relevance に設定"""
+        if RANKING_ENGINE != "tfidf" or not jobs:
+            return jobs
+        try:
+            from relevance_ranking import score_titles  # 学習済みモデルは .relevance_model.pkl から読み、今回分だけ解析
+            scores = score_titles(get_rules(RULES_PATH).company_skills, [job.title for job in jobs])
+            for job, score in zip(jobs, scores):
+                job.relevance = round(float(score), 2)
+        except Exception as e:
+            print(f"⚠️ TF-IDF ランキングを利用できません（従来スコアで並び替え）: {e}")
+        return jobs
+
+    def rescore(self, job: Job):
+        """再確認で変わった応募数・価格・急募をもとにスコアを計算し直す"""
+        recruitment_info = {"urgency": job.urgency, "applicant_count": job.applicant_count, "price": job.price}
+        return self.calculate_comprehensive_score(job.title, recruitment_info, job.skill_matches)
+
+    async def revisit_open_jobs(self, jobs, budget: int = REVISIT_BUDGET, save: bool = True):
+        """
+        今回の案件を追跡に加え、期限の来た募集中の案件を予算内で再確認する。
+        今回の一覧に無いが募集中の案件（最新の状態）を返す。
+        save=False では open_jobs.json を書かず、再確認で更新した追跡レコードを self.revisited_entries に残す（結果シャード用）
+        """
+        now = self.clock()
+        tracker = OpenJobTracker(OPEN_JOBS_PATH)
+        tracker.track(jobs, now)
+        tracker.prune(now)
+        try:
+            updated = await revisit(tracker, now, budget, exclude=[j.job_id for j in jobs],
+                                    rescore=self.rescore, concurrency=DETAIL_CONCURRENCY)
+        except Exception as e:
+            print(f"⚠️ 再確認エラー（次回に持ち越し）: {e}")
+            updated = []
+        if save:
+            tracker.save()
+        else:
+            self.revisited_entries = {str(job.job_id): tracker.entries[str(job.job_id)] for job in updated}
+        closed = sum(1 for job in updated if tracker.is_closed(str(job.job_id)))
+        carried = tracker.open_jobs(exclude=[j.job_id for j in jobs])
+        print(f"🔁 再確認: 更新 {len(updated)}件（うち募集終了 {closed}件） / 一覧外の募集中 {len(carried)}件")
+        return carried
 
     def find_all_skill_matches(self, title):
-        matches = []
-        title_lower = title.lower()
-        for priority, skills in COMPANY_SKILLS.items():
-            for skill in skills:
-                if skill.lower() in title_lower:
-                    matches.append({"skill": skill, "priority": priority})
-        additional_keywords = {
-            "自動化": "中優先度",
-            "スクレイピング": "中優先度",
-            "アプリ": "中優先度",
-            "サイト": "低優先度",
-            "管理": "低優先度",
-            "コンサル": "中優先度",
-            "Ai": "超高優先度",
-            "人工知能": "高優先度"
-        }
-        for keyword, priority in additional_keywords.items():
-            if keyword.lower() in title_lower:
-                matches.append({"skill": keyword, "priority": priority})
-        seen_skills = set()
-        unique_matches = []
-        for m in matches:
-            if m["skill"] not in seen_skills:
-                unique_matches.append(m)
-                seen_skills.add(m["skill"])
-        return unique_matches
+        matches = get_rules(RULES_PATH).skill_matches(normalize(title).lower)
+        return [SkillMatch.of(skill, priority) for skill, priority in matches]
 
     def format_skill_matches(self, skill_matches):
         if not skill_matches:
             return "🔧 スキルセット: なし"
         skills_by_priority = {}
         for m in skill_matches:
-            p = m["priority"]
-            skills_by_priority.setdefault(p, []).append(m["skill"])
+            skills_by_priority.setdefault(m.priority, []).append(m.skill)
         parts = []
         if "超高優先度" in skills_by_priority: parts.append(f"🔥{', '.join(skills_by_priority['超高優先度'])}")
         if "高優先度" in skills_by_priority:  parts.append(f"★{', '.join(skills_by_priority['高優先度'])}")
@@ -318,14 +695,14 @@ class CompleteJobsNotifier:
         if "最低優先度" in skills_by_priority: parts.append(f"○{', '.join(skills_by_priority['最低優先度'])}")
         return f"🔧 スキルセット: {' | '.join(parts)}" if parts else "🔧 スキルセット: なし"
 
-    def format_skill_matches_compact(self, skill_matches: List[dict]) -> str:
+    def format_skill_matches_compact(self, skill_matches: List[SkillMatch]) -> str:
         if not skill_matches:
             return "🔧 スキルセット: なし"
-        ultra = [m.get("skill") for m in skill_matches if m.get("priority") == "超高優先度"]
-        high  = [m.get("skill") for m in skill_matches if m.get("priority") == "高優先度"]
-        mid   = [m.get("skill") for m in skill_matches if m.get("priority") == "中優先度"]
-        low   = [m.get("skill") for m in skill_matches if m.get("priority") == "低優先度"]
-        lowst = [m.get("skill") for m in skill_matches if m.get("priority") == "最低優先度"]
+        ultra = [m.skill for m in skill_matches if m.priority == "超高優先度"]
+        high  = [m.skill for m in skill_matches if m.priority == "高優先度"]
+        mid   = [m.skill for m in skill_matches if m.priority == "中優先度"]
+        low   = [m.skill for m in skill_matches if m.priority == "低優先度"]
+        lowst = [m.skill for m in skill_matches if m.priority == "最低優先度"]
         parts = []
         if ultra: parts.append("🔥" + ",".join(ultra[:2]))
         if high:  parts.append("★" + ",".join(high[:2]))
@@ -336,8 +713,8 @@ class CompleteJobsNotifier:
         if len(s) > 100: s = s[:97] + "..."
         return f"🔧 スキルセット: {s}" if s else "🔧 スキルセット: なし"
 
-    async def extract_recruitment_details(self, element):
-        recruitment_info = {
+    def default_recruitment_info(self):
+        return {
             "price": "価格情報なし",
             "deadline": "期限情報なし",
             "applicant_count": "0",
@@ -347,22 +724,25 @@ class CompleteJobsNotifier:
             "urgency": False,
             "category": "システム開発"
         }
+
+    async def extract_recruitment_details(self, element):
+        recruitment_info = self.default_recruitment_info()
         try:
-            parent = await element.evaluate_handle("el => el.closest('.c-media, .p-jobList__item, article, li')")
+            parent = await element.evaluate_handle("(el, card) => el.closest(card)", self.selectors["card"])
             if parent:
-                price_elem = await parent.query_selector(".c-media__price, .price, .budget, [class*='price']")
+                price_elem = await parent.query_selector(self.selectors["price"])
                 if price_elem:
                     price_text = await price_elem.text_content()
                     if price_text and "円" in price_text:
                         recruitment_info["price"] = self.clean_price_text(price_text)
-                deadline_elem = await parent.query_selector(".c-media__deadline, .deadline, [class*='deadline']")
+                deadline_elem = await parent.query_selector(self.selectors["deadline"])
                 if deadline_elem:
                     deadline_text = await deadline_elem.text_content()
                     if deadline_text:
                         recruitment_info["deadline"] = deadline_text.strip()
                         if any(w in deadline_text for w in ["急募", "緊急", "即日", "至急"]):
                             recruitment_info["urgency"] = True
-                applicant_elem = await parent.query_selector(".c-media__applicant, .applicant, [class*='applicant']")
+                applicant_elem = await parent.query_selector(self.selectors["applicant"])
                 if applicant_elem:
                     applicant_text = await applicant_elem.text_content()
                     if applicant_text:
@@ -375,96 +755,44 @@ class CompleteJobsNotifier:
         return recruitment_info
 
     def clean_title(self, title):
-        if not title:
-            return ""
-        try:
-            import unicodedata
-            title = unicodedata.normalize('NFKC', title)
-        except:
-            pass
-        title = re.sub(r'\s+', ' ', title.strip())
-        title = re.sub(r'^(NEW\s*){1,}', '', title, flags=re.IGNORECASE)
-        title = re.sub(r'^\d+回目\s*', '', title)
-        return title.strip()
+        return clean_title(title)
 
     def clean_price_text(self, raw_price):
-        if not raw_price:
-            return "価格情報なし"
-        try:
-            import unicodedata
-            raw_price = unicodedata.normalize('NFKC', raw_price)
-        except:
-            pass
-        price = re.sub(r'\s+', ' ', raw_price.strip())
-        price = re.sub(r'円\s*/\s*', '円 / ', price)
-        return price
+        return clean_price_text(raw_price)
 
     def calculate_comprehensive_score(self, title, recruitment_info, skill_matches):
-        score = 0
-        title_lower = title.lower()
-        for m in skill_matches:
-            p = m["priority"]
-            if p == "超高優先度": score += 100
-            elif p == "高優先度": score += 50
-            elif p == "中優先度": score += 20
-            elif p == "低優先度": score += 10
-            elif p == "最低優先度": score += 5
-        if len(skill_matches) >= 3: score += 50
-        elif len(skill_matches) >= 2: score += 25
-        elif len(skill_matches) >= 1: score += 10
-        priority_keywords = {
-            "chatgpt": 80, "python": 70, "api": 60, "ai": 60,
-            "自動化": 40, "bot": 40, "効率化": 30, "ツール": 25, "開発": 20, "システム": 15
-        }
-        for k, bonus in priority_keywords.items():
-            if k in title_lower:
-                score += bonus
-        if recruitment_info["urgency"]:
-            score += 15
-        try:
-            applicant_count = int(recruitment_info["applicant_count"])
-            if applicant_count == 0: score += 10
-            elif applicant_count <= 2: score += 5
-        except:
-            pass
-        price_text = recruitment_info["price"]
-        if "円" in price_text:
-            numbers = re.findall(r'(\d+,?\d*)', price_text.replace(',', ''))
-            if numbers:
-                try:
-                    max_price = max([int(num.replace(',', '')) for num in numbers])
-                    if max_price >= 500000: score += 15
-                    elif max_price >= 100000: score += 8
-                    elif max_price >= 50000:  score += 3
-                except:
-                    pass
-        return score
-
-    def should_include_job_minimal(self, job_info):
-        title = job_info["title"]
+        rules = get_rules(RULES_PATH)
+        title_lower = normalize(title).lower
+        return (
+            rules.skill_score([m.priority for m in skill_matches])
+            + rules.keyword_score(title_lower)
+            + rules.context_score(recruitment_info["urgency"], recruitment_info["applicant_count"],
+                                  recruitment_info["price"])
+        )
+
+    def should_include_job_minimal(self, job_info: Job):
+        title = job_info.title
         if not title or len(title.strip()) < 5:
             return False
-        title_lower = title.lower()
-        for keyword in EXCLUDE_KEYWORDS:
-            if keyword.lower() in title_lower:
-                return False
-        status = job_info["status"]
-        if any(w in status for w in ["募集終了", "締切", "終了", "完了"]):
+        rules = get_rules(RULES_PATH)
+        title_lower = normalize(title).lower
+        if rules.is_excluded(title_lower):
             return False
-        if job_info["priority_score"] >= 10 or job_info["skill_count"] >= 1:
-            return True
-        priority_keywords = ["chatgpt", "python", "api", "ai", "自動化", "bot", "効率化", "ツール", "開発", "システム"]
-        if any(k in title_lower for k in priority_keywords):
+        if rules.is_closed(job_info.status):
+            return False
+        if job_info.priority_score >= rules.min_score or job_info.skill_count >= 1:
             return True
-        return False
+        return rules.has_bonus_keyword(title_lower)
 
     def sort_by_skill_relevance(self, jobs):
-        def sort_key(job):
-            base_score = job["priority_score"]
-            if job["skill_count"] == 0:
+        def sort_key(job: Job):
+            applicant_count = int(job.applicant_count) if job.applicant_count.isdigit() else 999
+            if job.relevance is not None:
+                return (-job.relevance, 0, applicant_count, not job.urgency, job.scraped_at)
+            base_score = job.priority_score
+            if job.skill_count == 0:
                 base_score -= 1000
-            applicant_count = int(job["applicant_count"]) if job["applicant_count"].isdigit() else 999
-            return (-base_score, -job["skill_count"], applicant_count, not job["urgency"], job["scraped_at"])
+            return (-base_score, -job.skill_count, applicant_count, not job.urgency, job.scraped_at)
         return sorted(jobs, key=sort_key)
 
     def create_teams_payload(self, jobs):
@@ -486,17 +814,19 @@ class CompleteJobsNotifier:
         skipped_count = 0
         print(f"📊 Teams表示制限: {MAX_CHARS:,}文字まで利用可能")
         for i, job in enumerate(jobs, 1):
-            skill_info = self.format_skill_matches_compact(job["skill_matches"])
-            job_text  = f"**{i}. {job['title']}**  \n"
-            job_text += f"💰 {job['price']}  \n"
-            if job['deadline'] != "期限情報なし" and len(job['deadline']) < 20:
-                job_text += f"⏰ {job['deadline']}  \n"
-            if job['applicant_count'] != "0":
-                job_text += f"👥 応募{job['applicant_count']}人  \n"
+            skill_info = self.format_skill_matches_compact(job.skill_matches)
+            job_text  = f"**{i}. {job.title}**  \n"
+            job_text += f"💰 {job.price}  \n"
+            if job.deadline != "期限情報なし" and len(job.deadline) < 20:
+                job_text += f"⏰ {job.deadline}  \n"
+            if job.applicant_count != "0":
+                job_text += f"👥 応募{job.applicant_count}人  \n"
             job_text += f"{skill_info}  \n"
-            if job['urgency']:
+            if job.urgency:
                 job_text += f"🚨 急募  \n"
-            job_text += f"🔗 [詳細]({job['link']})  \n\n"
+            if job.previous_ids:
+                job_text += f"🔁 再掲載（過去ID: {', '.join(map(str, job.previous_ids[-3:]))}）  \n"
+            job_text += f"🔗 [詳細]({job.link})  \n\n"
             if len(main_content) + len(job_text) > available_chars:
                 skipped_count = len(jobs) - displayed_count
                 print(f"📝 文字数制限により {displayed_count}件表示、{skipped_count}件スキップ")
@@ -512,7 +842,7 @@ class CompleteJobsNotifier:
             "@context": "https://schema.org/extensions",
             "summary": f"Lancers全案件 {len(jobs)}件",
             "themeColor": "0078D4",
-            "title": f"🚀 Lancers全案件リスト ({len(jobs)}件発見 / {displayed_count}件表示) - {datetime.now().strftime('%Y/%m/%d %H:%M')}",
+            "title": f"🚀 Lancers全案件リスト ({len(jobs)}件発見 / {displayed_count}件表示) - {self.clock().strftime('%Y/%m/%d %H:%M')}",
             "text": final_text,
             "potentialAction": [{
                 "@type": "OpenUri",
@@ -521,76 +851,126 @@ class CompleteJobsNotifier:
             }]
         }
 
-    async def send_to_teams(self, jobs):
+    async def send_to_teams(self, jobs, webhook_url: str = None, label: str = None):
         try:
             from dotenv import load_dotenv
             load_dotenv()
         except:
             pass
-        webhook_url = os.getenv("TEAMS_WEBHOOK_URL")
+        if webhook_url is None:
+            webhook_url = os.getenv("TEAMS_WEBHOOK_URL")
+        prefix = f"[{label}] " if label else ""
+        if self.teams_outbox:
+            return self.write_teams_outbox(jobs, label)
         if not webhook_url:
-            print("❌ Teams Webhook URLが設定されていません")
+            print(f"❌ {prefix}Teams Webhook URLが設定されていません")
             return False
         payload = self.create_teams_payload(jobs)
+        if label:
+            payload["title"] = f"{payload['title']}（{label}）"
         try:
             async with aiohttp.ClientSession() as session:
-                print("📤 Teamsに全案件リストを送信中...")
-                async with session.post(
-                    webhook_url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    if response.status == 200:
-                        print("✅ Teams送信成功！")
-                        return True
-                    else:
-                        print(f"❌ Teams送信失敗 (ステータス: {response.status})")
-                        return False
+                print(f"📤 {prefix}Teamsに全案件リストを送信中...")
+                for attempt in range(TEAMS_MAX_RETRIES + 1):
+                    async with session.post(
+                        webhook_url,
+                        json=payload,
+                        headers={"Content-Type": "application/json"}
+                    ) as response:
+                        if response.status == 200:
+                            print(f"✅ {prefix}Teams送信成功！")
+                            return True
+                        if response.status != 429 or attempt == TEAMS_MAX_RETRIES:
+                            print(f"❌ {prefix}Teams送信失敗 (ステータス: {response.status})")
+                            return False
+                        delay = retry_after_seconds(response.headers.get("Retry-After"), attempt)
+                    print(f"⏳ {prefix}Teamsの送信制限（429）。{delay:.1f}秒後に再送します ({attempt + 1}/{TEAMS_MAX_RETRIES})")
+                    await asyncio.sleep(delay)
         except Exception as e:
-            print(f"❌ Teams送信エラー: {e}")
+            print(f"❌ {prefix}Teams送信エラー: {e}")
             return False
 
-    def save_data(self, jobs):
-        timestamp = datetime.now()
+    def write_teams_outbox(self, jobs, label: str = None):
+        """送信する代わりにペイロードを teams_outbox に書き出す"""
+        payload = self.create_teams_payload(jobs)
+        if label:
+            payload["title"] = f"{payload['title']}（{label}）"
+        suffix = "_" + re.sub(r"[^\w-]+", "_", label) if label else ""
+        path = Path(self.teams_outbox) / f"teams_{self.clock().strftime('%Y%m%d_%H%M')}{suffix}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"📝 Teamsペイロードを書き出しました: {path}")
+        return True
+
+    async def notify_profiles(self):
+        """追加プロファイルごとに順位付けした通知を並列に送信（判定は全プロファイル1回の走査）"""
+        profiles = load_profiles(PROFILES_PATH)
+        if not profiles:
+            return {}
+        results = ProfileSet(profiles, get_rules(RULES_PATH)).evaluate(self.candidate_jobs)
+
+        async def send(profile):
+            views = [profile_view(job, matches, score) for job, matches, score in results[profile.name]]
+            ranked = self.sort_by_skill_relevance(views)[:profile.max_jobs]
+            print(f"👥 プロファイル「{profile.name}」: {len(ranked)}件")
+            return await self.send_to_teams(ranked, profile.resolve_webhook() or "", label=profile.name)
+
+        outcomes = await asyncio.gather(*(send(p) for p in profiles))
+        return {p.name: ok for p, ok in zip(profiles, outcomes)}
+
+    def save_data(self, jobs, stats: RunStats = None):
+        timestamp = self.clock()
+        stats = stats or RunStats(jobs)
         data = {
             "timestamp": timestamp.isoformat(),
             "count": len(jobs),
             "type": "全案件リスト",
-            "skill_summary": self.create_skill_summary(jobs),
-            "skill_distribution": self.create_skill_distribution(jobs),
-            "jobs": jobs
+            "skill_summary": stats.skill_summary,
+            "skill_distribution": stats.skill_distribution,
+            "jobs": jobs_to_dicts(jobs)
         }
         filename = f"all_jobs_{timestamp.strftime('%Y%m%d_%H%M')}.json"
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"💾 全案件データを保存: {filename}")
+        if SNAPSHOT_FORMAT == "json":
+            with open(filename, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            saved = filename
+        else:
+            saved = SnapshotStore().write(data, filename)
+        print(f"💾 全案件データを保存: {saved}")
+
+    def save_shard(self, jobs, stats: RunStats = None, probe_result=None):
+        """OUTPUT_MODE=shard: 今回の結果を run_shards/ に1ファイルだけ書き出す（履歴・Excelへの反映は run_shards.py）"""
+        stats = stats or RunStats(jobs)
+        state = {}
+        if probe_result is not None and probe_result.entry is not None:
+            state[PROBE_STATE_PATH] = {probe_result.url: probe_result.entry}
+        selectors = load_cache(SELECTOR_CACHE_PATH)
+        if selectors:
+            state[SELECTOR_CACHE_PATH] = selectors
+        data = {
+            "timestamp": self.clock().isoformat(),
+            "count": len(jobs),
+            "type": "全案件リスト",
+            "skill_summary": stats.skill_summary,
+            "skill_distribution": stats.skill_distribution,
+            "jobs": jobs_to_dicts(jobs),
+            "revisited": self.revisited_entries,  # 一覧外の募集中の案件はこれを取り込んだ追跡状態から反映時に決める
+            "state": state,
+        }
+        path = write_shard(data)
+        print(f"📦 結果シャードを保存: {path}（反映は python run_shards.py compact）")
 
     def create_skill_summary(self, jobs):
-        skill_counts = {}
-        for job in jobs:
-            for match in job["skill_matches"]:
-                skill = match["skill"]
-                skill_counts[skill] = skill_counts.get(skill, 0) + 1
-        return dict(sorted(skill_counts.items(), key=lambda x: x[1], reverse=True))
+        return RunStats(jobs).skill_summary
 
     def create_skill_distribution(self, jobs):
-        total_jobs = len(jobs)
-        no_skill_jobs = len([job for job in jobs if job["skill_count"] == 0])
-        multi_skill_jobs = len([job for job in jobs if job["skill_count"] >= 2])
-        high_priority_jobs = len([job for job in jobs if job["priority_score"] >= 10])
-        return {
-            "total_jobs": total_jobs,
-            "no_skill_match": no_skill_jobs,
-            "multi_skill_match": multi_skill_jobs,
-            "high_priority": high_priority_jobs,
-            "skill_match_rate": round((total_jobs - no_skill_jobs) / total_jobs * 100, 1) if total_jobs > 0 else 0
-        }
-        
+        return RunStats(jobs).skill_distribution
+
 
 # =============================
 # Excel クリーニング
 # =============================
-def clean_excel_data(excel_path: str = EXCEL_PATH):
+def clean_excel_data(excel_path: str = EXCEL_PATH, now: datetime = None):
     """Excelファイル内の重複データと期限切れデータをクリーニング"""
     try:
         path = Path(excel_path)
@@ -598,32 +978,22 @@ def clean_excel_data(excel_path: str = EXCEL_PATH):
             print("📄 Excelファイルが存在しません（初回など）")
             return
 
-        wb = openpyxl.load_workbook(path)
-        if "ランサーズ" not in wb.sheetnames:
-            print("📄 ランサーズシートが存在しません")
-            return
+        stream = EXCEL_WRITER == "stream"
+        if stream:
+            if not has_sheet(path):
+                print("📄 ランサーズシートが存在しません")
+                return
+            all_rows = read_rows(path)
+        else:
+            wb = openpyxl.load_workbook(path)
+            if "ランサーズ" not in wb.sheetnames:
+                print("📄 ランサーズシートが存在しません")
+                return
+
+            ws = wb["ランサーズ"]
 
-        ws = wb["ランサーズ"]
-
-        # データ読み込み
-        all_rows = []
-        for row_idx in range(2, ws.max_row + 1):
-            row_data = []
-            for col_idx in range(1, 9):  # 8列
-                cell_value = ws.cell(row=row_idx, column=col_idx).value
-                row_data.append(cell_value)
-            if len(row_data) > 5 and row_data[5]:
-                all_rows.append({
-                    'row_index': row_idx,
-                    'date': row_data[0],
-                    'title': row_data[1],
-                    'category': row_data[2],
-                    'price': row_data[3],
-                    'deadline': row_data[4],
-                    'url': row_data[5],
-                    'score': row_data[6] if len(row_data) > 6 else None,
-                    'skills': row_data[7] if len(row_data) > 7 else None
-                })
+            # データ読み込み
+            all_rows = _sheet_rows(ws)
 
         print(f"📊 処理前のデータ数: {len(all_rows)}件")
 
@@ -642,12 +1012,27 @@ def clean_excel_data(excel_path: str = EXCEL_PATH):
                 except:
                     pass
 
+        # 1b) 再掲載（タイトルの近似重複）は最新の1件に集約
+        removed_count = {'duplicate': len(all_rows) - len(url_latest), 'repost': 0, 'expired': 0, 'old': 0}
+        archived = {'repost': [], 'expired': [], 'old': []}  # シートから外す行（削除せずアーカイブへ）
+        repost_index = NearDuplicateIndex()
+        newest_first = sorted(url_latest.values(), key=lambda r: (str(r['date']), parse_job_id(r['url']) or 0), reverse=True)
+        url_latest = {}
+        for row in newest_first:
+            row_id = parse_job_id(row['url'])
+            title = str(row['title'] or '')
+            if repost_index.query(title, exclude_id=row_id):
+                removed_count['repost'] += 1
+                archived['repost'].append(row)
+                continue
+            repost_index.add(row_id, title)
+            url_latest[row['url']] = row
+
         # 2) 期限切れ/古いデータ
-        now = datetime.now()
-        one_month_ago = now - timedelta(days=30)
+        now = now or datetime.now()
+        one_month_ago = now - timedelta(days=EXCEL_RETENTION_DAYS)
 
         filtered_rows = []
-        removed_count = {'duplicate': len(all_rows) - len(url_latest), 'expired': 0, 'old': 0}
 
         for url, row in url_latest.items():
             keep_row = True
@@ -656,6 +1041,7 @@ def clean_excel_data(excel_path: str = EXCEL_PATH):
                 if row_date < one_month_ago:
                     keep_row = False
                     removed_count['old'] += 1
+                    archived['old'].append(row)
             except:
                 pass
 
@@ -664,6 +1050,7 @@ def clean_excel_data(excel_path: str = EXCEL_PATH):
                 if '締切' in deadline_text or '終了' in deadline_text:
                     keep_row = False
                     removed_count['expired'] += 1
+                    archived['expired'].append(row)
                 else:
                     try:
                         deadline_date = None
@@ -687,34 +1074,49 @@ def clean_excel_data(excel_path: str = EXCEL_PATH):
                         if deadline_date and deadline_date < now:
                             keep_row = False
                             removed_count['expired'] += 1
+                            archived['expired'].append(row)
                     except:
                         pass
 
             if keep_row:
                 filtered_rows.append(row)
 
-        print(f"🗑️ 削除データ: 重複 {removed_count['duplicate']} / 1ヶ月以上前 {removed_count['old']} / 期限切れ {removed_count['expired']}")
+        print(f"🗄️ シートから外すデータ: 重複 {removed_count['duplicate']} / 再掲載 {removed_count['repost']} / 1ヶ月以上前 {removed_count['old']} / 期限切れ {removed_count['expired']}")
         print(f"📊 処理後のデータ数: {len(filtered_rows)}件")
 
-        # 再作成
-        wb.remove(ws)
-        ws = wb.create_sheet("ランサーズ", 0)
-        ws.append(["取得日時","タイトル","カテゴリ","価格","締切","URL","優先度スコア","スキル概要"])
+        if stream:
+            # 外した行だけを削除。URL重複があった案件は残す1件（最新）で置き換え、他の同じURLの行は削除
+            counts = Counter(row['url'] for row in all_rows)
+            removed_urls = {row['url'] for rows in archived.values() for row in rows}
+            duplicated = [row for row in filtered_rows if counts[row['url']] > 1]
+            if removed_urls or duplicated:
+                upsert_rows(path, duplicated, remove_urls=removed_urls, dedupe=True)
+        else:
+            # 再作成
+            wb.remove(ws)
+            ws = wb.create_sheet("ランサーズ", 0)
+            ws.append(["取得日時","タイトル","カテゴリ","価格","締切","URL","優先度スコア","スキル概要"])
 
-        for row in sorted(filtered_rows, key=lambda x: str(x['date']), reverse=True):
-            ws.append([row['date'], row['title'], row['category'], row['price'], row['deadline'], row['url'], row['score'], row['skills']])
-            last = ws.max_row
-            if row['url']:
-                try:
-                    ws.cell(row=last, column=6).hyperlink = row['url']
-                    ws.cell(row=last, column=6).style = "Hyperlink"
-                except:
-                    pass
+            for row in sorted(filtered_rows, key=lambda x: str(x['date']), reverse=True):
+                ws.append([row['date'], row['title'], row['category'], row['price'], row['deadline'], row['url'], row['score'], row['skills']])
+                last = ws.max_row
+                if row['url']:
+                    try:
+                        ws.cell(row=last, column=6).hyperlink = row['url']
+                        ws.cell(row=last, column=6).style = "Hyperlink"
+                    except:
+                        pass
 
-        _autosize_columns(ws)
-        wb.save(path)
+            _autosize_columns(ws)
+            wb.save(path)
         print(f"✅ クリーニング完了: {path}")
 
+        # 外した行は月別アーカイブへ（URL重複の古い行は同じ案件なので残さない）
+        archive = ExcelArchive(excel_path, EXCEL_ARCHIVE_DIR)
+        for reason, label in (('repost', '再掲載'), ('expired', '期限切れ'), ('old', '保持期間超過')):
+            archive.add(archived[reason], label, now)
+        archive.rotate(now)
+
         return {'before': len(all_rows), 'after': len(filtered_rows), 'removed': removed_count}
 
     except Exception as e:
@@ -723,57 +1125,139 @@ def clean_excel_data(excel_path: str = EXCEL_PATH):
         traceback.print_exc()
         return None
 
+# =============================
+# ステージ計測
+# =============================
+STAGE_TIMINGS = {}  # ステージ名 -> 所要秒数（直近の main() 実行分）
+RUN_COUNTS = {}     # 件数（直近の main() 実行分。candidates = 除外判定前に抽出できた案件数）
+
+@contextmanager
+def stage_timer(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_TIMINGS[name] = time.perf_counter() - started
+
 # =============================
 # エントリポイント
 # =============================
-async def main():
+async def main(replay_path: str = None):
+    """
+    取得 → 保存 → Excel → Teams の全処理。
+    replay_path に保存済みスナップショットを渡すと、取得の代わりにそれを読み込んで以降の処理を実行する
+    （ブラウザ・プローブ・再確認の通信なし。時刻はスナップショットの取得時刻）。
+    """
     print("=" * 70)
     print("🤖 Lancers全案件取得システム（Teams28KB最大活用版）")
     print("=" * 70)
 
-    print("\n📧 既存データのクリーニング中...")
-    clean_result = clean_excel_data(EXCEL_PATH)
-    if clean_result:
-        print(f"   処理前: {clean_result['before']}件 → 処理後: {clean_result['after']}件")
+    STAGE_TIMINGS.clear()
+    RUN_COUNTS.clear()
 
-    # ...続く処理もすべてインデントしておくこと...
+    probe_result = None
+    if CHANGE_PROBE and not replay_path:
+        with stage_timer("probe"):
+            if PROBE_RESULT:
+                probe_result = ProbeResult.from_json(PROBE_RESULT)
+                print("📨 前のステップのプローブ結果を使用")
+            else:
+                probe_result = await probe_listing(LANCERS_SEARCH_URL)
+        if not probe_result.changed:
+            print(f"💤 変更なし（{probe_result.reason}）。以降の処理を省略します")
+            return []
+        print(f"🆕 {probe_result.reason}")
 
     notifier = CompleteJobsNotifier()
-    jobs = await notifier.fetch_jobs()
+    with stage_timer("fetch"):
+        if replay_path:
+            jobs = notifier.replay_snapshot(replay_path)
+        elif FETCH_MODE == "rss":
+            jobs = await notifier.fetch_jobs_tiered()
+        elif FETCH_MODE == "sharded":
+            from sharded_crawl import fetch_jobs_sharded  # sharded_crawl は本モジュールを import する
+            jobs = await fetch_jobs_sharded(notifier)
+        else:
+            jobs = await notifier.fetch_jobs()
+
+    RUN_COUNTS.update(candidates=len(notifier.candidate_jobs), jobs=len(jobs or []))
+
+    if jobs is None:
+        print("💤 RSSに新着案件がないため、以降の処理（Excel・Teams）を省略します")
+        return []
+
+    # シャード出力ではExcel・履歴・追跡状態に触れない（run_shards.py compact で反映）
+    shard_mode = OUTPUT_MODE == "shard"
+    if not shard_mode:
+        print("\n📧 既存データのクリーニング中...")
+        with stage_timer("clean_before"):
+            clean_result = clean_excel_data(EXCEL_PATH, notifier.clock())
+        if clean_result:
+            print(f"   処理前: {clean_result['before']}件 → 処理後: {clean_result['after']}件")
 
     if jobs:
+        # 統計は1回だけ集計して使い回す
+        with stage_timer("stats"):
+            stats = RunStats(jobs)
+            if not shard_mode:
+                update_trends(stats, notifier.clock())
+
         # JSON保存（リポジトリ or ローカル）
-        notifier.save_data(jobs)
+        if not shard_mode:
+            with stage_timer("save_json"):
+                notifier.save_data(jobs, stats)
 
         # 🔧 ここで先に定義する！
         excel_data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": notifier.clock().isoformat(),
             "count": len(jobs),
             "type": "全案件リスト",
-            "skill_summary": notifier.create_skill_summary(jobs),
-            "skill_distribution": notifier.create_skill_distribution(jobs),
+            "skill_summary": stats.skill_summary,
+            "skill_distribution": stats.skill_distribution,
             "jobs": jobs
         }
 
-        # Excelの「ランサーズ」シートを上書き
-        replace_lancers_sheet(excel_data, EXCEL_PATH)
-
-        # 追記後クリーニング
-        print("\n📧 追記後のクリーニング...")
-        clean_excel_data(EXCEL_PATH)
+        # 募集中の案件を再確認（一覧から外れても募集中のものはシートに残す）
+        with stage_timer("revisit"):
+            budget = 0 if replay_path else REVISIT_BUDGET  # 再生時は詳細ページを取りに行かない
+            carried = await notifier.revisit_open_jobs(jobs, budget, save=not shard_mode)
+            excel_data["jobs"] = jobs + carried
+
+        if shard_mode:
+            with stage_timer("shard"):
+                notifier.save_shard(jobs, stats, probe_result)
+        else:
+            # Excelの「ランサーズ」シートを上書き
+            with stage_timer("excel_write"):
+                replace_lancers_sheet(excel_data, EXCEL_PATH, notifier.clock())
+
+            # 追記後クリーニング
+            print("\n📧 追記後のクリーニング...")
+            with stage_timer("clean_after"):
+                clean_excel_data(EXCEL_PATH, notifier.clock())
 
         # Teams送信
-        teams_success = await notifier.send_to_teams(jobs)
+        with stage_timer("teams"):
+            # 既定チームと追加プロファイルへ同時に送信
+            teams_success, profile_results = await asyncio.gather(
+                notifier.send_to_teams(jobs), notifier.notify_profiles()
+            )
+
+        notifier.save_feed_state()
+        if probe_result is not None and not shard_mode:
+            probe_result.save()
 
         print("\n" + "=" * 70)
         print("📊 実行結果:")
         print("=" * 70)
         print(f"✅ 全案件数: {len(jobs)}件")
         print(f"📤 Teams送信: {'成功' if teams_success else '失敗'}")
-        print(f"💾 データ保存: 完了")
+        for name, ok in profile_results.items():
+            print(f"📤 Teams送信（{name}）: {'成功' if ok else '失敗'}")
+        print(f"💾 データ保存: {'結果シャード' if shard_mode else '完了'}")
 
-        skill_summary = notifier.create_skill_summary(jobs)
-        skill_distribution = notifier.create_skill_distribution(jobs)
+        skill_summary = stats.skill_summary
+        skill_distribution = stats.skill_distribution
         print(f"\n🔧 スキル別マッチ件数（上位10位）:")
         for skill, count in list(skill_summary.items())[:10]:
             print(f"   {skill}: {count}件")
@@ -784,8 +1268,15 @@ async def main():
         print(f"   高優先度案件: {skill_distribution['high_priority']}件")
         print(f"   スキルマッチなし: {skill_distribution['no_skill_match']}件")
     else:
+        notifier.save_feed_state()
+        if shard_mode:
+            notifier.save_shard([], probe_result=probe_result)  # プローブ・セレクタの状態だけでも反映させる
+        elif probe_result is not None:
+            probe_result.save()
         print("❌ 案件が見つかりませんでした")
 
+    return jobs
+
 
 if __name__ == "__main__":
     asyncio.run(main())
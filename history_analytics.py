@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スナップショット履歴の分析
+
+all_jobs_*.json と snapshots/ の圧縮ストレージをストリーミングで読み（1ファイル全体を
+json.load しない）、CPUコア数分のプロセスで並列処理して、案件IDで重複を除いた時系列を出力します。
+
+- スキル別の新規案件数
+- 価格帯別の新規案件数
+- 応募者数（競争率）の平均
+- 掲載から消えるまでの時間（time-to-close）の中央値
+
+ファイルごとの部分集計は .history_cache.json にキャッシュされ、
+2回目以降は新しいスナップショットだけを読みます。
+
+使い方:
+    python history_analytics.py --since 2025-08-01 --skills python,ai
+    python history_analytics.py --bucket day --json history.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from job_model import parse_job_id
+from job_stats import parse_max_price, day_key, week_key
+from snapshot_store import iter_snapshot_jobs, list_snapshot_paths
+
+CACHE_PATH = ".history_cache.json"
+CACHE_VERSION = 1
+PRICE_BANDS = [
+    (50_000, "〜5万"),
+    (100_000, "5〜10万"),
+    (500_000, "10〜50万"),
+    (1_000_000, "50〜100万"),
+    (None, "100万〜"),
+]
+
+_FILENAME_TS = re.compile(r"(\d{8})_(\d{4})")
+
+
+# =============================
+# ファイル単位の部分集計
+# =============================
+def snapshot_time(path) -> str:
+    """ファイル名から取得時刻（ISO形式・分単位）を得る"""
+    m = _FILENAME_TS.search(Path(path).name)
+    return datetime.strptime("".join(m.groups()), "%Y%m%d%H%M").isoformat(timespec="minutes")
+
+
+def summarize_file(path: str) -> dict:
+    """1ファイル分の部分集計（ワーカープロセスで実行）"""
+    jobs = {}
+    for job in iter_snapshot_jobs(path):
+        job_id = parse_job_id(job.get("link"))
+        if job_id is None:
+            continue
+        applicants = job.get("applicant_count", "")
+        jobs[str(job_id)] = [
+            sorted({m["skill"] for m in job.get("skill_matches", [])}),
+            parse_max_price(job.get("price", "")),
+            int(applicants) if str(applicants).isdigit() else None,
+            job.get("status", ""),
+        ]
+    return {"time": snapshot_time(path), "jobs": jobs}
+
+
+# =============================
+# キャッシュ付きの並列集計
+# =============================
+def _load_cache(path: str) -> dict:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("version") == CACHE_VERSION:
+            return data["files"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️ キャッシュ読み込みエラー（作り直します）: {e}")
+    return {}
+
+
+def collect_partials(files, cache_path: str = CACHE_PATH, workers: int = None):
+    """ファイルごとの部分集計を返す。キャッシュに無いファイルだけを並列で読む"""
+    cache = _load_cache(cache_path) if cache_path else {}
+    keys = {str(f): f"{Path(f).name}:{os.path.getsize(f)}" for f in files}
+    missing = [f for f in files if cache.get(keys[str(f)]) is None]
+
+    if missing:
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(summarize_file, map(str, missing), chunksize=32))
+        else:
+            results = [summarize_file(str(f)) for f in missing]
+        for f, partial in zip(missing, results):
+            cache[keys[str(f)]] = partial
+        if cache_path:
+            live = set(keys.values())
+            data = {"version": CACHE_VERSION, "files": {k: v for k, v in cache.items() if k in live}}
+            Path(cache_path).write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+    return [cache[keys[str(f)]] for f in files], len(missing)
+
+
+def merge_partials(partials) -> dict:
+    """案件IDで重複を除き、初出・最終観測を1レコードにまとめる"""
+    history = {}
+    for partial in sorted(partials, key=lambda p: p["time"]):
+        ts = partial["time"]
+        for job_id, (skills, price, applicants, status) in partial["jobs"].items():
+            rec = history.get(job_id)
+            if rec is None:
+                history[job_id] = {
+                    "first_seen": ts, "last_seen": ts, "skills": skills,
+                    "price": price, "applicants": applicants, "closed_at": None,
+                }
+                rec = history[job_id]
+            else:
+                rec["last_seen"] = ts
+                if price is not None:
+                    rec["price"] = price
+                if applicants is not None:
+                    rec["applicants"] = applicants
+            if rec["closed_at"] is None and any(w in status for w in ("募集終了", "終了", "締切", "完了")):
+                rec["closed_at"] = ts
+    return history
+
+
+def price_band(price) -> str:
+    if price is None:
+        return "不明"
+    for limit, label in PRICE_BANDS:
+        if limit is None or price < limit:
+            return label
+
+
+def build_time_series(history: dict, bucket: str = "week", skills=None, since: str = None) -> dict:
+    """バケット（日/週）ごとの時系列。新規案件は初出時刻で数える"""
+    to_key = week_key if bucket == "week" else day_key
+    latest = max((r["last_seen"] for r in history.values()), default=None)
+    wanted = {s.lower() for s in skills} if skills else None
+    series = {}
+    for rec in history.values():
+        if since and rec["first_seen"] < since:
+            continue
+        key = to_key(datetime.fromisoformat(rec["first_seen"]))
+        b = series.setdefault(key, {"new_jobs": 0, "skills": {}, "price_bands": {}, "applicants": [], "close_hours": []})
+        b["new_jobs"] += 1
+        for skill in {s.lower() for s in rec["skills"]}:
+            if wanted is None or skill in wanted:
+                b["skills"][skill] = b["skills"].get(skill, 0) + 1
+        band = price_band(rec["price"])
+        b["price_bands"][band] = b["price_bands"].get(band, 0) + 1
+        if rec["applicants"] is not None:
+            b["applicants"].append(rec["applicants"])
+        # 締切表示、または最新スナップショットより前に一覧から消えたものを「終了」とみなす
+        closed = rec["closed_at"] or (rec["last_seen"] if rec["last_seen"] < latest else None)
+        if closed:
+            hours = (datetime.fromisoformat(closed) - datetime.fromisoformat(rec["first_seen"])).total_seconds() / 3600
+            b["close_hours"].append(hours)
+
+    result = {}
+    for key in sorted(series):
+        b = series[key]
+        result[key] = {
+            "new_jobs": b["new_jobs"],
+            "skills": dict(sorted(b["skills"].items(), key=lambda x: x[1], reverse=True)),
+            "price_bands": {label: b["price_bands"].get(label, 0) for _, label in PRICE_BANDS + [(None, "不明")]},
+            "avg_applicants": round(statistics.mean(b["applicants"]), 1) if b["applicants"] else None,
+            "median_hours_to_close": round(statistics.median(b["close_hours"]), 1) if b["close_hours"] else None,
+        }
+    return result
+
+
+def print_series(series: dict, top: int = 5):
+    totals = {}
+    for b in series.values():
+        for skill, count in b["skills"].items():
+            totals[skill] = totals.get(skill, 0) + count
+    skills = [s for s, _ in sorted(totals.items(), key=lambda x: x[1], reverse=True)[:top]]
+    bands = [label for _, label in PRICE_BANDS]
+
+    print(f"{'期間':<11} {'新規':>5} {'応募平均':>7} {'終了h中央':>8}  "
+          + " ".join(f"{s:>8}" for s in skills) + "  | " + " ".join(f"{b:>8}" for b in bands))
+    for key, b in series.items():
+        apps = "-" if b["avg_applicants"] is None else f"{b['avg_applicants']:.1f}"
+        close = "-" if b["median_hours_to_close"] is None else f"{b['median_hours_to_close']:.0f}"
+        print(f"{key:<11} {b['new_jobs']:>5} {apps:>7} {close:>8}  "
+              + " ".join(f"{b['skills'].get(s, 0):>8}" for s in skills)
+              + "  | " + " ".join(f"{b['price_bands'][band]:>8}" for band in bands))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スナップショット履歴の時系列分析")
+    parser.add_argument("--bucket", choices=["day", "week"], default="week")
+    parser.add_argument("--since", help="この日付以降に初出した案件のみ（例: 2025-08-01）")
+    parser.add_argument("--skills", help="対象スキル（カンマ区切り・大文字小文字を区別しない）")
+    parser.add_argument("--top", type=int, default=5, help="表に出すスキル数")
+    parser.add_argument("--workers", type=int, help="並列プロセス数（既定: CPUコア数）")
+    parser.add_argument("--cache", default=CACHE_PATH, help="部分集計キャッシュ（空文字で無効）")
+    parser.add_argument("--json", help="時系列をJSONで出力")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    files = list_snapshot_paths()
+    partials, read_count = collect_partials(files, args.cache or None, args.workers)
+    history = merge_partials(partials)
+    skills = [s.strip() for s in args.skills.split(",")] if args.skills else None
+    series = build_time_series(history, args.bucket, skills, args.since)
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 {len(files)}ファイル（新規読込 {read_count}） / 重複除去後 {len(history)}件 / {elapsed:.2f}秒")
+    print_series(series, args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(series, f, ensure_ascii=False, indent=2)
+        print(f"💾 時系列を保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+案件レコード（__slots__ ベースの軽量モデル）
+
+1案件 = 14キーの dict をやめ、固定スロットのオブジェクトで保持します。
+- 優先度・カテゴリなど繰り返し現れる文字列は intern して共有
+- スキルマッチ（skill, priority）は組み合わせごとに1インスタンスを共有
+- 案件IDは int で保持し、標準形のURLは保存せずIDから復元
+- to_dict / from_dict で既存の all_jobs_*.json 形式と相互に無損失変換
+
+ベンチマーク:
+    python job_model.py                 # 直近のスナップショットで計測
+    python job_model.py all_jobs_*.json # 指定ファイルで計測
+"""
+
+import re
+import sys
+
+LANCERS_DETAIL_PREFIX = "https://www.lancers.jp/work/detail/"
+PRIORITY_LEVELS = ("超高優先度", "高優先度", "中優先度", "低優先度", "最低優先度")
+
+# JSON上のキー順（既存スナップショットと同じ並び）
+JOB_FIELDS = (
+    "title", "link", "price", "deadline", "applicant_count", "recruitment_count",
+    "client_name", "status", "urgency", "category", "skill_matches", "skill_count",
+    "priority_score", "scraped_at",
+)
+OPTIONAL_FIELDS = ("previous_ids", "relevance")  # 値があるときだけ出力する項目
+
+_JOB_ID_PATTERN = re.compile(r"/work/detail/(\d+)")
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def parse_job_id(link: str):
+    """案件URLから数値IDを取り出す（取れなければ None）"""
+    m = _JOB_ID_PATTERN.search(link or "")
+    return int(m.group(1)) if m else None
+
+
+class SkillMatch:
+    """スキルマッチ1件。同じ (skill, priority) は同一インスタンスを共有する"""
+    __slots__ = ("skill", "priority")
+    _pool = {}
+
+    def __init__(self, skill: str, priority: str):
+        self.skill = _intern(skill)
+        self.priority = _intern(priority)
+
+    @classmethod
+    def of(cls, skill: str, priority: str) -> "SkillMatch":
+        key = (skill, priority)
+        match = cls._pool.get(key)
+        if match is None:
+            match = cls._pool[key] = cls(skill, priority)
+        return match
+
+    def to_dict(self) -> dict:
+        return {"skill": self.skill, "priority": self.priority}
+
+    def __eq__(self, other):
+        return isinstance(other, SkillMatch) and (self.skill, self.priority) == (other.skill, other.priority)
+
+    def __hash__(self):
+        return hash((self.skill, self.priority))
+
+    def __repr__(self):
+        return f"SkillMatch({self.skill!r}, {self.priority!r})"
+
+
+class Job:
+    """案件1件"""
+    __slots__ = (
+        "job_id", "_link", "title", "price", "deadline", "applicant_count", "recruitment_count",
+        "client_name", "status", "urgency", "category", "skill_matches", "priority_score",
+        "scraped_at", "previous_ids", "relevance", "extra",
+    )
+
+    def __init__(self, title: str, link: str, price: str = "価格情報なし", deadline: str = "期限情報なし",
+                 applicant_count: str = "0", recruitment_count: str = "1",
+                 client_name: str = "依頼者情報なし", status: str = "募集中", urgency: bool = False,
+                 category: str = "システム開発", skill_matches=(), priority_score: int = 0,
+                 scraped_at: str = "", previous_ids=(), relevance: float = None, extra: dict = None):
+        self.title = title
+        self.link = link
+        self.price = _intern(price)
+        self.deadline = _intern(deadline)
+        self.applicant_count = _intern(applicant_count)
+        self.recruitment_count = _intern(recruitment_count)
+        self.client_name = _intern(client_name)
+        self.status = _intern(status)
+        self.urgency = urgency
+        self.category = _intern(category)
+        self.skill_matches = tuple(skill_matches)
+        self.priority_score = priority_score
+        self.scraped_at = scraped_at
+        self.previous_ids = tuple(previous_ids)  # 再掲載前の案件ID
+        self.relevance = relevance  # TF-IDF 関連度（RANKING_ENGINE=tfidf のときのみ）
+        self.extra = extra or None  # 既知フィールド以外のキー（無損失変換用）
+
+    # ---- URL は標準形ならIDから復元する ----
+    @property
+    def link(self) -> str:
+        if self._link is not None:
+            return self._link
+        return f"{LANCERS_DETAIL_PREFIX}{self.job_id}"
+
+    @link.setter
+    def link(self, value: str):
+        self.job_id = parse_job_id(value)
+        canonical = self.job_id is not None and value == f"{LANCERS_DETAIL_PREFIX}{self.job_id}"
+        self._link = None if canonical else value
+
+    @property
+    def skill_count(self) -> int:
+        if self.extra and "skill_count" in self.extra:
+            return self.extra["skill_count"]
+        return len(self.skill_matches)
+
+    # ---- JSON 相互変換 ----
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        known = {k: data[k] for k in JOB_FIELDS + OPTIONAL_FIELDS if k in data and k != "skill_count"}
+        extra = {k: v for k, v in data.items() if k not in JOB_FIELDS + OPTIONAL_FIELDS}
+        matches = [SkillMatch.of(m["skill"], m["priority"]) for m in known.pop("skill_matches", [])]
+        if "skill_count" in data and data["skill_count"] != len(matches):
+            extra["skill_count"] = data["skill_count"]
+        return cls(skill_matches=matches, extra=extra, **known)
+
+    @classmethod
+    def coerce(cls, job) -> "Job":
+        return job if isinstance(job, cls) else cls.from_dict(job)
+
+    def to_dict(self) -> dict:
+        data = {
+            "title": self.title,
+            "link": self.link,
+            "price": self.price,
+            "deadline": self.deadline,
+            "applicant_count": self.applicant_count,
+            "recruitment_count": self.recruitment_count,
+            "client_name": self.client_name,
+            "status": self.status,
+            "urgency": self.urgency,
+            "category": self.category,
+            "skill_matches": [m.to_dict() for m in self.skill_matches],
+            "skill_count": self.skill_count,
+            "priority_score": self.priority_score,
+            "scraped_at": self.scraped_at,
+        }
+        if self.previous_ids:
+            data["previous_ids"] = list(self.previous_ids)
+        if self.relevance is not None:
+            data["relevance"] = self.relevance
+        if self.extra:
+            data.update((k, v) for k, v in self.extra.items() if k not in data)
+        return data
+
+    def __repr__(self):
+        return f"Job({self.job_id}, {self.title[:20]!r}, score={self.priority_score})"
+
+
+def jobs_to_dicts(jobs) -> list:
+    return [Job.coerce(job).to_dict() for job in jobs]
+
+
+def jobs_from_dicts(items) -> list:
+    return [Job.from_dict(item) for item in items]
+
+
+# =============================
+# ベンチマーク
+# =============================
+def _benchmark(paths):
+    import json
+    import timeit
+    import tracemalloc
+
+    raw = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            raw.append(f.read())
+
+    def measure(build):
+        tracemalloc.start()
+        kept = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return kept, current
+
+    dict_jobs, dict_bytes = measure(lambda: [j for text in raw for j in json.loads(text)["jobs"]])
+    SkillMatch._pool.clear()
+    model_jobs, model_bytes = measure(lambda: [Job.from_dict(j) for text in raw for j in json.loads(text)["jobs"]])
+
+    assert [j.to_dict() for j in model_jobs] == dict_jobs, "to_dict が元データと一致しません"
+    n = len(dict_jobs)
+    print(f"📊 {len(paths)}ファイル / {n}件（往復変換は無損失）")
+    print(f"   dict : {dict_bytes / n:8.0f} bytes/件")
+    print(f"   Job  : {model_bytes / n:8.0f} bytes/件 （{dict_bytes / max(model_bytes, 1):.1f}倍削減）")
+
+    t_dict = timeit.timeit(lambda: [(j["priority_score"], j["title"], j["status"]) for j in dict_jobs], number=50)
+    t_model = timeit.timeit(lambda: [(j.priority_score, j.title, j.status) for j in model_jobs], number=50)
+    print(f"   属性アクセス: dict {t_dict * 1000:.1f}ms / Job {t_model * 1000:.1f}ms （50回×{n}件）")
+
+
+if __name__ == "__main__":
+    import glob
+    targets = sys.argv[1:] or sorted(glob.glob("all_jobs_*.json"))[-200:]
+    _benchmark(targets)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全スナップショットの案件検索（SQLite FTS5）
+
+全スナップショットの案件を案件IDごとに1行にまとめ、タイトルを FTS5（trigram）で
+全文検索できる索引 .job_search.db を作ります。スキル・予算・日付の条件と組み合わせて、
+数ミリ秒で結果を返します。
+- 索引は検索のたびに未取り込みのスナップショットだけを追加（取り込み済みの名前を記録）
+- 3文字未満のキーワード（"AI" など）は LIKE で照合
+- スキルはスキルマッチ結果（skill_matches）で完全一致（大文字小文字を区別しない）
+
+使い方:
+    python job_search.py django --min-price 300000 --since 3m
+    python job_search.py --skill python --skill api --open --limit 50
+    python job_search.py チャットボット --since 2025-08-01 --until 2025-09-01
+    python job_search.py --rebuild
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from history_analytics import snapshot_time
+from job_model import parse_job_id
+from job_stats import parse_max_price
+from snapshot_store import iter_snapshot_jobs, list_snapshot_paths, snapshot_name
+
+INDEX_PATH = ".job_search.db"
+SCHEMA_VERSION = 1
+
+_PRICE_NUMBER = re.compile(r"(\d+)")
+_RELATIVE = re.compile(r"^(\d+)\s*([dwm])$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      INTEGER PRIMARY KEY,
+    title       TEXT NOT NULL,
+    link        TEXT NOT NULL,
+    price       TEXT,
+    min_price   INTEGER,
+    max_price   INTEGER,
+    applicants  INTEGER,
+    status      TEXT,
+    score       INTEGER,
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_max_price ON jobs(max_price);
+CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs(last_seen);
+CREATE TABLE IF NOT EXISTS job_skills (
+    job_id INTEGER NOT NULL,
+    skill  TEXT NOT NULL,
+    PRIMARY KEY (skill, job_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, content='jobs', content_rowid='job_id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, title) VALUES (new.job_id, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF title ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title) VALUES ('delete', old.job_id, old.title);
+    INSERT INTO jobs_fts(rowid, title) VALUES (new.job_id, new.title);
+END;
+CREATE TABLE IF NOT EXISTS indexed_snapshots (name TEXT PRIMARY KEY);
+"""
+
+
+def parse_min_price(price_text: str):
+    if not price_text or "円" not in price_text:
+        return None
+    m = _PRICE_NUMBER.search(price_text.replace(",", ""))
+    return int(m.group(1)) if m else None
+
+
+def parse_date(value: str, now: datetime = None) -> str:
+    """'2025-08-01' または相対指定（'90d' / '12w' / '3m'）を ISO 日付文字列にする"""
+    now = now or datetime.now()
+    m = _RELATIVE.match(value.strip().lower())
+    if m:
+        n, unit = int(m.group(1)), m.group(2)
+        days = {"d": 1, "w": 7, "m": 30}[unit] * n
+        return (now - timedelta(days=days)).isoformat(timespec="minutes")
+    return datetime.fromisoformat(value).isoformat(timespec="minutes")
+
+
+# =============================
+# 索引
+# =============================
+class JobSearchIndex:
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self.conn.close()
+            os.remove(path)
+            self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def update(self) -> int:
+        """未取り込みのスナップショットだけを追加し、取り込んだファイル数を返す"""
+        done = {row[0] for row in self.conn.execute("SELECT name FROM indexed_snapshots")}
+        pending = [p for p in list_snapshot_paths() if snapshot_name(p) not in done]
+        with self.conn:
+            for path in pending:
+                self._add_snapshot(path)
+        return len(pending)
+
+    def _add_snapshot(self, path):
+        seen_at = snapshot_time(path)
+        for job in iter_snapshot_jobs(path):
+            job_id = parse_job_id(job.get("link"))
+            if job_id is None:
+                continue
+            applicants = str(job.get("applicant_count", ""))
+            row = (
+                job.get("title", ""), job["link"], job.get("price", ""),
+                parse_min_price(job.get("price", "")), parse_max_price(job.get("price", "")),
+                int(applicants) if applicants.isdigit() else None,
+                job.get("status", ""), job.get("priority_score", 0),
+            )
+            existing = self.conn.execute(
+                "SELECT first_seen, last_seen FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if existing is None:
+                self.conn.execute(
+                    "INSERT INTO jobs (title, link, price, min_price, max_price, applicants, status, score,"
+                    " first_seen, last_seen, job_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row + (seen_at, seen_at, job_id),
+                )
+            elif seen_at >= existing[1]:
+                # 新しい観測で内容を更新（タイトルが変わったときだけ全文索引も更新される）
+                self.conn.execute(
+                    "UPDATE jobs SET title = ?, link = ?, price = ?, min_price = ?, max_price = ?, applicants = ?,"
+                    " status = ?, score = ?, last_seen = ? WHERE job_id = ?",
+                    row + (seen_at, job_id),
+                )
+            elif seen_at < existing[0]:
+                self.conn.execute("UPDATE jobs SET first_seen = ? WHERE job_id = ?", (seen_at, job_id))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO job_skills (skill, job_id) VALUES (?, ?)",
+                [(m["skill"].lower(), job_id) for m in job.get("skill_matches", [])],
+            )
+        self.conn.execute("INSERT INTO indexed_snapshots (name) VALUES (?)", (snapshot_name(path),))
+
+    # ---- 検索 ----
+    def search(self, keywords=(), skills=(), min_price: int = None, max_price: int = None,
+               since: str = None, until: str = None, open_only: bool = False, limit: int = 20):
+        clauses, params = [], []
+        long_terms = [k for k in keywords if len(k) >= 3]
+        for term in keywords:
+            if len(term) < 3:
+                clauses.append("j.title LIKE ?")
+                params.append(f"%{term}%")
+        if long_terms:
+            clauses.append("j.job_id IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)")
+            params.append(" AND ".join('"' + t.replace('"', '""') + '"' for t in long_terms))
+        for skill in skills:
+            clauses.append("j.job_id IN (SELECT job_id FROM job_skills WHERE skill = ?)")
+            params.append(skill.lower())
+        if min_price is not None:
+            clauses.append("j.max_price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("j.min_price <= ?")
+            params.append(max_price)
+        if since:
+            clauses.append("j.last_seen >= ?")
+            params.append(since)
+        if until:
+            clauses.append("j.first_seen < ?")
+            params.append(until)
+        if open_only:
+            clauses.append("j.status NOT LIKE '%終了%' AND j.status NOT LIKE '%締切%' AND j.status NOT LIKE '%完了%'")
+        where = " AND ".join(clauses) or "1"
+        total = self.conn.execute(f"SELECT COUNT(*) FROM jobs j WHERE {where}", params).fetchone()[0]
+        rows = self.conn.execute(
+            "SELECT j.job_id, j.title, j.price, j.score, j.first_seen, j.last_seen, j.status, j.link"
+            f" FROM jobs j WHERE {where} ORDER BY j.last_seen DESC, j.score DESC LIMIT ?",
+            params + [limit],
+        ).fetchall()
+        return total, rows
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全スナップショットの案件検索")
+    parser.add_argument("keywords", nargs="*", help="タイトルのキーワード（すべて含むもの）")
+    parser.add_argument("--skill", action="append", default=[], help="スキルマッチで絞り込み（複数指定可）")
+    parser.add_argument("--min-price", type=int, help="予算上限がこの金額以上")
+    parser.add_argument("--max-price", type=int, help="予算下限がこの金額以下")
+    parser.add_argument("--since", help="この日以降に掲載されていたもの（例: 2025-08-01 / 90d / 3m）")
+    parser.add_argument("--until", help="この日より前に初出したもの")
+    parser.add_argument("--open", action="store_true", help="募集中のもののみ")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="索引を作り直す")
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(args.index):
+        os.remove(args.index)
+    index = JobSearchIndex(args.index)
+    started = time.perf_counter()
+    added = index.update()
+    if added:
+        print(f"🗂️ 索引に {added}スナップショットを追加（{time.perf_counter() - started:.2f}秒 / 計 {index.count()}件）")
+
+    started = time.perf_counter()
+    total, rows = index.search(
+        args.keywords, args.skill, args.min_price, args.max_price,
+        parse_date(args.since) if args.since else None,
+        parse_date(args.until) if args.until else None,
+        args.open, args.limit,
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"🔎 {total}件ヒット（{elapsed:.1f}ms）")
+    for job_id, title, price, score, first_seen, last_seen, status, link in rows:
+        print(f"   {first_seen[:10]}〜{last_seen[:10]}  {score:>4}  {price[:28]:<28}  {title[:50]}")
+        print(f"      🔗 {link}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+案件統計の集計
+
+- RunStats   : 1回の実行分の統計を案件リストの1回の走査で計算
+- TrendStore : 実行をまたいだ日次・週次の累積集計（skill_trends.json）を差分更新
+  各実行はスナップショット名（all_jobs_YYYYMMDD_HHMM）で記録し、同じ実行を2度加えない
+  skill_trends.json はリポジトリに含めず、無ければ既存のスナップショットから作成する
+
+過去スナップショットを読み直さずにトレンドを確認できます:
+    python job_stats.py                 # 週次トレンド
+    python job_stats.py --daily --top 5 # 日次トレンド（上位5スキル）
+    python job_stats.py --backfill      # 既存のスナップショットから初期化
+"""
+
+import argparse
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+
+from job_model import Job
+from snapshot_store import list_snapshot_paths, load_snapshot, snapshot_name
+
+TRENDS_PATH = "skill_trends.json"
+DAILY_RETENTION_DAYS = 180  # 日次バケットの保持日数（週次は全期間）
+
+_PRICE_NUMBER = re.compile(r"\d+")
+
+
+def parse_max_price(price_text: str):
+    """価格表記の上限額（円）。読み取れなければ None"""
+    if not price_text or "円" not in price_text:
+        return None
+    numbers = _PRICE_NUMBER.findall(price_text.replace(",", ""))
+    return max(int(n) for n in numbers) if numbers else None
+
+
+class RunStats:
+    """1回の実行分の統計（案件リストは1回だけ走査する）"""
+
+    def __init__(self, jobs):
+        skill_counts = {}
+        total = no_skill = multi_skill = high_priority = 0
+        urgent = priced = price_sum = 0
+        for job in jobs:
+            total += 1
+            count = job.skill_count
+            if count == 0:
+                no_skill += 1
+            elif count >= 2:
+                multi_skill += 1
+            if job.priority_score >= 10:
+                high_priority += 1
+            if job.urgency:
+                urgent += 1
+            price = parse_max_price(job.price)
+            if price is not None:
+                priced += 1
+                price_sum += price
+            for match in job.skill_matches:
+                skill_counts[match.skill] = skill_counts.get(match.skill, 0) + 1
+
+        self.total_jobs = total
+        self.no_skill_match = no_skill
+        self.multi_skill_match = multi_skill
+        self.high_priority = high_priority
+        self.urgent = urgent
+        self.priced_jobs = priced
+        self.price_sum = price_sum
+        self.skill_counts = skill_counts
+
+    @property
+    def skill_match_rate(self) -> float:
+        if self.total_jobs == 0:
+            return 0
+        return round((self.total_jobs - self.no_skill_match) / self.total_jobs * 100, 1)
+
+    @property
+    def average_price(self):
+        return round(self.price_sum / self.priced_jobs) if self.priced_jobs else None
+
+    @property
+    def skill_summary(self) -> dict:
+        return dict(sorted(self.skill_counts.items(), key=lambda x: x[1], reverse=True))
+
+    @property
+    def skill_distribution(self) -> dict:
+        return {
+            "total_jobs": self.total_jobs,
+            "no_skill_match": self.no_skill_match,
+            "multi_skill_match": self.multi_skill_match,
+            "high_priority": self.high_priority,
+            "skill_match_rate": self.skill_match_rate,
+        }
+
+
+# =============================
+# 実行をまたいだ累積集計
+# =============================
+def _empty_bucket() -> dict:
+    return {"runs": 0, "jobs": 0, "matched_jobs": 0, "priced_jobs": 0, "price_sum": 0, "skills": {}}
+
+
+def run_name(timestamp: datetime) -> str:
+    """実行の記録名（save_data が保存するスナップショット名と同じ）"""
+    return f"all_jobs_{timestamp:%Y%m%d_%H%M}"
+
+
+def _add_to_bucket(bucket: dict, stats: RunStats):
+    bucket["runs"] += 1
+    bucket["jobs"] += stats.total_jobs
+    bucket["matched_jobs"] += stats.total_jobs - stats.no_skill_match
+    bucket["priced_jobs"] += stats.priced_jobs
+    bucket["price_sum"] += stats.price_sum
+    skills = bucket["skills"]
+    for skill, count in stats.skill_counts.items():
+        skills[skill] = skills.get(skill, 0) + count
+
+
+def day_key(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%d")
+
+
+def week_key(ts: datetime) -> str:
+    year, week, _ = ts.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class TrendStore:
+    """日次・週次バケットの累積値（合計のみ保持し、率や平均は表示時に算出）"""
+
+    def __init__(self, path: str = TRENDS_PATH, load: bool = True):
+        self.path = Path(path)
+        self.daily = {}
+        self.weekly = {}
+        if load and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.daily = data.get("daily", {})
+                self.weekly = data.get("weekly", {})
+            except Exception as e:
+                print(f"⚠️ トレンドファイル読み込みエラー（作り直します）: {e}")
+
+    def add_run(self, stats: RunStats, timestamp: datetime, name: str = None) -> bool:
+        """
+        1回分を加える。name（既定はタイムスタンプから作るスナップショット名）が記録済みなら何もせず False。
+        記録は全期間残る週次バケットに持つ（日次バケットの削除後に同じ実行を加えても二重に数えない）
+        """
+        name = name or run_name(timestamp)
+        weekly = self.weekly.setdefault(week_key(timestamp), _empty_bucket())
+        recorded = weekly.setdefault("snapshots", [])
+        if name in recorded:
+            return False
+        recorded.append(name)
+        _add_to_bucket(weekly, stats)
+        cutoff = day_key(datetime.fromordinal(timestamp.toordinal() - DAILY_RETENTION_DAYS))
+        if day_key(timestamp) >= cutoff:
+            _add_to_bucket(self.daily.setdefault(day_key(timestamp), _empty_bucket()), stats)
+        for key in [k for k in self.daily if k < cutoff]:
+            del self.daily[key]
+        return True
+
+    def save(self):
+        data = {
+            "daily": dict(sorted(self.daily.items())),
+            "weekly": dict(sorted(self.weekly.items())),
+        }
+        self.path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    def report(self, weekly: bool = True, top: int = 10):
+        buckets = self.weekly if weekly else self.daily
+        if not buckets:
+            print("📭 トレンドデータがありません")
+            return
+        totals = {}
+        for bucket in buckets.values():
+            for skill, count in bucket["skills"].items():
+                totals[skill] = totals.get(skill, 0) + count
+        skills = [s for s, _ in sorted(totals.items(), key=lambda x: x[1], reverse=True)[:top]]
+
+        print(f"{'期間':<11} {'実行':>4} {'件/回':>6} {'一致率':>6} {'平均価格':>10}  " + " ".join(f"{s:>8}" for s in skills))
+        for key, b in sorted(buckets.items()):
+            runs = b["runs"] or 1
+            rate = f"{b['matched_jobs'] / b['jobs'] * 100:.1f}%" if b["jobs"] else "-"
+            avg = f"{b['price_sum'] // b['priced_jobs']:,}" if b["priced_jobs"] else "-"
+            per_run = " ".join(f"{b['skills'].get(s, 0) / runs:8.1f}" for s in skills)
+            print(f"{key:<11} {b['runs']:>4} {b['jobs'] / runs:>6.1f} {rate:>6} {avg:>10}  {per_run}")
+
+
+def update_trends(stats: RunStats, timestamp: datetime, path: str = TRENDS_PATH):
+    """今回の実行を加えて保存（ファイルが無ければ先に既存のスナップショットから作る）"""
+    store = TrendStore(path) if Path(path).exists() else backfill(path)
+    if store.add_run(stats, timestamp):
+        store.save()
+    return store
+
+
+def backfill(path: str = TRENDS_PATH):
+    """既存スナップショットから累積集計を作り直す"""
+    store = TrendStore(path, load=False)
+    files = list_snapshot_paths()
+    for file in files:
+        data = load_snapshot(file)
+        jobs = [Job.from_dict(j) for j in data.get("jobs", [])]
+        store.add_run(RunStats(jobs), datetime.fromisoformat(data["timestamp"]), snapshot_name(file))
+    store.save()
+    print(f"✅ {len(files)}件のスナップショットから {path} を作成しました")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スキル需要トレンドの表示")
+    parser.add_argument("--daily", action="store_true", help="日次で表示（既定は週次）")
+    parser.add_argument("--top", type=int, default=10, help="表示するスキル数")
+    parser.add_argument("--path", default=TRENDS_PATH)
+    parser.add_argument("--backfill", action="store_true", help="既存のスナップショットから作り直す")
+    args = parser.parse_args()
+    store = backfill(args.path) if args.backfill else TrendStore(args.path)
+    store.report(weekly=not args.daily, top=args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+最新の案件リストを返すローカル読み取りAPI（aiohttp）
+
+CompleteJobsNotifier が保存した最新スナップショット（並び替え済み）をそのまま配信します。
+- GET /jobs?page=1&per_page=50  … 順位順の案件（ページ分割）
+- GET /jobs/{id}                … 案件1件
+- GET /stats                    … スキル集計・スキル分布
+応答本文はスナップショットの読み込み時に JSON と gzip を作っておき、ETag を付けて返します。
+If-None-Match が一致すれば 304 を返すので、ダッシュボードやスクリプトは頻繁にポーリングしても
+ほとんどコストがかかりません。新しいスナップショットは数秒ごとの確認で自動的に読み込まれます。
+
+使い方:
+    python jobs_api.py --port 8080
+    curl -s --compressed http://127.0.0.1:8080/jobs?page=2
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import time
+
+from aiohttp import web
+
+from job_model import parse_job_id
+from snapshot_store import list_snapshot_paths, load_snapshot, snapshot_name
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+RELOAD_CHECK_SEC = 5.0      # 新しいスナップショットの確認間隔
+MAX_CACHED_BODIES = 512     # 既定以外のページサイズ・案件単位の応答の保持数
+
+
+class CachedBody:
+    """JSON本文・gzip本文・ETag の組"""
+    __slots__ = ("raw", "gz", "etag")
+
+    def __init__(self, payload, version: str):
+        self.raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.gz = gzip.compress(self.raw, compresslevel=6, mtime=0)
+        self.etag = f'"{version}-{hashlib.sha1(self.raw).hexdigest()[:16]}"'
+
+
+class JobsApi:
+    def __init__(self, root: str = "."):
+        self.root = root
+        self.snapshot = None
+        self.jobs = []
+        self.by_id = {}
+        self.bodies = {}
+        self._checked_at = 0.0
+
+    # ---- スナップショットの読み込みと事前計算 ----
+    def refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < RELOAD_CHECK_SEC:
+            return
+        self._checked_at = now
+        paths = list_snapshot_paths(self.root)
+        if not paths:
+            return
+        name = snapshot_name(paths[-1])
+        if name == self.snapshot and not force:
+            return
+        data = load_snapshot(paths[-1])
+        self.snapshot = name
+        self.jobs = data.get("jobs", [])
+        self.by_id = {parse_job_id(j.get("link")): j for j in self.jobs}
+        self.meta = {"snapshot": name, "timestamp": data.get("timestamp"), "count": len(self.jobs)}
+        self.bodies = {}
+        # よく使う応答（既定サイズの全ページと統計）は先に作っておく
+        for page in range(1, self.page_count(DEFAULT_PER_PAGE) + 1):
+            self.body(("jobs", page, DEFAULT_PER_PAGE))
+        self.body(("stats",), stats=data)
+        print(f"📦 スナップショットを読み込み: {name}（{len(self.jobs)}件）")
+
+    def page_count(self, per_page: int) -> int:
+        return max(1, -(-len(self.jobs) // per_page))
+
+    def body(self, key: tuple, stats: dict = None) -> CachedBody:
+        cached = self.bodies.get(key)
+        if cached is not None:
+            return cached
+        if key[0] == "jobs":
+            _, page, per_page = key
+            start = (page - 1) * per_page
+            payload = dict(self.meta, page=page, per_page=per_page, pages=self.page_count(per_page),
+                           jobs=self.jobs[start:start + per_page])
+        elif key[0] == "job":
+            payload = dict(self.meta, job=self.by_id[key[1]])
+        else:
+            payload = dict(self.meta, skill_summary=stats.get("skill_summary", {}),
+                           skill_distribution=stats.get("skill_distribution", {}))
+        if len(self.bodies) >= MAX_CACHED_BODIES:
+            # 事前計算した分（既定ページ・統計）は残す
+            for k in [k for k in self.bodies if k[0] == "job" or (k[0] == "jobs" and k[2] != DEFAULT_PER_PAGE)]:
+                del self.bodies[k]
+        cached = self.bodies[key] = CachedBody(payload, self.snapshot)
+        return cached
+
+    # ---- HTTP ----
+    @staticmethod
+    def respond(request, cached: CachedBody) -> web.Response:
+        headers = {"ETag": cached.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if cached.etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers=headers)
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return web.Response(body=cached.gz, content_type="application/json", charset="utf-8", headers=headers)
+        return web.Response(body=cached.raw, content_type="application/json", charset="utf-8", headers=headers)
+
+    async def handle_jobs(self, request):
+        self.refresh()
+        try:
+            page = max(1, int(request.query.get("page", "1")))
+            per_page = min(MAX_PER_PAGE, max(1, int(request.query.get("per_page", DEFAULT_PER_PAGE))))
+        except ValueError:
+            raise web.HTTPBadRequest(text="page / per_page は整数で指定してください")
+        if page > self.page_count(per_page):
+            raise web.HTTPNotFound(text="ページがありません")
+        return self.respond(request, self.body(("jobs", page, per_page)))
+
+    async def handle_job(self, request):
+        self.refresh()
+        try:
+            job_id = int(request.match_info["job_id"])
+        except ValueError:
+            raise web.HTTPBadRequest(text="案件IDは数値で指定してください")
+        if job_id not in self.by_id:
+            raise web.HTTPNotFound(text="最新の案件リストにありません")
+        return self.respond(request, self.body(("job", job_id)))
+
+    async def handle_stats(self, request):
+        self.refresh()
+        return self.respond(request, self.bodies[("stats",)])
+
+    def app(self) -> web.Application:
+        self.refresh(force=True)
+        if self.snapshot is None:
+            raise FileNotFoundError("スナップショットがありません（先に fetch_lancers_improved.py を実行してください）")
+        app = web.Application()
+        app.router.add_get("/jobs", self.handle_jobs)
+        app.router.add_get("/jobs/{job_id}", self.handle_job)
+        app.router.add_get("/stats", self.handle_stats)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="最新の案件リストの読み取りAPI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--root", default=".", help="スナップショットのあるディレクトリ")
+    args = parser.parse_args()
+    web.run_app(JobsApi(args.root).app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+案件詳細ページの解析（RSS段階的取得の詳細取得・募集中の案件の再確認で共通）
+
+ページ全体のテキストからは探さず、その案件自身の要素からだけ項目を読みます
+（サイドバーの関連案件の「募集終了」や別案件の予算・提案数を拾わないため）。
+- 読まない範囲: DETAIL_EXCLUDE_SELECTORS（関連案件・おすすめ・サイドバーなど）と、
+  他の案件へのリンクを含む一覧カード（CARD_SELECTORS。ページの見出し h1 を含むものは除く）
+- 項目ごとに、見出しと値の組（dt/dd・th/td など。DETAIL_LABELS）→ 項目の要素（DETAIL_FIELD_SELECTORS）の順に探す
+- 急募はタイトル（h1）と案件自身のバッジ、募集終了は案件自身の状態の要素だけで判定する
+見つからない項目は返しません。
+
+使い方:
+    python lancers_detail.py fixtures/lancers_detail/9900002.html   # 保存したページの解析結果
+"""
+
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+
+from config import CARD_SELECTORS, DETAIL_EXCLUDE_SELECTORS, DETAIL_FIELD_SELECTORS, DETAIL_LABELS
+from job_model import parse_job_id
+
+_PRICE = re.compile(r"\d[\d,]*\s*円(?:\s*[~〜～]\s*\d[\d,]*\s*円)?(?:\s*/\s*(?:固定|時間))?")
+_DEADLINE = re.compile(r"(?:あと|残り)\s*\d+\s*(?:日|時間|分)")
+_NUMBER = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+URGENT_WORDS = ("急募", "緊急", "即日", "至急")
+
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_SKIP = {"script", "style", "template", "noscript"}
+_LABEL_TAGS = {"dt", "th"}
+_LABEL_CLASS = re.compile(r"(?:term|label|heading)\b", re.IGNORECASE)
+
+
+# =============================
+# HTML の木（標準ライブラリの HTMLParser で組み立てる）
+# =============================
+class Node:
+    __slots__ = ("tag", "attrs", "parent", "children")
+
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []  # Node または文字列
+
+    @property
+    def classes(self) -> list:
+        return self.attrs.get("class", "").split()
+
+    def elements(self):
+        return [c for c in self.children if isinstance(c, Node)]
+
+    def iter(self):
+        """自身と子孫の要素（文書順）"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.elements()))
+
+    def text(self) -> str:
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            else:
+                stack.extend(reversed(node.children))
+        return _WHITESPACE.sub(" ", " ".join(parts)).strip()
+
+    def next_element(self):
+        if self.parent is None:
+            return None
+        siblings = self.parent.elements()
+        index = next(i for i, c in enumerate(siblings) if c is self)
+        return siblings[index + 1] if index + 1 < len(siblings) else None
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self.stack = [self.root]
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.skipping:
+            if tag in _SKIP:
+                self.skipping += 1
+            return
+        if tag in _SKIP:
+            self.skipping = 1
+            return
+        node = Node(tag, {k: v or "" for k, v in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in _VOID:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        if not self.skipping and tag not in _SKIP:
+            self.stack[-1].children.append(Node(tag, {k: v or "" for k, v in attrs}, self.stack[-1]))
+
+    def handle_endtag(self, tag):
+        if self.skipping:
+            if tag in _SKIP:
+                self.skipping -= 1
+            return
+        # 閉じ忘れは開いている同名の要素まで遡って閉じる（対応する開始タグが無い終了タグは無視）
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                break
+
+    def handle_data(self, data):
+        if not self.skipping and data.strip():
+            self.stack[-1].children.append(data)
+
+
+def parse_html(markup: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(markup)
+    builder.close()
+    return builder.root
+
+
+# =============================
+# セレクタ（タグ・.class・#id・[属性]・[属性=値]（= *= ^= $=）と子孫結合・カンマ区切り）
+# =============================
+_COMPOUND = re.compile(r"([a-zA-Z][\w-]*|\*)?((?:\.[\w-]+|#[\w-]+|\[[^\]]+\])*)$")
+_PART = re.compile(r"\.([\w-]+)|#([\w-]+)|\[\s*([\w-]+)\s*(?:([*^$]?=)\s*['\"]?([^'\"\]]*)['\"]?)?\s*\]")
+
+
+def _parse_compound(text: str):
+    m = _COMPOUND.match(text)
+    if not m:
+        raise ValueError(f"未対応のセレクタ: {text}")
+    tag = None if m.group(1) in (None, "*") else m.group(1).lower()
+    classes, ids, attrs = [], [], []
+    for part in _PART.finditer(m.group(2)):
+        if part.group(1):
+            classes.append(part.group(1))
+        elif part.group(2):
+            ids.append(part.group(2))
+        else:
+            attrs.append((part.group(3), part.group(4), part.group(5) or ""))
+    return tag, classes, ids, attrs
+
+
+def _matches(node: Node, compound) -> bool:
+    tag, classes, ids, attrs = compound
+    if tag and node.tag != tag:
+        return False
+    if classes and not set(classes) <= set(node.classes):
+        return False
+    if ids and node.attrs.get("id") not in ids:
+        return False
+    for name, op, value in attrs:
+        actual = node.attrs.get(name)
+        if actual is None:
+            return False
+        if op == "=" and actual != value:
+            return False
+        if op == "*=" and value not in actual:
+            return False
+        if op == "^=" and not actual.startswith(value):
+            return False
+        if op == "$=" and not actual.endswith(value):
+            return False
+    return True
+
+
+class Selector:
+    def __init__(self, text: str):
+        self.text = text
+        self.alternatives = [[_parse_compound(p) for p in alt.split()] for alt in text.split(",")]
+
+    def matches(self, node: Node) -> bool:
+        return any(self._matches_chain(node, chain) for chain in self.alternatives)
+
+    @staticmethod
+    def _matches_chain(node: Node, chain) -> bool:
+        if not _matches(node, chain[-1]):
+            return False
+        ancestor = node.parent
+        for compound in reversed(chain[:-1]):
+            while ancestor is not None and not _matches(ancestor, compound):
+                ancestor = ancestor.parent
+            if ancestor is None:
+                return False
+            ancestor = ancestor.parent
+        return True
+
+
+_EXCLUDE = [Selector(s) for s in DETAIL_EXCLUDE_SELECTORS]
+_CARDS = [Selector(s) for s in CARD_SELECTORS]
+_FIELDS = {field: [Selector(s) for s in selectors] for field, selectors in DETAIL_FIELD_SELECTORS.items()}
+
+
+# =============================
+# 案件自身の範囲
+# =============================
+def _linked_job_ids(node: Node) -> set:
+    return {parse_job_id(n.attrs.get("href")) for n in node.iter() if n.tag == "a"} - {None}
+
+
+def own_elements(root: Node, job_id: int = None) -> list:
+    """案件自身の要素（関連案件・サイドバー・他の案件のカードの中を除く）を文書順に返す"""
+    heading = next((n for n in root.iter() if n.tag == "h1"), None)
+    result = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if any(s.matches(node) for s in _EXCLUDE):
+            continue
+        if node.tag != "#document" and any(s.matches(node) for s in _CARDS):
+            others = _linked_job_ids(node) - {job_id}
+            contains_heading = heading is not None and any(n is heading for n in node.iter())
+            if others and not contains_heading:
+                continue
+        result.append(node)
+        stack.extend(reversed(node.elements()))
+    return result
+
+
+# =============================
+# 項目の取り出し
+# =============================
+def _value(field: str, text: str):
+    """要素のテキストから項目の値を取り出す（読み取れなければ None）"""
+    if field == "price":
+        m = _PRICE.search(text)
+        return m.group(0) if m else None
+    if field == "deadline":
+        m = _DEADLINE.search(text)
+        return m.group(0) if m else None
+    if field in ("applicant_count", "recruitment_count"):
+        m = _NUMBER.search(text)
+        return m.group(0) if m else None
+    if field == "status":
+        if "募集終了" in text:
+            return "募集終了"
+        return "募集中" if "募集中" in text else None
+    if field == "urgency":
+        return True if any(w in text for w in URGENT_WORDS) else None
+    return None
+
+
+def _is_label(node: Node) -> bool:
+    return node.tag in _LABEL_TAGS or any(_LABEL_CLASS.search(c) for c in node.classes)
+
+
+def _labeled_values(elements) -> dict:
+    """見出しと値の組から項目を読む（見出しは DETAIL_LABELS のいずれかで始まるもの）"""
+    fields = {}
+    for node in elements:
+        if not _is_label(node):
+            continue
+        label = node.text()
+        value = node.next_element()
+        if value is None:
+            continue
+        for field, words in DETAIL_LABELS.items():
+            if field not in fields and any(label.startswith(w) for w in words):
+                found = _value(field, value.text())
+                if found is not None:
+                    fields[field] = found
+                break
+    return fields
+
+
+def parse_detail_page(markup: str, link: str = None) -> dict:
+    """詳細ページHTMLから、その案件自身の価格・期限・応募数・募集人数・状態・急募を取り出す（見つかったものだけ）"""
+    elements = own_elements(parse_html(markup), parse_job_id(link))
+    fields = _labeled_values(elements)
+    for field, selectors in _FIELDS.items():
+        if field in fields:
+            continue
+        for selector in selectors:
+            found = next((v for n in elements if selector.matches(n) and (v := _value(field, n.text())) is not None), None)
+            if found is not None:
+                fields[field] = found
+                break
+    return fields
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        link = f"https://www.lancers.jp/work/detail/{Path(path).stem}"  # ファイル名が案件IDなら他の案件と区別できる
+        print(f"{path}: {parse_detail_page(Path(path).read_text(encoding='utf-8'), link)}")
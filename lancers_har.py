@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lancers検索ページの記録/再生ハーネス
+
+実サイトへの通信をHARに記録し、Playwrightのルーティングで再生することで
+CompleteJobsNotifier.fetch_jobs をオフラインかつ決定的に実行します。
+
+使い方:
+    python lancers_har.py record                 # 実サイトを取得して HAR を保存
+    python lancers_har.py replay                 # HAR から再生（ネットワーク不要）
+    python lancers_har.py replay --out a.json    # 抽出結果を保存（修正前後の比較用）
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fetch_lancers_improved import CompleteJobsNotifier, HAR_PATH
+
+
+def _comparable(jobs):
+    """実行ごとに変わる項目（取得時刻）を除いた比較用データ"""
+    return [{k: v for k, v in job.to_dict().items() if k != "scraped_at"} for job in jobs]
+
+
+async def run(mode: str, har_path: str, out_path: str = None):
+    notifier = CompleteJobsNotifier(har_mode=mode, har_path=har_path)
+    started = time.perf_counter()
+    jobs = await notifier.fetch_jobs()
+    elapsed = time.perf_counter() - started
+
+    print(f"⏱️ fetch_jobs: {elapsed:.2f}秒 / {len(jobs)}件 ({mode})")
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(_comparable(jobs), f, ensure_ascii=False, indent=2)
+        print(f"💾 抽出結果を保存: {out_path}")
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lancers検索ページの記録/再生ハーネス")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--har", default=HAR_PATH, help=f"HARファイル（既定: {HAR_PATH}）")
+    parser.add_argument("--out", help="抽出結果のJSON出力先")
+    args = parser.parse_args()
+    asyncio.run(run(args.mode, args.har, args.out))
+
+
+if __name__ == "__main__":
+    main()
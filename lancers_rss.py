@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lancers RSS フィードの取得・解析（段階的取得の1段目）
+
+https://www.lancers.jp/work/rss は新着案件のタイトルとリンクを1回の小さなXMLで返します。
+ここでは
+- フィードの取得（URL または ローカルのXMLファイル）と解析
+- 説明文からの価格・期限・応募数の抽出（詳細ページは lancers_detail.py で案件自身の要素から読む）
+- 既読の案件IDの記録（rss_state.json）
+を扱い、ブラウザを使うかどうかの判断は CompleteJobsNotifier.fetch_jobs_tiered が行います。
+
+使い方:
+    python lancers_rss.py                              # 実フィードの新着を表示
+    python lancers_rss.py fixtures/lancers_rss.xml     # ローカルXMLで確認
+"""
+
+import html
+import json
+import re
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+
+from job_model import parse_job_id
+from lancers_detail import parse_detail_page
+
+DEFAULT_RSS_URL = "https://www.lancers.jp/work/rss"
+STATE_PATH = "rss_state.json"
+MAX_SEEN_IDS = 5000  # 既読IDの保持上限（古いものから捨てる）
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+_TAG = re.compile(r"<[^>]+>")
+_PRICE = re.compile(r"\d[\d,]*\s*円(?:\s*[~〜～]\s*\d[\d,]*\s*円)?(?:\s*/\s*(?:固定|時間))?")
+_DEADLINE = re.compile(r"(?:あと|残り)\s*\d+\s*(?:日|時間|分)")
+_APPLICANTS = re.compile(r"提案(?:数)?\s*[:：]?\s*(\d+)")
+_RECRUITMENT = re.compile(r"募集(?:人数)?\s*[:：]?\s*(\d+)\s*人")
+
+
+def is_local_source(source: str) -> bool:
+    return not source.startswith(("http://", "https://"))
+
+
+# =============================
+# 取得と解析
+# =============================
+async def fetch_feed(source: str = DEFAULT_RSS_URL, session: aiohttp.ClientSession = None) -> bytes:
+    """フィードXMLを取得（ローカルパス・file:// ならファイルを読む）"""
+    if is_local_source(source):
+        return Path(source.removeprefix("file://")).read_bytes()
+    owns_session = session is None
+    session = session or aiohttp.ClientSession(headers={"User-Agent": USER_AGENT})
+    try:
+        async with session.get(source, timeout=aiohttp.ClientTimeout(total=20)) as res:
+            res.raise_for_status()
+            return await res.read()
+    finally:
+        if owns_session:
+            await session.close()
+
+
+def parse_feed(xml_bytes: bytes) -> list:
+    """RSS 2.0 の item を [{job_id, title, link, description, published}] にする"""
+    root = ET.fromstring(xml_bytes)
+    items = []
+    for item in root.iter("item"):
+        link = (item.findtext("link") or "").strip()
+        job_id = parse_job_id(link)
+        if job_id is None:
+            continue
+        items.append({
+            "job_id": job_id,
+            "title": (item.findtext("title") or "").strip(),
+            "link": link,
+            "description": html_to_text(item.findtext("description") or ""),
+            "published": (item.findtext("pubDate") or "").strip(),
+        })
+    return items
+
+
+def html_to_text(markup: str) -> str:
+    return re.sub(r"\s+", " ", html.unescape(_TAG.sub(" ", markup))).strip()
+
+
+def parse_listing_text(text: str) -> dict:
+    """フィードの説明文（その案件だけの本文）から、一覧カード相当の項目を取り出す（見つかったものだけ）"""
+    fields = {}
+    if m := _PRICE.search(text):
+        fields["price"] = m.group(0)
+    if m := _DEADLINE.search(text):
+        fields["deadline"] = m.group(0)
+    if m := _APPLICANTS.search(text):
+        fields["applicant_count"] = m.group(1)
+    if m := _RECRUITMENT.search(text):
+        fields["recruitment_count"] = m.group(1)
+    if any(w in text for w in ("急募", "緊急", "即日", "至急")):
+        fields["urgency"] = True
+    if "募集終了" in text:
+        fields["status"] = "募集終了"
+    return fields
+
+
+async def fetch_detail_fields(session: aiohttp.ClientSession, link: str, local_dir: str = None) -> dict:
+    """
+    詳細ページを1回取得し、その案件自身の要素から項目を取り出す（ブラウザは使わない）。
+    local_dir を指定すると <local_dir>/<案件ID>.html を読む（ローカルXMLでの検証用）
+    """
+    if local_dir:
+        markup = (Path(local_dir) / f"{parse_job_id(link)}.html").read_text(encoding="utf-8")
+    else:
+        async with session.get(link, timeout=aiohttp.ClientTimeout(total=20)) as res:
+            res.raise_for_status()
+            markup = await res.text()
+    return parse_detail_page(markup, link)
+
+
+# =============================
+# 既読状態
+# =============================
+class FeedState:
+    def __init__(self, path: str = STATE_PATH):
+        self.path = path
+        self.seen = []
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            self.seen = [int(i) for i in data.get("seen_ids", [])]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ RSS状態ファイルの読み込みエラー（未読扱いで続行）: {e}")
+        self._seen_set = set(self.seen)
+
+    def unseen(self, items) -> list:
+        return [item for item in items if item["job_id"] not in self._seen_set]
+
+    def mark_seen(self, job_ids):
+        for job_id in job_ids:
+            if job_id not in self._seen_set:
+                self._seen_set.add(job_id)
+                self.seen.append(job_id)
+        self.seen = self.seen[-MAX_SEEN_IDS:]
+        self._seen_set = set(self.seen)
+
+    def save(self):
+        data = {"updated_at": datetime.now().isoformat(), "seen_ids": self.seen}
+        Path(self.path).write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_RSS_URL
+    feed = parse_feed(asyncio.run(fetch_feed(source)))
+    new_items = FeedState().unseen(feed)
+    print(f"✅ RSSからの取得件数: {len(feed)} 件（未読 {len(new_items)} 件）")
+    for entry in new_items:
+        print(f"- {entry['title']}\n  🔗 {entry['link']}  {parse_listing_text(entry['description'])}")
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スケール試験用の負荷生成ツール
+
+ローカルに以下の代替サーバーを立て、main() の全パイプラインを実行して
+ステージごとの所要時間とスループットを計測します。
+
+- Lancers検索ページの代替: N件の合成案件カード（スクロールで追加読み込み）
+  タイトル・価格は過去のスナップショットから採取
+- Teams Webhookの代替: 受信ペイロードを記録し、遅延や429（Retry-After 付き）を注入
+
+本体は案件数が増えなくなるまで読み込むので、--jobs の件数すべてがブラウザに読み込まれるはずです。
+読み込まれたカードが合成した件数に届かなかった場合は、計測が読み込みの上限で頭打ちになっているので
+終了コード 1 で失敗します。
+
+使い方:
+    python load_test.py --jobs 1000
+    python load_test.py --jobs 10000 --page-size 50 --teams-latency 2.0 --teams-429-rate 0.5
+"""
+
+import argparse
+import asyncio
+import html
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+from snapshot_store import iter_snapshot_jobs, list_snapshot_paths
+
+FALLBACK_TITLES = ["【Python】業務自動化ツールの開発", "ChatGPT API を使ったチャットボット開発"]
+FALLBACK_PRICES = ["50,000 円 ~ 100,000 円 / 固定"]
+
+
+# =============================
+# スナップショットからの素材採取
+# =============================
+def load_corpus():
+    """過去スナップショットから実在のタイトル・価格表記を集める"""
+    titles, prices = set(), set()
+    for path in list_snapshot_paths():
+        try:
+            for job in iter_snapshot_jobs(path):
+                if job.get("title"):
+                    titles.add(job["title"])
+                if job.get("price") and "円" in job["price"]:
+                    prices.add(job["price"])
+        except Exception:
+            continue
+    return sorted(titles) or FALLBACK_TITLES, sorted(prices) or FALLBACK_PRICES
+
+
+# =============================
+# Lancers検索ページの代替サーバー
+# =============================
+class SyntheticLancersServer:
+    PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>合成案件一覧</title></head>
+<body>
+<div id="job-list">{cards}</div>
+<button class="load-more" type="button">もっと見る</button>
+<script>
+  let nextPage = 2, loading = false, done = {done};
+  async function loadMore() {{
+    if (loading || done) return;
+    loading = true;
+    const res = await fetch("/api/cards?page=" + nextPage);
+    const body = await res.json();
+    document.getElementById("job-list").insertAdjacentHTML("beforeend", body.html);
+    nextPage += 1;
+    done = !body.has_more;
+    loading = false;
+  }}
+  window.addEventListener("scroll", () => {{
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 200) loadMore();
+  }});
+  document.querySelector(".load-more").addEventListener("click", loadMore);
+</script>
+</body></html>"""
+
+    def __init__(self, job_count: int, page_size: int = 25, seed: int = 0):
+        self.job_count = job_count
+        self.page_size = page_size
+        self.requests = 0
+        self.served_pages = set()  # 返したページ番号（ブラウザに読み込まれたカード数の算出用）
+        titles, prices = load_corpus()
+        rng = random.Random(seed)
+        self.cards = []
+        for i in range(job_count):
+            self.cards.append({
+                "id": 9000000 + i,
+                "title": rng.choice(titles),
+                "price": rng.choice(prices),
+                "deadline": f"あと{rng.randint(1, 14)}日",
+                "applicants": rng.randint(0, 30),
+                "recruitment": rng.randint(1, 3),
+            })
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.job_count // self.page_size))
+
+    @property
+    def served_cards(self) -> int:
+        return sum(len(self.cards[(p - 1) * self.page_size:p * self.page_size]) for p in self.served_pages)
+
+    def render_cards(self, page: int) -> str:
+        self.served_pages.add(page)
+        start = (page - 1) * self.page_size
+        parts = []
+        for c in self.cards[start:start + self.page_size]:
+            parts.append(
+                '<div class="c-media">'
+                f'<a href="/work/detail/{c["id"]}">{html.escape(c["title"])}</a>'
+                f'<span class="c-media__price">{html.escape(c["price"])}</span>'
+                f'<span class="c-media__deadline">{c["deadline"]}</span>'
+                f'<span class="c-media__applicant">提案 {c["applicants"]}人 / 募集 {c["recruitment"]}人</span>'
+                '</div>'
+            )
+        return "".join(parts)
+
+    async def handle_search(self, request):
+        self.requests += 1
+        body = self.PAGE_TEMPLATE.format(
+            cards=self.render_cards(1),
+            done="true" if self.page_count <= 1 else "false",
+        )
+        return web.Response(text=body, content_type="text/html")
+
+    async def handle_cards(self, request):
+        self.requests += 1
+        page = int(request.query.get("page", "1"))
+        return web.json_response({
+            "html": self.render_cards(page),
+            "has_more": page < self.page_count,
+        })
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/work/search/system", self.handle_search)
+        app.router.add_get("/api/cards", self.handle_cards)
+        return app
+
+
+# =============================
+# Teams Webhookの代替サーバー
+# =============================
+class StubTeamsWebhook:
+    def __init__(self, latency: float = 0.0, rate_429: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.rng = random.Random(seed)
+        self.payloads = []
+        self.statuses = []
+        self.response_times = []
+
+    async def handle(self, request):
+        started = time.perf_counter()
+        payload = await request.json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.rng.random() < self.rate_429:
+            status = 429
+            response = web.Response(status=429, text="Too Many Requests", headers={"Retry-After": "1"})
+        else:
+            status = 200
+            self.payloads.append(payload)
+            response = web.Response(text="1")
+        self.statuses.append(status)
+        self.response_times.append(time.perf_counter() - started)
+        return response
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/webhook", self.handle)
+        return app
+
+
+async def _start(app: web.Application):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+# =============================
+# ドライバ
+# =============================
+async def run_load_test(job_count: int, page_size: int, latency: float, rate_429: float, seed: int):
+    lancers = SyntheticLancersServer(job_count, page_size=page_size, seed=seed)
+    teams = StubTeamsWebhook(latency=latency, rate_429=rate_429, seed=seed)
+    lancers_runner, lancers_url = await _start(lancers.app())
+    teams_runner, teams_url = await _start(teams.app())
+
+    workdir = tempfile.mkdtemp(prefix="lancers_load_")
+    os.environ.update({
+        "LANCERS_SEARCH_URL": f"{lancers_url}/work/search/system",
+        "TEAMS_WEBHOOK_URL": f"{teams_url}/webhook",
+        "MAX_JOBS_TO_FETCH": str(job_count),
+        "BROWSER_SLOW_MO_MS": "0",  # 操作ごとの待機を除き、ステージ本来の所要時間を測る
+        "EXCEL_PATH": os.path.join(workdir, "案件情報.xlsx"),
+        "RULES_PATH": os.path.abspath(os.getenv("RULES_PATH", "rules.json")),  # 作業ディレクトリへ移る前に解決
+    })
+    cwd = os.getcwd()
+    os.chdir(workdir)  # スナップショットJSONは作業ディレクトリに出力される
+    try:
+        # 環境変数を反映させるため、設定後に読み込む
+        import fetch_lancers_improved as app
+        started = time.perf_counter()
+        jobs = await app.main()
+        total = time.perf_counter() - started
+    finally:
+        os.chdir(cwd)
+        await lancers_runner.cleanup()
+        await teams_runner.cleanup()
+
+    print("\n" + "=" * 70)
+    print(f"📈 負荷試験結果: 合成案件 {job_count}件 / ページ {lancers.page_count} / 出力先 {workdir}")
+    print("=" * 70)
+    print(f"   代替Lancersへのリクエスト: {lancers.requests}回")
+    print(f"   読み込まれたカード: {lancers.served_cards}件 / 合成 {job_count}件")
+    print(f"   抽出された案件: {app.RUN_COUNTS.get('candidates', 0)}件 / 採用: {len(jobs)}件")
+    for stage, seconds in app.STAGE_TIMINGS.items():
+        rate = f"{len(jobs) / seconds:,.1f}件/秒" if seconds > 0 and jobs else "-"
+        print(f"   {stage:<13} {seconds:8.3f}秒  {rate}")
+    print(f"   {'total':<13} {total:8.3f}秒")
+
+    sent = sum(1 for s in teams.statuses if s == 200)
+    throttled = sum(1 for s in teams.statuses if s == 429)
+    print(f"   Teams受信: {len(teams.statuses)}回 (成功 {sent} / 429 {throttled} → Retry-After 後に再送)")
+    for payload in teams.payloads:
+        size = len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        print(f"   ペイロード: {size:,} bytes / {payload.get('title', '')[:40]}")
+    if teams.response_times:
+        print(f"   Webhook応答時間: 最大 {max(teams.response_times):.3f}秒")
+
+    if lancers.served_cards < job_count:
+        print(f"❌ 合成した {job_count}件のうち {lancers.served_cards}件しか読み込まれていません"
+              "（スクロール読み込みが途中で止まっています）")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ローカル代替サーバーを使った負荷試験")
+    parser.add_argument("--jobs", type=int, default=1000, help="合成案件数")
+    parser.add_argument("--page-size", type=int, default=25, help="スクロール1回で追加される件数")
+    parser.add_argument("--teams-latency", type=float, default=0.0, help="Webhook応答の遅延（秒）")
+    parser.add_argument("--teams-429-rate", type=float, default=0.0, help="429を返す確率（0〜1）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    ok = asyncio.run(run_load_test(args.jobs, args.page_size, args.teams_latency, args.teams_429_rate, args.seed))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+リポジトリの 案件情報.xlsx を共有ブック（SharePoint/OneDrive）へ行単位でマージ
+
+ファイルごと上書きする代わりに、「ランサーズ」シートを案件URLで突き合わせ、
+追加・更新・削除された行だけを共有ブックに反映します。
+- 管理する8列（取得日時〜スキル概要）は見出し名で対応づけるため、列の並べ替えや挿入があっても崩れない
+- それ以外の列（担当・メモなど、共有ブック側で追加した列）のセルと他のシートには触れない
+- 一覧から消えた行でも、追加列に記入があれば残す（--delete-annotated で削除）
+- 値が変わったセルだけを書き換え、変更が無ければファイル自体を保存しない（同期も発生しない）
+
+共有ブックは openpyxl で読み込み・保存し直さず、xlsx_stream.py と同じく zip の中の
+「ランサーズ」シートのXMLだけを流し読みして書き換えます。他の部品（画像・グラフ・入力規則・
+条件付き書式・他のシート）は解析せずにそのまま写すので、openpyxl が扱えない要素も消えません。
+
+使い方:
+    python merge_workbook.py 案件情報.xlsx "C:/.../案件管理/案件情報.xlsx"
+    python merge_workbook.py src.xlsx dst.xlsx --dry-run            # 変更件数だけ表示
+    python merge_workbook.py src.xlsx dst.xlsx --delete-annotated   # 追加列に記入のある行も削除する
+"""
+
+import argparse
+import os
+import re
+import shutil
+import time
+import uuid
+import zipfile
+from bisect import bisect_left
+from pathlib import Path
+
+import openpyxl
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from excel_archive import SHEET_HEADER
+from xlsx_stream import (CELL, CELL_COLUMN, CHUNK_SIZE, DIMENSION, SharedStrings, TailRewriter, XlsxStreamError,
+                         cell_value, cell_xml, copy_parts, iter_sheet_parts, locate_sheet, renumber, row_number)
+
+SHEET_NAME = "ランサーズ"
+URL_HEADER = "URL"
+
+_ROW_OPEN = re.compile(r"<row\b[^>]*?(/?)>")
+_SPANS = re.compile(r'\s+spans="[^"]*"')
+_STYLE = re.compile(r'\bs="(\d+)"')
+
+
+def read_source_rows(path, sheet: str = SHEET_NAME) -> dict:
+    """マージ元の行（URL → 見出し名 → 値）。読み取り専用で開く"""
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        ws = wb[sheet]
+        rows = ws.iter_rows(values_only=True)
+        header = [str(v) if v is not None else "" for v in next(rows, ())]
+        if URL_HEADER not in header:
+            raise ValueError(f"{path}: 「{sheet}」シートに {URL_HEADER} 列がありません")
+        columns = [(header.index(name), name) for name in SHEET_HEADER if name in header]
+        url_index = header.index(URL_HEADER)
+        result = {}
+        for values in rows:
+            url = values[url_index] if url_index < len(values) else None
+            if url and url not in result:
+                result[url] = {name: values[i] if i < len(values) else None for i, name in columns}
+        return result
+    finally:
+        wb.close()
+
+
+# =============================
+# 行XMLのセル単位の編集
+# =============================
+def _row_cells(xml: str):
+    """1行分のXML → (開始タグ, {列名: セルXML})。空の行（<row .../>）も扱う"""
+    m = _ROW_OPEN.match(xml)
+    open_tag = m.group(0)
+    if m.group(1):
+        return open_tag[:-2].rstrip() + ">", {}
+    inner = xml[m.end():xml.rfind("</row>")]
+    cells = {}
+    for cell in CELL.finditer(inner):
+        ref = CELL_COLUMN.search(cell.group(1))
+        if ref:
+            cells[ref.group(1)] = cell.group(0)
+    return open_tag, cells
+
+
+def _join_row(open_tag: str, cells: dict) -> str:
+    # セルは列の順に並べる（spans は Excel の読み込みの目安なので、列が増減した行では外す）
+    ordered = "".join(cells[col] for col in sorted(cells, key=column_index_from_string))
+    return f"{_SPANS.sub('', open_tag)}{ordered}</row>"
+
+
+def _cell_values(xml: str, shared: SharedStrings) -> dict:
+    values = {}
+    for col, cell in _row_cells(xml)[1].items():
+        m = CELL.match(cell)
+        values[col] = cell_value(m.group(1), m.group(2) or "", shared)
+    return values
+
+
+def _cell_style(cell: str):
+    m = _STYLE.search(CELL.match(cell).group(1))
+    return m.group(1) if m else None
+
+
+def _replace_cells(xml: str, row: int, values: dict, styles: dict = None) -> str:
+    """指定した列のセルだけを書き換える（既存セルのスタイルは残し、他の列のセルはそのまま）"""
+    open_tag, cells = _row_cells(xml)
+    for col, value in values.items():
+        old = cells.get(col)
+        style = _cell_style(old) if old else (styles or {}).get(col)
+        ref = f"{col}{row}"
+        cells[col] = cell_xml(ref, value, style) or (f'<c r="{ref}" s="{style}"/>' if style else "")
+        if not cells[col]:
+            del cells[col]
+    return _join_row(open_tag, cells)
+
+
+# =============================
+# マージ
+# =============================
+def merge_workbook(source, target, sheet: str = SHEET_NAME, keep_annotated: bool = True,
+                   dry_run: bool = False) -> dict:
+    """差分だけを target に反映し、件数を返す"""
+    source_rows = read_source_rows(source, sheet)
+    target = Path(target)
+    if not target.exists():
+        if not dry_run:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, target)
+        return {"inserted": len(source_rows), "updated": 0, "deleted": 0, "kept": 0, "cells": 0, "created": True}
+
+    with zipfile.ZipFile(target) as zf:
+        try:
+            part, rels_part = locate_sheet(zf, sheet)
+        except XlsxStreamError:
+            raise ValueError(f"{target}: 共有ブックに「{sheet}」シートがありません（シートを作ってから実行してください）")
+        shared = SharedStrings(zf)
+
+        # 1回目: 見出しから管理列の位置を決め、既存行を URL で突き合わせる
+        header, missing, max_col, max_row = {}, [], 0, 1
+        seen, kept, url_style = set(), 0, None
+        deleted, dropped_refs = [], set()
+        updates = {}  # 行番号 → {列名（見出しに無い管理列は見出し名）: 新しい値}
+        with zf.open(part) as f:
+            for kind, xml in iter_sheet_parts(f):
+                if kind != "row":
+                    continue
+                number = row_number(xml)
+                max_row = max(max_row, number)
+                values = _cell_values(xml, shared)
+                max_col = max([max_col] + [column_index_from_string(c) for c in values])
+                if number == 1:
+                    header = {str(v): col for col, v in values.items() if v is not None}
+                    missing = [name for name in SHEET_HEADER if name not in header]
+                    continue
+                url_col = header.get(URL_HEADER)
+                url = values.get(url_col) if url_col else None
+                if not url:
+                    continue
+                if url_style is None:
+                    url_style = _cell_style(_row_cells(xml)[1][url_col])
+                new = source_rows.get(url) if url not in seen else None
+                if new is None:
+                    managed = {header[name] for name in SHEET_HEADER if name in header}
+                    annotated = any(v not in (None, "") for col, v in values.items() if col not in managed)
+                    if keep_annotated and annotated:
+                        kept += 1
+                    else:
+                        deleted.append(number)
+                        dropped_refs.update(f"{col}{number}" for col in values)  # 削除する行のハイパーリンク
+                    continue
+                seen.add(url)
+                changed = {header[name]: value for name, value in new.items()
+                           if name in header and values.get(header[name]) != value}
+                changed.update({name: value for name, value in new.items()
+                                if name not in header and value not in (None, "")})  # 列は後で割り当てる
+                if changed:
+                    updates[number] = changed
+
+        if not header:
+            raise ValueError(f"{target}: 「{sheet}」シートに見出し行がありません")
+        # 管理列が無ければ右端に足す（利用者の追加列はそのまま）
+        added_header = {}
+        for name in missing:
+            max_col += 1
+            header[name] = get_column_letter(max_col)
+            added_header[header[name]] = name
+        for number, changed in updates.items():
+            updates[number] = {header.get(key, key): value for key, value in changed.items()}
+        url_col = header[URL_HEADER]
+
+        inserted = [(url, values) for url, values in source_rows.items() if url not in seen]
+        result = {"inserted": len(inserted), "updated": len(updates), "deleted": len(deleted), "kept": kept,
+                  "cells": sum(len(c) for c in updates.values()), "created": False}
+        if dry_run or not (inserted or updates or deleted or added_header):
+            return result
+
+        def new_number(old: int) -> int:
+            return old + len(inserted) - bisect_left(deleted, old)
+
+        last_row = new_number(max_row)
+        token = uuid.uuid4().hex[:8]
+        links = {}                                   # 行番号 → (rId, URL)
+        deleted_set = set(deleted)
+        tail = TailRewriter(new_number, dropped_refs, links, last_row, url_col)
+        styles = {url_col: url_style} if url_style else {}
+
+        # 同期クライアントが書きかけのファイルを拾わないよう、一時ファイルに書いてから置き換える
+        tmp = target.with_name(f"~{target.name}.{os.getpid()}.merge")
+        try:
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as out:
+                with zf.open(part) as f, out.open(zf.getinfo(part), "w", force_zip64=True) as dst:
+                    pending, size = [], 0
+                    for kind, xml in iter_sheet_parts(f):
+                        if kind == "head":
+                            xml = DIMENSION.sub(f'<dimension ref="A1:{get_column_letter(max_col)}{last_row}"/>',
+                                                 xml, count=1)
+                        elif kind == "row":
+                            number = row_number(xml)
+                            if number == 1:
+                                if added_header:
+                                    xml = _replace_cells(xml, 1, added_header)
+                                # 新しい案件ほど上に並ぶ（マージ元と同じ）ので、見出しの直下にまとめて挿入
+                                for offset, (url, values) in enumerate(inserted):
+                                    row = 2 + offset
+                                    links[row] = (f"rIdM{token}{len(links)}", url)
+                                    cells = {header[name]: value for name, value in values.items()}
+                                    xml += _replace_cells(f'<row r="{row}"/>', row, cells, styles)
+                            elif number in deleted_set:
+                                continue
+                            else:
+                                row = new_number(number)
+                                if number in updates:
+                                    xml = _replace_cells(xml, number, updates[number])
+                                if row != number:
+                                    xml = renumber(xml, row)
+                        else:
+                            xml = tail(xml)
+                        pending.append(xml)
+                        size += len(xml)
+                        if size >= CHUNK_SIZE:
+                            dst.write("".join(pending).encode("utf-8"))
+                            pending, size = [], 0
+                    dst.write("".join(pending).encode("utf-8"))
+                copy_parts(zf, out, part, rels_part, tail.dropped_rids, links)
+            os.replace(tmp, target)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="案件情報.xlsx を共有ブックへ行単位でマージ")
+    parser.add_argument("source", help="マージ元（リポジトリの 案件情報.xlsx）")
+    parser.add_argument("target", help="マージ先（共有ブック）")
+    parser.add_argument("--sheet", default=SHEET_NAME)
+    parser.add_argument("--delete-annotated", action="store_true",
+                        help="追加列に記入のある行も、一覧から消えたら削除する（既定は残す）")
+    parser.add_argument("--dry-run", action="store_true", help="書き込まずに件数だけ表示")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        result = merge_workbook(args.source, args.target, args.sheet, not args.delete_annotated, args.dry_run)
+    except PermissionError as e:
+        raise SystemExit(f"❌ 共有ブックに書き込めません（Excelで開いたままの可能性）: {e}")
+    except (ValueError, zipfile.BadZipFile) as e:
+        raise SystemExit(f"❌ {e}")
+    elapsed = time.perf_counter() - started
+
+    if result["created"]:
+        action = "コピーします（ドライラン）" if args.dry_run else "コピーしました"
+        print(f"📄 共有ブックが無いため{action}: {args.target}（{result['inserted']}行）")
+        return
+    total = result["inserted"] + result["updated"] + result["deleted"]
+    label = "（ドライラン）" if args.dry_run else ""
+    print(f"🔀 マージ{label}: 追加 {result['inserted']} / 更新 {result['updated']}（{result['cells']}セル） / "
+          f"削除 {result['deleted']} / 記入ありで保持 {result['kept']} / {elapsed:.2f}秒")
+    if total == 0:
+        print("💤 変更なし（共有ブックは保存していません）")
+
+
+if __name__ == "__main__":
+    main()
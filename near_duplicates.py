@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+再掲載（リポスト）案件の近似重複検出
+
+同じ依頼者が別の /work/detail/<id> で同じ案件を出し直すケースを、
+正規化したタイトルの文字3-gram MinHash + LSH（バンド分割）で検出します。
+MinHash は1回のハッシュで全スロットを埋める One Permutation Hashing（空きスロットは
+スロットごとに固定の乱択順で他スロットから補完）なので、署名の計算量は3-gramの数に
+比例するだけです。
+候補は実際の Jaccard 係数で確認するため、誤検出は閾値以下に抑えられます。
+
+- 索引は過去スナップショットから作り、取り込み済みのスナップショット名とともに
+  .near_dup_index.pkl にキャッシュ（次回は新しいスナップショットだけ追加）
+- 1件の照合は索引が10万件を超えてもバンド表の参照数回で済む
+
+使い方:
+    python near_duplicates.py                 # 履歴中の再掲載グループを表示
+    python near_duplicates.py --bench 100000  # 10万件規模での照合時間を計測
+"""
+
+import argparse
+import pickle
+import random
+import time
+import zlib
+
+from job_model import parse_job_id
+from snapshot_store import iter_snapshot_jobs, list_snapshot_paths, snapshot_name
+from text_normalize import normalize
+
+INDEX_CACHE_PATH = ".near_dup_index.pkl"
+INDEX_VERSION = 1
+NUM_PERM = 32
+BANDS = 8                     # 8バンド × 4行 → 類似度およそ0.6以上が候補に挙がる
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+SIMILARITY_THRESHOLD = 0.7    # 候補を再掲載とみなす Jaccard 係数
+
+_EMPTY = 1 << 32
+# 空きスロットの補完元（スロットごとに固定の乱択順。隣接スロットの相関を避ける）
+_DONORS = [[zlib.crc32(f"{i}:{n}".encode()) % NUM_PERM for n in range(1, 8 * NUM_PERM)] for i in range(NUM_PERM)]
+
+# 非公開案件は共通のタイトルで表示されるため照合しない
+IGNORED_TEXTS = {"限定公開限定公開の仕事", "限定公開の仕事"}
+
+
+def normalize_for_matching(text: str) -> str:
+    """NFKC・小文字化し、再掲載を示す接頭辞・記号・空白を除く（text_normalize のキャッシュを共有）"""
+    return normalize(text).matching
+
+
+def shingles(text: str) -> set:
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set: set) -> tuple:
+    """One Permutation Hashing による NUM_PERM スロットの署名"""
+    slots = [_EMPTY] * NUM_PERM
+    for s in shingle_set:
+        h = zlib.crc32(s.encode("utf-8"))
+        slot, value = h % NUM_PERM, h // NUM_PERM
+        if value < slots[slot]:
+            slots[slot] = value
+    if not shingle_set:
+        return tuple(slots)
+    signature = list(slots)
+    for i in range(NUM_PERM):
+        if slots[i] == _EMPTY:
+            signature[i] = next(slots[d] for d in _DONORS[i] if slots[d] != _EMPTY)
+    return tuple(signature)
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    def __init__(self):
+        self.texts = {}                              # job_id -> 正規化済みテキスト
+        self.bands = [{} for _ in range(BANDS)]      # バンド値 -> [job_id, ...]
+        self.indexed_snapshots = set()
+
+    def __len__(self):
+        return len(self.texts)
+
+    @staticmethod
+    def job_text(title: str, description: str = "") -> str:
+        text = normalize_for_matching(f"{title} {description}" if description else title)
+        return "" if text in IGNORED_TEXTS else text
+
+    def _band_keys(self, signature: tuple):
+        return [signature[i * ROWS:(i + 1) * ROWS] for i in range(BANDS)]
+
+    def add(self, job_id: int, title: str, description: str = ""):
+        if job_id is None or job_id in self.texts:
+            return
+        text = self.job_text(title, description)
+        if not text:
+            return
+        self.texts[job_id] = text
+        for table, key in zip(self.bands, self._band_keys(minhash(shingles(text)))):
+            table.setdefault(key, []).append(job_id)
+
+    def query(self, title: str, description: str = "", exclude_id: int = None):
+        """近似重複の [(job_id, 類似度)] を類似度の高い順に返す"""
+        return self.query_text(self.job_text(title, description), exclude_id)
+
+    def query_text(self, text: str, exclude_id: int = None):
+        if not text:
+            return []
+        own = shingles(text)
+        candidates = set()
+        for table, key in zip(self.bands, self._band_keys(minhash(own))):
+            candidates.update(table.get(key, ()))
+        candidates.discard(exclude_id)
+        scored = [(cid, jaccard(own, shingles(self.texts[cid]))) for cid in candidates]
+        return sorted([(cid, s) for cid, s in scored if s >= SIMILARITY_THRESHOLD], key=lambda x: -x[1])
+
+    # ---- 履歴からの構築とキャッシュ ----
+    def update_from_archive(self) -> int:
+        """未取り込みのスナップショットだけを索引に追加し、追加件数を返す"""
+        before = len(self)
+        for path in list_snapshot_paths():
+            name = snapshot_name(path)
+            if name in self.indexed_snapshots:
+                continue
+            for job in iter_snapshot_jobs(path):
+                self.add(parse_job_id(job.get("link")), job.get("title", ""))
+            self.indexed_snapshots.add(name)
+        return len(self) - before
+
+    def save(self, path: str = INDEX_CACHE_PATH):
+        with open(path, "wb") as f:
+            pickle.dump((INDEX_VERSION, self.texts, self.bands, self.indexed_snapshots), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str = INDEX_CACHE_PATH) -> "NearDuplicateIndex":
+        index = cls()
+        try:
+            with open(path, "rb") as f:
+                version, texts, bands, snapshots = pickle.load(f)
+            if version == INDEX_VERSION:
+                index.texts, index.bands, index.indexed_snapshots = texts, bands, snapshots
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ 近似重複索引の読み込みエラー（作り直します）: {e}")
+        return index
+
+    @classmethod
+    def load_or_build(cls, path: str = INDEX_CACHE_PATH) -> "NearDuplicateIndex":
+        index = cls.load(path)
+        if index.update_from_archive():
+            index.save(path)
+        return index
+
+
+# =============================
+# 案件リストへの適用
+# =============================
+def collapse_reposts(jobs, index: NearDuplicateIndex = None):
+    """
+    再掲載をまとめる。
+    - 同じ実行内の近似重複は最新（IDが最大）の1件に集約
+    - 残した案件の previous_ids に、履歴・実行内で見つかった過去のIDを記録
+    """
+    run_index = NearDuplicateIndex()
+    for job in jobs:
+        run_index.add(job.job_id, job.title)
+
+    kept, absorbed = [], set()
+    for job in sorted(jobs, key=lambda j: -(j.job_id or 0)):
+        if job.job_id in absorbed:
+            continue
+        earlier = set(job.previous_ids)
+        for other_id, _ in run_index.query(job.title, exclude_id=job.job_id):
+            if other_id is not None and other_id < (job.job_id or 0):
+                absorbed.add(other_id)
+                earlier.add(other_id)
+        if index is not None:
+            for other_id, _ in index.query(job.title, exclude_id=job.job_id):
+                if other_id < (job.job_id or 0):
+                    earlier.add(other_id)
+        job.previous_ids = tuple(sorted(earlier))
+        kept.append(job)
+
+    if absorbed:
+        print(f"🔁 再掲載の重複を {len(absorbed)}件 集約しました")
+    # 元の並び順を保つ
+    kept_ids = {id(j) for j in kept}
+    return [j for j in jobs if id(j) in kept_ids]
+
+
+# =============================
+# CLI
+# =============================
+def _report(index: NearDuplicateIndex, limit: int = 20):
+    groups, seen = [], set()
+    for job_id in sorted(index.texts):
+        if job_id in seen:
+            continue
+        matches = [cid for cid, _ in index.query_text(index.texts[job_id], exclude_id=job_id)]
+        if matches:
+            group = sorted({job_id, *matches})
+            seen.update(group)
+            groups.append(group)
+    print(f"📊 索引 {len(index)}件 / 再掲載グループ {len(groups)}件")
+    for group in sorted(groups, key=len, reverse=True)[:limit]:
+        print(f"   {len(group)}件: {index.texts[group[-1]][:40]}  ← {group}")
+
+
+def _bench(size: int):
+    base = NearDuplicateIndex()
+    base.update_from_archive()
+    titles = list(base.texts.values()) or ["pythonでの業務自動化ツール開発"]
+    # 実在タイトルを8文字ずつに切った断片を3つ組み合わせた合成タイトル
+    fragments = [t[i:i + 8] for t in titles for i in range(0, len(t), 8)]
+    rng = random.Random(0)
+    index = NearDuplicateIndex()
+    started = time.perf_counter()
+    for i in range(size):
+        index.add(i, "".join(rng.choice(fragments) for _ in range(3)))
+    for job_id, text in base.texts.items():
+        index.add(job_id, text)
+    build = time.perf_counter() - started
+
+    probes = [rng.choice(titles) for _ in range(2000)]
+    started = time.perf_counter()
+    for text in probes:
+        index.query_text(text)
+    per_query = (time.perf_counter() - started) / len(probes)
+    print(f"⏱️ 索引 {size:,}件: 構築 {build:.1f}秒 / 照合 {per_query * 1000:.3f}ms/件")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="再掲載案件の近似重複検出")
+    parser.add_argument("--bench", type=int, help="指定件数の索引で照合時間を計測")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.bench)
+    else:
+        _report(NearDuplicateIndex.load_or_build(), args.limit)
+
+
+if __name__ == "__main__":
+    main()
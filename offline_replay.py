@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+保存済みスナップショットを使ったオフライン再生
+
+all_jobs_*.json（または snapshots/ のマニフェスト）を取得結果の代わりに main() へ渡し、
+取得以降の処理（スコア付け・保存・Excel・クリーニング・Teams）を同じコードでそのまま実行します。
+ブラウザもネットワークも使わず、各回の時刻はスナップショットの取得時刻になります。
+
+- 出力（Excel・スナップショット・open_jobs.json など）は作業ディレクトリ（--out）にまとめ、リポジトリは汚さない
+- Teams へは送らず、ペイロードを <out>/teams/ に書き出す（--teams-url でローカルのスタブへ送ることも可）
+- 複数のスナップショットを時刻順に流すと、ステージごとの所要時間を集計して表示
+
+使い方:
+    python offline_replay.py all_jobs_20260218_0233
+    python offline_replay.py --since 2026-01-01 --until 2026-02-01 --quiet
+    python offline_replay.py --last 50 --out replay_out --profile
+"""
+
+import argparse
+import asyncio
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from snapshot_store import list_snapshot_paths, snapshot_name
+
+
+def select_snapshots(names=(), since: str = None, until: str = None, last: int = None):
+    """再生するスナップショットのパス（時刻順・絶対パス）"""
+    paths = list_snapshot_paths()
+    if names:
+        by_name = {snapshot_name(p): p for p in paths}
+        selected = []
+        for name in names:
+            path = by_name.get(snapshot_name(name))
+            if path is None:
+                if not Path(name).exists():
+                    raise SystemExit(f"❌ スナップショットが見つかりません: {name}")
+                path = Path(name)
+            selected.append(path)
+    else:
+        # 名前は all_jobs_YYYYMMDD_HHMM なので日付の比較は文字列で足りる
+        since_key = f"all_jobs_{since.replace('-', '')}" if since else None
+        until_key = f"all_jobs_{until.replace('-', '')}" if until else None
+        selected = [p for p in paths
+                    if (since_key is None or snapshot_name(p) >= since_key)
+                    and (until_key is None or snapshot_name(p) < until_key)]
+        if last:
+            selected = selected[-last:]
+    return [str(Path(p).resolve()) for p in selected]
+
+
+async def run_replay(snapshots, workdir: str, teams_url: str = None, quiet: bool = False):
+    # 作業ディレクトリへ移る前に、リポジトリ側の設定ファイルを絶対パスで渡す
+    env = {
+        "EXCEL_PATH": os.path.join(workdir, "案件情報.xlsx"),
+        "RULES_PATH": str(Path(os.getenv("RULES_PATH", "rules.json")).resolve()),
+        "CHANGE_PROBE": "false",
+    }
+    profiles = Path(os.getenv("PROFILES_PATH", "profiles.json"))
+    if profiles.exists():
+        env["PROFILES_PATH"] = str(profiles.resolve())
+    if teams_url:
+        env["TEAMS_WEBHOOK_URL"] = teams_url
+    else:
+        env["TEAMS_OUTBOX"] = os.path.join(workdir, "teams")
+    os.environ.update(env)
+
+    cwd = os.getcwd()
+    os.chdir(workdir)  # スナップショット・集計ファイルは作業ディレクトリに出力される
+    runs = []
+    try:
+        # 環境変数を反映させるため、設定後に読み込む
+        import fetch_lancers_improved as app
+        for i, path in enumerate(snapshots, 1):
+            started = time.perf_counter()
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out) if quiet else contextlib.nullcontext():
+                jobs = await app.main(replay_path=path)
+            total = time.perf_counter() - started
+            runs.append({"name": snapshot_name(path), "jobs": len(jobs), "total": total,
+                         "stages": dict(app.STAGE_TIMINGS)})
+            if quiet:
+                print(f"⏪ [{i}/{len(snapshots)}] {snapshot_name(path)}: {len(jobs)}件 / {total:.2f}秒")
+    finally:
+        os.chdir(cwd)
+    return runs
+
+
+def print_summary(runs, workdir: str, elapsed: float):
+    print("\n" + "=" * 70)
+    print(f"📈 再生結果: {len(runs)}回 / 出力先 {workdir}")
+    print("=" * 70)
+    stages = list(dict.fromkeys(s for run in runs for s in run["stages"]))
+    print(f"   {'stage':<13} {'合計':>9} {'平均':>9} {'最大':>9}")
+    for stage in stages:
+        values = [run["stages"][stage] for run in runs if stage in run["stages"]]
+        print(f"   {stage:<13} {sum(values):8.2f}秒 {statistics.mean(values):8.3f}秒 {max(values):8.3f}秒")
+    jobs = sum(run["jobs"] for run in runs)
+    print(f"   {'total':<13} {elapsed:8.2f}秒（{len(runs) / elapsed:.1f}回/秒・案件 {jobs}件）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="保存済みスナップショットで取得以降の処理を再生")
+    parser.add_argument("snapshots", nargs="*", help="スナップショット名またはパス（省略時は --since/--until/--last で選択）")
+    parser.add_argument("--since", help="この日付以降のスナップショット（例: 2026-01-01）")
+    parser.add_argument("--until", help="この日付より前のスナップショット")
+    parser.add_argument("--last", type=int, help="直近N個のスナップショット")
+    parser.add_argument("--out", help="出力先ディレクトリ（既定: 一時ディレクトリ）")
+    parser.add_argument("--teams-url", help="ファイルに書き出す代わりに送るWebhook（ローカルのスタブなど）")
+    parser.add_argument("--quiet", action="store_true", help="各回のログを出さずに1行ずつ表示")
+    parser.add_argument("--profile", action="store_true", help="cProfile で計測し上位の関数を表示")
+    args = parser.parse_args()
+
+    snapshots = select_snapshots(args.snapshots, args.since, args.until, args.last)
+    if not snapshots:
+        raise SystemExit("❌ 再生するスナップショットがありません")
+    if not (args.snapshots or args.since or args.until or args.last):
+        snapshots = snapshots[-1:]  # 何も指定しなければ最新の1回だけ
+    workdir = os.path.abspath(args.out) if args.out else tempfile.mkdtemp(prefix="lancers_replay_")
+    os.makedirs(workdir, exist_ok=True)
+    print(f"⏪ {len(snapshots)}個のスナップショットを再生します（出力先 {workdir}）")
+
+    profiler = cProfile.Profile() if args.profile else None
+    started = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    runs = asyncio.run(run_replay(snapshots, workdir, args.teams_url, args.quiet))
+    if profiler:
+        profiler.disable()
+    print_summary(runs, workdir, time.perf_counter() - started)
+
+    if profiler:
+        stats_path = os.path.join(workdir, "replay.prof")
+        profiler.dump_stats(stats_path)
+        print(f"\n🔬 プロファイル（累積時間の上位）: {stats_path}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+変更検知プローブ（何も変わっていない実行を省略する）
+
+検索ページの1ページ目だけを条件付きリクエスト（If-None-Match / If-Modified-Since）で取得し、
+掲載されている案件IDの並びを前回の実行と比べます。
+- 304 Not Modified、または案件IDが前回と同じ → 変更なし
+- 取得に失敗した場合は「変更あり」とみなす（取りこぼしを避ける）
+
+前回の状態は probe_state.json に URL ごとに保存されます。状態の保存は、
+本体（main）の処理がすべて終わった後に行います。
+
+使い方:
+    python probe.py                 # 変更の有無を表示（状態は更新しない）
+    python probe.py --url <検索URL>
+
+GitHub Actions では結果を $GITHUB_OUTPUT に changed=true/false と result=<JSON> として書き出すので、
+後続のステップ（ブラウザのインストール・本体の実行）を省略できます。
+本体には result を環境変数 PROBE_RESULT で渡し、同じ確認をもう一度しないようにします（状態の保存は本体が行う）。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+
+PROBE_STATE_PATH = "probe_state.json"
+DEFAULT_SEARCH_URL = (
+    "https://www.lancers.jp/work/search/system?budget_from=&budget_to=&work_rank%5B%5D=&work_rank%5B%5D="
+    "&work_rank%5B%5D=&keyword=&sort=work_post_date"
+)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+_JOB_ID = re.compile(r"/work/detail/(\d+)")
+
+
+def extract_job_ids(markup: str) -> list:
+    """ページ内の案件IDを出現順に重複なしで返す"""
+    return list(dict.fromkeys(int(m) for m in _JOB_ID.findall(markup)))
+
+
+class ProbeResult:
+    def __init__(self, url: str, changed: bool, reason: str, entry: dict = None):
+        self.url = url
+        self.changed = changed
+        self.reason = reason
+        self.entry = entry  # 保存する状態（変更なし・取得失敗のときは None）
+
+    def save(self, path: str = PROBE_STATE_PATH):
+        if self.entry is None:
+            return
+        state = load_state(path)
+        state[self.url] = self.entry
+        Path(path).write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def to_json(self) -> str:
+        """1行のJSON（$GITHUB_OUTPUT・環境変数で後続のステップへ渡す）"""
+        data = {"url": self.url, "changed": self.changed, "reason": self.reason, "entry": self.entry}
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: str) -> "ProbeResult":
+        data = json.loads(text)
+        return cls(data["url"], data["changed"], data["reason"], data.get("entry"))
+
+
+def load_state(path: str = PROBE_STATE_PATH) -> dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"⚠️ プローブ状態の読み込みエラー（初回扱い）: {e}")
+        return {}
+
+
+async def probe_listing(url: str, state_path: str = PROBE_STATE_PATH) -> ProbeResult:
+    """1ページ目の案件IDを条件付きリクエストで確認する"""
+    previous = load_state(state_path).get(url, {})
+    headers = {"User-Agent": USER_AGENT}
+    if previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+
+    try:
+        async with aiohttp.ClientSession(headers=headers) as session:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as res:
+                if res.status == 304:
+                    return ProbeResult(url, False, "304 Not Modified")
+                res.raise_for_status()
+                markup = await res.text()
+                etag = res.headers.get("ETag")
+                last_modified = res.headers.get("Last-Modified")
+    except Exception as e:
+        return ProbeResult(url, True, f"プローブ失敗のため通常実行: {e}")
+
+    job_ids = extract_job_ids(markup)
+    entry = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "job_ids": job_ids,
+        "checked_at": datetime.now().isoformat(),
+    }
+    if not job_ids:
+        return ProbeResult(url, True, "案件IDを検出できないため通常実行", entry)
+    if job_ids == previous.get("job_ids"):
+        return ProbeResult(url, False, f"1ページ目の案件ID {len(job_ids)}件が前回と同じ")
+    new_count = len(set(job_ids) - set(previous.get("job_ids", [])))
+    return ProbeResult(url, True, f"新しい案件ID {new_count}件", entry)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="検索ページの変更検知")
+    parser.add_argument("--url", default=os.getenv("LANCERS_SEARCH_URL", DEFAULT_SEARCH_URL))
+    parser.add_argument("--state", default=PROBE_STATE_PATH)
+    args = parser.parse_args()
+
+    result = asyncio.run(probe_listing(args.url, args.state))
+    print(f"{'🆕 変更あり' if result.changed else '💤 変更なし'}: {result.reason}")
+    github_output = os.getenv("GITHUB_OUTPUT")
+    if github_output:
+        with open(github_output, "a", encoding="utf-8") as f:
+            f.write(f"changed={'true' if result.changed else 'false'}\n")
+            f.write(f"result={result.to_json()}\n")
+
+
+if __name__ == "__main__":
+    main()
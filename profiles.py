@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数の配信先プロファイル（チームごとのスキル・除外語・閾値・Webhook）
+
+profiles.json の各プロファイルのキーワードを1つのオートマトン（Aho-Corasick）にまとめ、
+案件タイトルは1回走査するだけで全プロファイル分のヒットを得ます。
+各プロファイルの判定はヒットしたキーワード集合の参照だけなので、
+プロファイルを1つ増やしても1案件あたり数マイクロ秒しか増えません。
+
+profiles.json の例（profiles.example.json）:
+    [
+      {
+        "name": "データ基盤チーム",
+        "webhook_env": "TEAMS_WEBHOOK_URL_DATA",
+        "skills": {"超高優先度": ["Python", "BigQuery"], "中優先度": ["ETL"]},
+        "exclude": ["デザイン"],
+        "bonus_keywords": {"データ分析": 30},
+        "min_score": 20,
+        "max_jobs": 30
+      }
+    ]
+
+使い方:
+    python profiles.py                # 既定プロファイルが現行スコアと一致するか確認
+    python profiles.py --bench 50     # プロファイル50個での1案件あたりの判定時間
+"""
+
+import argparse
+import copy
+import json
+import os
+import time
+from pathlib import Path
+
+from rule_pack import get_rules
+from text_normalize import normalize
+
+PROFILES_PATH = "profiles.json"
+
+
+# =============================
+# 共有マッチャー（Aho-Corasick）
+# =============================
+class KeywordAutomaton:
+    """全プロファイルのキーワード（小文字）を1回の走査で検出する"""
+
+    def __init__(self, keywords):
+        self.keywords = sorted(set(keywords))
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        for keyword in self.keywords:
+            node = 0
+            for ch in keyword:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                node = nxt
+            self.output[node] = self.output[node] + (keyword,)
+        # 幅優先で失敗遷移を張る
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find(self, text: str) -> set:
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+
+# =============================
+# プロファイル
+# =============================
+class Profile:
+    def __init__(self, name: str, skills: dict, exclude=(), bonus_keywords: dict = None,
+                 min_score: int = 10, max_jobs: int = None, webhook_url: str = None, webhook_env: str = None):
+        self.name = name
+        self.exclude = tuple(k.lower() for k in exclude)
+        self.bonus_keywords = {k.lower(): v for k, v in (bonus_keywords or {}).items()}
+        self.min_score = min_score
+        self.max_jobs = max_jobs
+        self.webhook_url = webhook_url
+        self.webhook_env = webhook_env
+        # (検索キー, 表示名, 優先度) をスキル名の初出順に並べる
+        # skills は {優先度: [キーワード]} か [(キーワード, 優先度)] の並び
+        if isinstance(skills, dict):
+            skills = [(keyword, priority) for priority, keywords in skills.items() for keyword in keywords]
+        self.entries = []
+        seen = set()
+        for keyword, priority in skills:
+            if keyword not in seen:
+                seen.add(keyword)
+                self.entries.append((keyword.lower(), keyword, priority))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Profile":
+        return cls(
+            name=data["name"],
+            skills=data.get("skills", {}),
+            exclude=data.get("exclude", ()),
+            bonus_keywords=data.get("bonus_keywords"),
+            min_score=data.get("min_score", 10),
+            max_jobs=data.get("max_jobs"),
+            webhook_url=data.get("webhook_url"),
+            webhook_env=data.get("webhook_env"),
+        )
+
+    def resolve_webhook(self):
+        if self.webhook_env:
+            return os.getenv(self.webhook_env) or self.webhook_url
+        return self.webhook_url
+
+    def keywords(self):
+        return [key for key, _, _ in self.entries] + list(self.exclude) + list(self.bonus_keywords)
+
+    def evaluate(self, found: set, base_score: int, rules):
+        """ヒット集合から (skill_matches の (skill, priority) 列, スコア, 除外か) を返す（配点は rules.json）"""
+        if any(k in found for k in self.exclude):
+            return (), 0, True
+        matches = tuple((skill, priority) for key, skill, priority in self.entries if key in found)
+        score = base_score + rules.skill_score([p for _, p in matches])
+        bonus_hit = False
+        for key, bonus in self.bonus_keywords.items():
+            if key in found:
+                score += bonus
+                bonus_hit = True
+        excluded = not (score >= self.min_score or matches or bonus_hit)
+        return matches, score, excluded
+
+
+def base_score(job, rules) -> int:
+    """プロファイルに依存しない加点（急募・応募者数・予算）"""
+    return rules.context_score(job.urgency, job.applicant_count, job.price)
+
+
+class ProfileSet:
+    """全プロファイルを1つのマッチャーにまとめたもの"""
+
+    def __init__(self, profiles, rules=None):
+        self.profiles = list(profiles)
+        self.rules = rules or get_rules()
+        self.automaton = KeywordAutomaton(k for p in self.profiles for k in p.keywords())
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def evaluate(self, jobs) -> dict:
+        """
+        各案件を1回だけ走査し、プロファイル名 → [(案件, マッチ, スコア)] を返す。
+        案件オブジェクト自体は書き換えない。
+        """
+        rules = self.rules
+        results = {p.name: [] for p in self.profiles}
+        for job in jobs:
+            if rules.is_closed(job.status):
+                continue
+            found = self.automaton.find(normalize(job.title).lower)
+            base = base_score(job, rules)
+            for profile in self.profiles:
+                matches, score, excluded = profile.evaluate(found, base, rules)
+                if not excluded:
+                    results[profile.name].append((job, matches, score))
+        return results
+
+
+def profile_view(job, matches, score):
+    """プロファイルごとのスキル・スコアを持つ案件の複製（通知文の作成用）"""
+    from job_model import SkillMatch
+
+    view = copy.copy(job)
+    view.skill_matches = tuple(SkillMatch.of(s, p) for s, p in matches)
+    view.priority_score = score
+    view.relevance = None
+    return view
+
+
+def load_profiles(path: str = PROFILES_PATH) -> list:
+    """profiles.json を読む（無ければ空）"""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"⚠️ プロファイル設定の読み込みエラー（追加プロファイルなしで続行）: {e}")
+        return []
+    return [Profile.from_dict(item) for item in data]
+
+
+# =============================
+# 検証・ベンチマーク
+# =============================
+def default_profile(rules=None) -> Profile:
+    """rules.json（本体の判定）と同じ判定をするプロファイル"""
+    rules = rules or get_rules()
+    skills = [(keyword, priority) for _, keyword, priority in rules.skill_keys]
+    return Profile("既定", skills, rules.exclude_keywords, rules.keyword_bonus, rules.min_score,
+                   webhook_env="TEAMS_WEBHOOK_URL")
+
+
+def _history_jobs():
+    from job_model import jobs_from_dicts
+    from snapshot_store import iter_snapshot_jobs, list_snapshot_paths
+
+    jobs = {}
+    for path in list_snapshot_paths():
+        for item in iter_snapshot_jobs(path):
+            jobs[item["link"]] = item
+    return jobs_from_dicts(jobs.values())
+
+
+def verify():
+    jobs = _history_jobs()
+    profile_set = ProfileSet([default_profile()])
+    mismatches = 0
+    for job in jobs:
+        found = profile_set.automaton.find(job.title.lower())
+        matches, score, _ = profile_set.profiles[0].evaluate(found, base_score(job, profile_set.rules),
+                                                             profile_set.rules)
+        if [m.to_dict() for m in job.skill_matches] != [{"skill": s, "priority": p} for s, p in matches] \
+                or score != job.priority_score:
+            mismatches += 1
+    print(f"📊 既定プロファイル vs 保存済みスコア: 不一致 {mismatches} / {len(jobs)}件")
+
+
+def bench(count: int):
+    jobs = _history_jobs()
+    base = default_profile()
+    timings = {}
+    for n in (1, count):
+        profiles = [base] + [
+            Profile(f"p{i}", {"高優先度": [f"キーワード{i}", f"kw{i}"], "中優先度": ["開発"]}, [f"除外{i}"])
+            for i in range(n - 1)
+        ]
+        profile_set = ProfileSet(profiles)
+        started = time.perf_counter()
+        profile_set.evaluate(jobs)
+        timings[n] = (time.perf_counter() - started) / len(jobs) * 1e6
+        print(f"⏱️ プロファイル {n:>3}個: {timings[n]:7.1f}µs/件（{len(jobs)}件）")
+    if count > 1:
+        print(f"   1プロファイル追加あたり: {(timings[count] - timings[1]) / (count - 1):.2f}µs/件")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="複数プロファイルの判定")
+    parser.add_argument("--bench", type=int, help="指定数のプロファイルで判定時間を計測")
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.bench)
+    else:
+        verify()
+
+
+if __name__ == "__main__":
+    main()
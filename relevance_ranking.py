@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TF-IDF による関連度ランキング（任意機能・NumPy が必要）
+
+calculate_comprehensive_score の部分文字列一致は、"AI" と "Ai" の二重加点や
+"mail" の中の "ai" のような誤一致が起きます。ここでは
+
+- 過去スナップショットのタイトルから文字 n-gram（2〜3文字）の語彙と IDF を学習
+  英数字は単語単位で前後に境界記号を付けるため、単語の途中には一致しない
+- COMPANY_SKILLS を優先度で重み付けしたクエリベクトルに変換（大文字小文字の
+  違いは1つにまとめる）
+- 案件タイトルの疎行列とクエリの内積を1回の NumPy 演算で計算
+
+します。RANKING_ENGINE=tfidf で本体の並び替えに使われます。
+
+学習結果（語彙・文書頻度）と履歴タイトルの疎行列（TF）は、取り込んだスナップショット
+（名前:サイズ）とともに .relevance_model.pkl にキャッシュし、次回は新しいスナップショットの
+案件だけを追加します（スナップショットが消えた・変わった場合は作り直し）。
+毎回の実行では今回のタイトルだけを疎行列化します。
+
+使い方:
+    pip install numpy
+    python relevance_ranking.py             # 現行スコアとの比較評価
+    python relevance_ranking.py --bench     # 10万件の処理時間（学習済みモデルの読み込みから）を計測
+"""
+
+import argparse
+import math
+import os
+import pickle
+import re
+import time
+import unicodedata
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # 任意依存
+    np = None
+
+from job_model import parse_job_id
+from snapshot_store import iter_snapshot_jobs, list_snapshot_paths
+
+MODEL_CACHE_PATH = ".relevance_model.pkl"
+MODEL_VERSION = 1
+NGRAM_RANGE = (2, 3)
+PRIORITY_WEIGHTS = {"超高優先度": 100, "高優先度": 50, "中優先度": 20, "低優先度": 10, "最低優先度": 5}
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9.+#]*|[^\sa-z0-9\W_]+")
+
+
+def is_available() -> bool:
+    return np is not None
+
+
+def analyze(text: str):
+    """文字 n-gram を返す。英数字の単語は前後に境界記号を付けてから分割する"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    grams = []
+    lo, hi = NGRAM_RANGE
+    for token in _TOKEN.findall(text):
+        padded = f" {token} " if token[0].isascii() else token
+        for n in range(lo, hi + 1):
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def _csr(indptr, indices, counts):
+    return (
+        np.asarray(indptr, dtype=np.int64),
+        np.asarray(indices, dtype=np.int32),
+        1.0 + np.log(np.asarray(counts, dtype=np.float64)),
+    )
+
+
+class RelevanceRanker:
+    def __init__(self):
+        if np is None:
+            raise ImportError("relevance_ranking には numpy が必要です（pip install numpy）")
+        self.vocabulary = {}  # n-gram → 列番号（追加順。学習を追加しても既存の列番号は変わらない）
+        self.df = []          # 列番号 → 文書頻度
+        self.n_docs = 0
+        self.idf = None
+        self.query = None
+
+    # ---- 学習 ----
+    def fit(self, corpus):
+        self.vocabulary, self.df, self.n_docs = {}, [], 0
+        return self.partial_fit(corpus)
+
+    def partial_fit(self, corpus):
+        """文書を追加して文書頻度と IDF を更新する（set_profile は呼び直すこと）"""
+        self.add_documents(corpus)
+        return self
+
+    def add_documents(self, texts):
+        """文書を学習に加え、その TF 疎行列を返す（n-gram の解析は1文書1回）"""
+        vocabulary, df = self.vocabulary, self.df
+        indptr, indices, counts = [0], [], []
+        for text in texts:
+            self.n_docs += 1
+            tf = {}
+            for gram in analyze(text):
+                col = vocabulary.get(gram)
+                if col is None:
+                    col = vocabulary[gram] = len(df)
+                    df.append(0)
+                if col in tf:
+                    tf[col] += 1
+                else:
+                    tf[col] = 1
+                    df[col] += 1
+            indices.extend(tf.keys())
+            counts.extend(tf.values())
+            indptr.append(len(indices))
+        self.update_idf()
+        return _csr(indptr, indices, counts)
+
+    def update_idf(self):
+        self.idf = np.log((1 + self.n_docs) / (1 + np.asarray(self.df, dtype=np.float64))) + 1.0
+
+    def term_frequencies(self, texts):
+        """タイトル群を CSR 形式（indptr, indices, data）の疎行列にする。値はサブリニア TF（IDF・正規化の前）"""
+        vocabulary = self.vocabulary
+        indptr, indices, counts = [0], [], []
+        for text in texts:
+            tf = {}
+            for gram in analyze(text):
+                col = vocabulary.get(gram)
+                if col is not None:
+                    tf[col] = tf.get(col, 0) + 1
+            indices.extend(tf.keys())
+            counts.extend(tf.values())
+            indptr.append(len(indices))
+        return _csr(indptr, indices, counts)
+
+    def weight(self, tf_matrix):
+        """TF の疎行列に現在の IDF を掛け、行ごとに L2 正規化した TF-IDF にする"""
+        indptr, indices, tf = tf_matrix
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        vals = tf * self.idf[indices]
+        norms = np.sqrt(np.bincount(rows, weights=vals * vals, minlength=len(indptr) - 1))
+        return indptr, indices, vals / norms[rows]
+
+    def transform(self, texts):
+        """タイトル群を L2 正規化済み TF-IDF の疎行列にする"""
+        return self.weight(self.term_frequencies(texts))
+
+    def set_profile(self, company_skills: dict):
+        """スキル設定をクエリベクトルにする（表記ゆれは小文字でまとめ、最も高い重みを採用）"""
+        weights = {}
+        for priority, skills in company_skills.items():
+            for skill in skills:
+                key = unicodedata.normalize("NFKC", skill).lower()
+                weights[key] = max(weights.get(key, 0), PRIORITY_WEIGHTS.get(priority, 1))
+        query = np.zeros(len(self.vocabulary))
+        for skill, weight in weights.items():
+            _, cols, vals = self.transform([skill])
+            query[cols] += weight * vals
+        self.query = query
+        return self
+
+    # ---- スコアリング ----
+    def score_matrix(self, matrix):
+        """疎行列 × クエリベクトルを1回の演算で計算"""
+        indptr, indices, data = matrix
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        return np.bincount(rows, weights=data * self.query[indices], minlength=len(indptr) - 1)
+
+    def score(self, texts):
+        return self.score_matrix(self.transform(texts))
+
+
+# =============================
+# 学習データ（スナップショット履歴・キャッシュ付き）
+# =============================
+def _snapshot_keys(files) -> dict:
+    return {str(f): f"{Path(f).name}:{os.path.getsize(f)}" for f in files}
+
+
+class HistoryModel:
+    """過去スナップショットのタイトル（案件IDで重複除去）で学習した ranker と、履歴タイトルの TF 疎行列"""
+
+    def __init__(self):
+        self.ranker = RelevanceRanker()
+        self.snapshots = set()  # 取り込み済みのスナップショット（名前:サイズ）
+        self.job_keys = set()
+        self.titles = []        # [(タイトル, 現行スコア)]
+        self.matrix = (np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32), np.empty(0))
+
+    def update(self, files) -> int:
+        """未取り込みのスナップショットの案件だけを学習・疎行列化し、追加件数を返す"""
+        keys = _snapshot_keys(files)
+        if not self.snapshots <= set(keys.values()):
+            self.__init__()  # 取り込み済みのスナップショットが消えた・変わったら作り直す
+        titles = []
+        for f in files:
+            if keys[str(f)] in self.snapshots:
+                continue
+            for job in iter_snapshot_jobs(f):
+                key = parse_job_id(job.get("link")) or job.get("link")
+                if key not in self.job_keys:
+                    self.job_keys.add(key)
+                    titles.append((job.get("title", ""), job.get("priority_score", 0)))
+            self.snapshots.add(keys[str(f)])
+        if titles:
+            indptr, indices, tf = self.ranker.add_documents([t for t, _ in titles])
+            old_indptr, old_indices, old_tf = self.matrix
+            self.matrix = (np.concatenate([old_indptr, indptr[1:] + old_indptr[-1]]),
+                           np.concatenate([old_indices, indices]), np.concatenate([old_tf, tf]))
+            self.titles.extend(titles)
+        return len(titles)
+
+    def history_matrix(self):
+        """履歴タイトルの TF-IDF 疎行列（現在の IDF で重み付け）"""
+        return self.ranker.weight(self.matrix)
+
+    def save(self, path: str = MODEL_CACHE_PATH):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": MODEL_VERSION, "snapshots": self.snapshots, "job_keys": self.job_keys,
+                         "titles": self.titles, "matrix": self.matrix, "vocabulary": self.ranker.vocabulary,
+                         "df": self.ranker.df, "n_docs": self.ranker.n_docs}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = MODEL_CACHE_PATH) -> "HistoryModel":
+        model = cls()
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") == MODEL_VERSION:
+                model.snapshots, model.job_keys = data["snapshots"], data["job_keys"]
+                model.titles, model.matrix = data["titles"], data["matrix"]
+                ranker = model.ranker
+                ranker.vocabulary, ranker.df, ranker.n_docs = data["vocabulary"], data["df"], data["n_docs"]
+                ranker.update_idf()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ 関連度モデルの読み込みエラー（作り直します）: {e}")
+        return model
+
+    @classmethod
+    def load_or_build(cls, path: str = MODEL_CACHE_PATH) -> "HistoryModel":
+        model = cls.load(path) if path else cls()
+        if model.update(list_snapshot_paths()) and path:
+            model.save(path)
+        return model
+
+
+def load_historical_titles():
+    """過去スナップショットのタイトル（案件IDで重複除去）"""
+    return HistoryModel.load_or_build().titles
+
+
+def build_ranker(company_skills: dict, extra_titles=(), cache_path: str = MODEL_CACHE_PATH) -> RelevanceRanker:
+    """履歴で学習済みのモデルに extra_titles を加えた ranker（履歴の読み直し・再学習はしない。今回の分は保存しない）"""
+    ranker = HistoryModel.load_or_build(cache_path).ranker
+    return ranker.partial_fit(extra_titles).set_profile(company_skills)
+
+
+def score_titles(company_skills: dict, titles, cache_path: str = MODEL_CACHE_PATH):
+    """
+    今回のタイトルの関連度。IDF は履歴＋今回のタイトルで計算し、解析するのは今回のタイトルだけ（1件1回）
+    """
+    ranker = HistoryModel.load_or_build(cache_path).ranker
+    tf = ranker.add_documents(titles)
+    ranker.set_profile(company_skills)
+    return ranker.score_matrix(ranker.weight(tf))
+
+
+# =============================
+# 評価
+# =============================
+def _ranks(values):
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2
+        i = j + 1
+    return ranks
+
+
+def spearman(a, b) -> float:
+    ra, rb = _ranks(list(a)), _ranks(list(b))
+    ma, mb = sum(ra) / len(ra), sum(rb) / len(rb)
+    cov = sum((x - ma) * (y - mb) for x, y in zip(ra, rb))
+    var = math.sqrt(sum((x - ma) ** 2 for x in ra) * sum((y - mb) ** 2 for y in rb))
+    return cov / var if var else 0.0
+
+
+def evaluate(company_skills: dict, top: int = 20):
+    model = HistoryModel.load_or_build()
+    titles = [t for t, _ in model.titles]
+    current = [s for _, s in model.titles]
+    ranker = model.ranker.set_profile(company_skills)
+    started = time.perf_counter()
+    scores = ranker.score_matrix(model.history_matrix())
+    elapsed = time.perf_counter() - started
+
+    top_current = set(sorted(range(len(titles)), key=lambda i: -current[i])[:top])
+    top_tfidf = set(sorted(range(len(titles)), key=lambda i: -scores[i])[:top])
+    double_counted = sum(1 for t in titles if "ai" in t.lower() and not re.search(r"(?<![a-z])ai(?![a-z])", t.lower()))
+
+    print(f"📊 評価対象: {len(titles)}件（案件IDで重複除去） / 重み付け＋スコアリング {elapsed * 1000:.1f}ms")
+    print(f"   順位相関（Spearman）: {spearman(current, scores):.3f}")
+    print(f"   上位{top}件の一致: {len(top_current & top_tfidf)}件")
+    print(f"   'ai' が単語の途中にだけ現れる案件（現行スコアで加点される）: {double_counted}件")
+    print(f"\n🔼 TF-IDF でのみ上位{top}件:")
+    for i in sorted(top_tfidf - top_current, key=lambda i: -scores[i])[:10]:
+        print(f"   {scores[i]:7.1f} / 現行 {current[i]:4}  {titles[i][:50]}")
+    print(f"\n🔽 現行スコアでのみ上位{top}件:")
+    for i in sorted(top_current - top_tfidf, key=lambda i: -current[i])[:10]:
+        print(f"   {scores[i]:7.1f} / 現行 {current[i]:4}  {titles[i][:50]}")
+
+
+def bench(company_skills: dict, size: int = 100_000):
+    """
+    本体の1回の実行（score_titles）と同じ経路（キャッシュ済みモデルの読み込み → 今回分の解析・追加学習 → スコアリング）を
+    size 件のタイトルで計測する。履歴からの学習（キャッシュが無い初回だけ）は別に表示
+    """
+    started = time.perf_counter()
+    model = HistoryModel.load_or_build(None)
+    cold = time.perf_counter() - started
+    model.save(MODEL_CACHE_PATH)
+    titles = [t for t, _ in model.titles]
+    repeated = (titles * (size // max(len(titles), 1) + 1))[:size]
+
+    timings = {}
+    started = time.perf_counter()
+    ranker = HistoryModel.load(MODEL_CACHE_PATH).ranker
+    timings["モデル読み込み"] = time.perf_counter() - started
+    mark = time.perf_counter()
+    tf = ranker.add_documents(repeated)
+    ranker.set_profile(company_skills)
+    timings["解析・追加学習"] = time.perf_counter() - mark
+    mark = time.perf_counter()
+    ranker.score_matrix(ranker.weight(tf))
+    timings["重み付け・スコアリング"] = time.perf_counter() - mark
+    total = time.perf_counter() - started
+
+    print(f"⏱️ 履歴 {len(titles):,}件からの学習（キャッシュが無い初回のみ）: {cold:.2f}秒")
+    print(f"⏱️ {size:,}件: 合計 {total:.2f}秒（" + " / ".join(f"{k} {v:.2f}秒" for k, v in timings.items()) + "）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TF-IDF 関連度ランキングの評価")
+    parser.add_argument("--bench", action="store_true", help="10万件の処理時間（モデルの読み込みから）を計測")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    from fetch_lancers_improved import COMPANY_SKILLS
+    if args.bench:
+        bench(COMPANY_SKILLS)
+    else:
+        evaluate(COMPANY_SKILLS, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+募集中の案件の再訪スケジューラ
+
+一度取得した案件を open_jobs.json で追跡し、詳細ページを優先度に応じた間隔で再確認します。
+- スコアが高い・締切が近い・応募者が少ない案件ほど短い間隔
+- 掲載から日が経った案件ほど長い間隔
+- 1回の実行で確認するのは REVISIT_BUDGET 件まで（期限超過の度合い × 重要度の順）
+
+再確認の結果（価格・応募数・締切・募集終了）は追跡レコードに反映され、
+募集終了とするのは案件自身の状態の要素が「募集終了」のとき・詳細ページが 404/410 のときだけです
+（関連案件・サイドバーの「募集終了」は見ません。lancers_detail.py）。
+「ランサーズ」シートには今回の一覧に加えて募集中の追跡案件が最新の状態で書き出されます
+（募集終了になった案件はシートから外れます）。
+
+使い方:
+    python revisit_scheduler.py            # 次に再確認する案件の一覧（通信しない）
+    python revisit_scheduler.py --run      # 予算内で再確認して保存
+"""
+
+import argparse
+import asyncio
+import json
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import aiohttp
+
+from job_model import Job
+from lancers_rss import USER_AGENT, fetch_detail_fields
+from rule_pack import get_rules
+
+OPEN_JOBS_PATH = "open_jobs.json"
+BASE_INTERVAL_HOURS = 24
+MIN_INTERVAL_HOURS = 1
+MAX_INTERVAL_HOURS = 24 * 7
+CLOSED_RETENTION = timedelta(days=7)   # 募集終了の記録を残す期間
+TRACKING_LIMIT = timedelta(days=30)    # これより前に初出した案件は追跡をやめる（Excelの保持期間と同じ）
+
+_DAYS_LEFT = re.compile(r"(?:あと|残り)\s*(\d+)\s*日")
+_HOURS_LEFT = re.compile(r"(?:あと|残り)\s*(\d+)\s*(?:時間|分)")
+
+
+def days_left(deadline: str, observed_at: datetime, now: datetime):
+    """締切表記から残り日数（観測時点からの経過を差し引く）。読み取れなければ None"""
+    if m := _DAYS_LEFT.search(deadline or ""):
+        remaining = int(m.group(1))
+    elif _HOURS_LEFT.search(deadline or ""):
+        remaining = 0
+    else:
+        return None
+    return remaining - (now - observed_at).total_seconds() / 86400
+
+
+def revisit_interval(entry: dict, now: datetime) -> timedelta:
+    """案件ごとの再確認間隔"""
+    job = entry["job"]
+    hours = BASE_INTERVAL_HOURS
+    score = job.get("priority_score", 0)
+    if score >= 300:
+        hours *= 0.25
+    elif score >= 150:
+        hours *= 0.5
+    remaining = days_left(job.get("deadline", ""), datetime.fromisoformat(entry["last_checked"]), now)
+    if remaining is not None:
+        if remaining <= 1:
+            hours *= 0.25
+        elif remaining <= 3:
+            hours *= 0.5
+    applicants = job.get("applicant_count", "")
+    if str(applicants).isdigit():
+        if int(applicants) <= 2:
+            hours *= 0.5
+        elif int(applicants) >= 20:
+            hours *= 2
+    age = now - datetime.fromisoformat(entry["first_seen"])
+    if age > timedelta(days=14):
+        hours *= 4
+    elif age > timedelta(days=7):
+        hours *= 2
+    return timedelta(hours=min(max(hours, MIN_INTERVAL_HOURS), MAX_INTERVAL_HOURS))
+
+
+class OpenJobTracker:
+    def __init__(self, path: str = OPEN_JOBS_PATH):
+        self.path = path
+        self.entries = {}  # 案件ID（文字列）→ {job, first_seen, last_checked, checks, closed_at}
+        try:
+            self.entries = json.loads(Path(path).read_text(encoding="utf-8")).get("jobs", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ 追跡ファイルの読み込みエラー（新規に追跡します）: {e}")
+
+    def track(self, jobs, now: datetime):
+        """今回一覧で見えた案件は、取得したばかりなので確認済みとして記録"""
+        stamp = now.isoformat(timespec="seconds")
+        for job in jobs:
+            if job.job_id is None:
+                continue
+            key = str(job.job_id)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.entries[key] = {"job": job.to_dict(), "first_seen": stamp, "last_checked": stamp,
+                                     "checks": 0, "closed_at": None}
+            else:
+                entry["job"] = job.to_dict()
+                entry["last_checked"] = stamp
+
+    def merge(self, entries: dict):
+        """別の実行で更新された追跡レコードを取り込む（確認時刻の新しい方を残す）"""
+        for key, entry in entries.items():
+            current = self.entries.get(key)
+            if current is None or entry["last_checked"] >= current["last_checked"]:
+                self.entries[key] = entry
+
+    def prune(self, now: datetime):
+        for key, entry in list(self.entries.items()):
+            closed_at = entry.get("closed_at")
+            if closed_at and now - datetime.fromisoformat(closed_at) > CLOSED_RETENTION:
+                del self.entries[key]
+            elif now - datetime.fromisoformat(entry["first_seen"]) > TRACKING_LIMIT:
+                del self.entries[key]
+
+    def due(self, now: datetime, budget: int, exclude=()) -> list:
+        """再確認の期限が来た募集中の案件を、重要度の高い順に予算分だけ返す"""
+        excluded = {str(i) for i in exclude}
+        candidates = []
+        for key, entry in self.entries.items():
+            if entry.get("closed_at") or key in excluded:
+                continue
+            interval = revisit_interval(entry, now)
+            overdue = (now - datetime.fromisoformat(entry["last_checked"])) / interval
+            if overdue >= 1:
+                weight = overdue * (1 + entry["job"].get("priority_score", 0) / 100)
+                candidates.append((weight, key))
+        candidates.sort(reverse=True)
+        return [key for _, key in candidates[:budget]]
+
+    def apply(self, key: str, fields: dict, now: datetime, rescore=None) -> Job:
+        """再確認の結果を反映し、更新後の案件を返す"""
+        entry = self.entries[key]
+        job = Job.from_dict(entry["job"])
+        for name in ("price", "deadline", "applicant_count", "recruitment_count", "status"):
+            if name in fields:
+                setattr(job, name, fields[name])
+        if fields.get("urgency"):
+            job.urgency = True
+        if rescore is not None:
+            job.priority_score = rescore(job)
+        entry["job"] = job.to_dict()
+        entry["last_checked"] = now.isoformat(timespec="seconds")
+        entry["checks"] = entry.get("checks", 0) + 1
+        if get_rules().is_closed(job.status):
+            entry["closed_at"] = entry["last_checked"]
+        return job
+
+    def open_jobs(self, exclude=()) -> list:
+        """募集中として追跡している案件（最新の状態）"""
+        excluded = {str(i) for i in exclude}
+        return [Job.from_dict(e["job"]) for k, e in self.entries.items() if not e.get("closed_at") and k not in excluded]
+
+    def is_closed(self, key: str) -> bool:
+        return bool(self.entries[key].get("closed_at"))
+
+    def save(self):
+        data = {"updated_at": datetime.now().isoformat(), "jobs": self.entries}
+        Path(self.path).write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+
+async def recheck(links: dict, concurrency: int = 4) -> dict:
+    """{キー: 詳細URL} を再取得し、{キー: 案件自身の要素の項目} を返す（404/410 は募集終了扱い）"""
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {}
+    async with aiohttp.ClientSession(headers={"User-Agent": USER_AGENT}) as session:
+        async def one(key, link):
+            async with semaphore:
+                try:
+                    results[key] = await fetch_detail_fields(session, link)
+                except aiohttp.ClientResponseError as e:
+                    if e.status in (404, 410):
+                        results[key] = {"status": "募集終了"}
+                    else:
+                        print(f"⚠️ 再確認エラー ({key}): {e.status}")
+                except Exception as e:
+                    print(f"⚠️ 再確認エラー ({key}): {e}")
+        await asyncio.gather(*(one(k, link) for k, link in links.items()))
+    return results
+
+
+async def revisit(tracker: OpenJobTracker, now: datetime, budget: int, exclude=(), rescore=None,
+                  concurrency: int = 4) -> list:
+    """予算内で再確認して更新後の案件のリストを返す"""
+    keys = tracker.due(now, budget, exclude)
+    if not keys:
+        return []
+    print(f"🔁 募集中の案件を再確認: {len(keys)}件（予算 {budget}件 / 追跡 {len(tracker.entries)}件）")
+    fields = await recheck({k: Job.from_dict(tracker.entries[k]["job"]).link for k in keys}, concurrency)
+    return [tracker.apply(k, f, now, rescore) for k, f in fields.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="募集中の案件の再訪スケジューラ")
+    parser.add_argument("--run", action="store_true", help="予算内で再確認して保存する")
+    parser.add_argument("--budget", type=int, default=20)
+    args = parser.parse_args()
+
+    now = datetime.now()
+    tracker = OpenJobTracker()
+    if args.run:
+        updated = asyncio.run(revisit(tracker, now, args.budget))
+        tracker.save()
+        closed = sum(1 for job in updated if tracker.is_closed(str(job.job_id)))
+        print(f"✅ 更新 {len(updated)}件（うち募集終了 {closed}件）")
+        return
+    keys = tracker.due(now, args.budget)
+    print(f"📋 追跡中 {len(tracker.entries)}件 / 再確認対象 {len(keys)}件")
+    for key in keys:
+        entry = tracker.entries[key]
+        job = entry["job"]
+        print(f"   {key}  間隔 {revisit_interval(entry, now)}  スコア {job.get('priority_score')}  {job.get('title', '')[:40]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+判定ルール（rules.json）の検証・コンパイル・再読み込み
+
+スキル・追加キーワード・除外語・配点を rules.json の1か所にまとめ、
+検証したうえで判定用の表（小文字化したキーワード列・配点表）にコンパイルします。
+- コンパイル結果は rules.json の内容ハッシュをキーに .rule_pack_cache.pkl に保存し、
+  内容が同じなら次回の起動では検証・コンパイルを省略
+- RuleWatcher.current() はファイルの更新を数秒ごとに確認し、変わっていれば再コンパイルして差し替え
+  （常駐プロセスでも再起動不要。検証に失敗した場合は直前のルールのまま続行）
+
+使い方:
+    python rule_pack.py             # 検証してコンパイル結果の概要を表示
+    python rule_pack.py --verify    # 保存済みスナップショットのスコアが再現できるか確認
+    RULES_PATH=rules.test.json python rule_pack.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+import time
+from pathlib import Path
+
+RULES_PATH = os.getenv("RULES_PATH", "rules.json")
+CACHE_PATH = ".rule_pack_cache.pkl"
+COMPILED_FORMAT = 1         # CompiledRules の構造を変えたら上げる
+RELOAD_CHECK_SEC = 2.0      # ファイル更新の確認間隔
+
+_PRICE_NUMBERS = re.compile(r"(\d+,?\d*)")
+
+
+class RulePackError(ValueError):
+    """rules.json の内容が不正"""
+
+
+# =============================
+# コンパイル済みルール
+# =============================
+class CompiledRules:
+    def __init__(self, data: dict, source_hash: str):
+        scoring = data["scoring"]
+        self.source_hash = source_hash
+        self.company_skills = {p: list(keywords) for p, keywords in data["skills"].items()}
+        self.additional_keywords = dict(data.get("additional_keywords", {}))
+        self.exclude_keywords = list(data.get("exclude_keywords", []))
+        self.keyword_bonus = {k.lower(): v for k, v in scoring.get("keyword_bonus", {}).items()}
+        self.priority_points = dict(scoring["priority_points"])
+        self.skill_count_bonus = tuple(sorted(map(tuple, scoring.get("skill_count_bonus", [])), reverse=True))
+        self.urgency_bonus = scoring.get("urgency_bonus", 0)
+        self.applicant_bonus = tuple(sorted(map(tuple, scoring.get("applicant_bonus", []))))
+        self.price_bonus = tuple(sorted(map(tuple, scoring.get("price_bonus", [])), reverse=True))
+        self.min_score = scoring.get("min_score", 0)
+        self.closed_status_words = tuple(data.get("closed_status_words", []))
+
+        # (検索キー, 表示名, 優先度)。同じ表示名は最初の1つだけ（後のものは決してヒットしないため）
+        entries = [(k, p) for p, keywords in self.company_skills.items() for k in keywords]
+        entries += list(self.additional_keywords.items())
+        seen = set()
+        self.skill_keys = []
+        for keyword, priority in entries:
+            if keyword not in seen:
+                seen.add(keyword)
+                self.skill_keys.append((keyword.lower(), keyword, priority))
+        self.skill_keys = tuple(self.skill_keys)
+        self.exclude_keys = tuple(dict.fromkeys(k.lower() for k in self.exclude_keywords))
+
+    def skill_matches(self, title_lower: str) -> list:
+        """タイトル（小文字化済み）に含まれるスキルの (表示名, 優先度)"""
+        return [(skill, priority) for key, skill, priority in self.skill_keys if key in title_lower]
+
+    def is_excluded(self, title_lower: str) -> bool:
+        return any(key in title_lower for key in self.exclude_keys)
+
+    def is_closed(self, status: str) -> bool:
+        return any(word in status for word in self.closed_status_words)
+
+    def has_bonus_keyword(self, title_lower: str) -> bool:
+        return any(key in title_lower for key in self.keyword_bonus)
+
+    def skill_score(self, priorities) -> int:
+        """スキルの優先度による配点と、マッチ数に応じた加点"""
+        score = sum(self.priority_points.get(p, 0) for p in priorities)
+        count = len(priorities)
+        for min_count, points in self.skill_count_bonus:
+            if count >= min_count:
+                score += points
+                break
+        return score
+
+    def keyword_score(self, title_lower: str) -> int:
+        return sum(bonus for key, bonus in self.keyword_bonus.items() if key in title_lower)
+
+    def context_score(self, urgency: bool, applicant_count, price_text: str) -> int:
+        """急募・応募者数・予算による加点（スキルに依存しない部分）"""
+        score = self.urgency_bonus if urgency else 0
+        try:
+            applicants = int(applicant_count)
+        except (TypeError, ValueError):
+            applicants = None
+        if applicants is not None:
+            for max_applicants, points in self.applicant_bonus:
+                if applicants <= max_applicants:
+                    score += points
+                    break
+        if "円" in (price_text or ""):
+            numbers = _PRICE_NUMBERS.findall(price_text.replace(",", ""))
+            if numbers:
+                max_price = max(int(num) for num in numbers)
+                for min_price, points in self.price_bonus:
+                    if max_price >= min_price:
+                        score += points
+                        break
+        return score
+
+
+# =============================
+# 検証
+# =============================
+def validate(data) -> None:
+    errors = []
+    if not isinstance(data, dict):
+        raise RulePackError("rules.json の最上位はオブジェクトにしてください")
+    scoring = data.get("scoring")
+    if not isinstance(scoring, dict):
+        errors.append("scoring がありません")
+        scoring = {}
+    points = scoring.get("priority_points")
+    if not isinstance(points, dict) or not points:
+        errors.append("scoring.priority_points がありません")
+        points = {}
+    for name, value in points.items():
+        if not isinstance(value, int):
+            errors.append(f"scoring.priority_points.{name} は整数にしてください")
+
+    skills = data.get("skills")
+    if not isinstance(skills, dict) or not skills:
+        errors.append("skills がありません")
+        skills = {}
+    for priority, keywords in skills.items():
+        if priority not in points:
+            errors.append(f"skills: 未定義の優先度 '{priority}'")
+        if not isinstance(keywords, list) or not all(isinstance(k, str) and k.strip() for k in keywords):
+            errors.append(f"skills.{priority} は空でない文字列の配列にしてください")
+    for keyword, priority in data.get("additional_keywords", {}).items():
+        if priority not in points:
+            errors.append(f"additional_keywords.{keyword}: 未定義の優先度 '{priority}'")
+    for key in ("exclude_keywords", "closed_status_words"):
+        values = data.get(key, [])
+        if not isinstance(values, list) or not all(isinstance(k, str) and k.strip() for k in values):
+            errors.append(f"{key} は空でない文字列の配列にしてください")
+    for key, value in scoring.get("keyword_bonus", {}).items():
+        if not isinstance(value, int):
+            errors.append(f"scoring.keyword_bonus.{key} は整数にしてください")
+    for key in ("skill_count_bonus", "applicant_bonus", "price_bonus"):
+        for pair in scoring.get(key, []):
+            if not (isinstance(pair, list) and len(pair) == 2 and all(isinstance(v, int) for v in pair)):
+                errors.append(f"scoring.{key} は [しきい値, 点数] の整数の組の配列にしてください")
+                break
+    for key in ("urgency_bonus", "min_score"):
+        if not isinstance(scoring.get(key, 0), int):
+            errors.append(f"scoring.{key} は整数にしてください")
+    if errors:
+        raise RulePackError("rules.json の検証エラー:\n  - " + "\n  - ".join(errors))
+
+
+# =============================
+# 読み込み（内容ハッシュでキャッシュ）
+# =============================
+def compile_rules(raw: bytes, cache_path: str = CACHE_PATH) -> CompiledRules:
+    source_hash = hashlib.sha256(raw).hexdigest()
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("format") == COMPILED_FORMAT and cached.get("hash") == source_hash:
+            return cached["rules"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️ ルールのキャッシュを読めません（コンパイルし直します）: {e}")
+
+    data = json.loads(raw.decode("utf-8"))
+    validate(data)
+    rules = CompiledRules(data, source_hash)
+    try:
+        tmp = f"{cache_path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"format": COMPILED_FORMAT, "hash": source_hash, "rules": rules}, f)
+        os.replace(tmp, cache_path)
+    except Exception as e:
+        print(f"⚠️ ルールのキャッシュ保存エラー: {e}")
+    return rules
+
+
+def load_rules(path: str = RULES_PATH, cache_path: str = CACHE_PATH) -> CompiledRules:
+    return compile_rules(Path(path).read_bytes(), cache_path)
+
+
+class RuleWatcher:
+    """rules.json の更新を検知して差し替える"""
+
+    def __init__(self, path: str = RULES_PATH, cache_path: str = CACHE_PATH):
+        self.path = path
+        self.cache_path = cache_path
+        self._stamp = self._stat()
+        self.rules = load_rules(path, cache_path)
+        self._checked_at = time.monotonic()
+
+    def _stat(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def current(self) -> CompiledRules:
+        now = time.monotonic()
+        if now - self._checked_at < RELOAD_CHECK_SEC:
+            return self.rules
+        self._checked_at = now
+        try:
+            stamp = self._stat()
+            if stamp != self._stamp:
+                self._stamp = stamp
+                rules = load_rules(self.path, self.cache_path)
+                if rules.source_hash != self.rules.source_hash:
+                    self.rules = rules
+                    print(f"🔄 判定ルールを再読み込みしました: {self.path}")
+        except Exception as e:
+            print(f"⚠️ 判定ルールの再読み込みエラー（直前のルールで続行）: {e}")
+        return self.rules
+
+
+_WATCHERS = {}
+
+
+def get_rules(path: str = RULES_PATH) -> CompiledRules:
+    """パスごとに共有する RuleWatcher から現在のルールを返す"""
+    watcher = _WATCHERS.get(path)
+    if watcher is None:
+        watcher = _WATCHERS[path] = RuleWatcher(path)
+    return watcher.current()
+
+
+# =============================
+# 確認用
+# =============================
+def verify(path: str):
+    """保存済みスナップショットのスキル・スコアを rules.json から再現できるか"""
+    from snapshot_store import iter_snapshot_jobs, list_snapshot_paths
+    from text_normalize import normalize
+
+    rules = load_rules(path)
+    jobs = {}
+    for snapshot in list_snapshot_paths():
+        for job in iter_snapshot_jobs(snapshot):
+            jobs[job["link"]] = job
+    mismatches = 0
+    for job in jobs.values():
+        lower = normalize(job["title"]).lower
+        matches = rules.skill_matches(lower)
+        score = (rules.skill_score([p for _, p in matches]) + rules.keyword_score(lower)
+                 + rules.context_score(job.get("urgency"), job.get("applicant_count"), job.get("price", "")))
+        if [{"skill": s, "priority": p} for s, p in matches] != job.get("skill_matches") \
+                or score != job.get("priority_score"):
+            mismatches += 1
+    print(f"📊 rules.json vs 保存済みスコア: 不一致 {mismatches} / {len(jobs)}件")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="判定ルール（rules.json）の検証・コンパイル")
+    parser.add_argument("path", nargs="?", default=RULES_PATH)
+    parser.add_argument("--verify", action="store_true", help="保存済みスナップショットのスコアと照合")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rules = load_rules(args.path)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"✅ {args.path}（sha256 {rules.source_hash[:12]}…, {elapsed:.1f}ms）")
+    print(f"   スキル {len(rules.skill_keys)}語 / 除外 {len(rules.exclude_keys)}語 / 加点 {len(rules.keyword_bonus)}語")
+    if args.verify:
+        verify(args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+実行ごとの結果シャードと、履歴・Excelへのまとめ反映（コンパクション）
+
+OUTPUT_MODE=shard で実行すると、1回の実行の結果（案件一覧・再確認の結果・状態の更新分）を
+run_shards/<取得時刻>_<実行ID>.json.gz の1ファイルにだけ書き出し、案件情報.xlsx や JSON の履歴には触れません。
+書き出したシャードは以後変更しないので、複数の実行が並行・重複しても同じファイルを取り合いません。
+
+compact で未反映のシャードを取得時刻の順に、main() と同じ処理でまとめて反映します。
+- スナップショット履歴・スキルトレンド・open_jobs.json・状態ファイル（probe_state.json など）・「ランサーズ」シート
+- 反映した実行IDは run_shards/compacted.json に記録し、同じシャードを2度反映しない（何度実行しても同じ結果）
+- 反映済みより古いシャード（遅れて届いたもの）は履歴・トレンドにだけ加え、シート・追跡・状態は新しい方を残す
+- 反映したシャードファイルは削除する（--keep で残す）
+
+使い方:
+    python run_shards.py                  # 未反映のシャード
+    python run_shards.py compact          # まとめて反映
+    python run_shards.py compact --keep   # シャードファイルを残す
+"""
+
+import argparse
+import gzip
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+SHARD_DIR = os.getenv("RUN_SHARD_DIR", "run_shards")
+LEDGER_NAME = "compacted.json"
+LEDGER_RETENTION = timedelta(days=90)  # これより前に反映した実行IDは記録から外す
+
+
+def current_run_id() -> str:
+    """実行ID（RUN_ID > GitHub Actions の実行番号 > ローカルでは一意な値）"""
+    if os.getenv("RUN_ID"):
+        return os.getenv("RUN_ID")
+    if os.getenv("GITHUB_RUN_ID"):
+        return f"{os.getenv('GITHUB_RUN_ID')}-{os.getenv('GITHUB_RUN_ATTEMPT', '1')}"
+    return f"local-{uuid.uuid4().hex[:8]}"
+
+
+def list_shards(root: str = SHARD_DIR) -> list:
+    """シャードのパス（ファイル名の先頭が取得時刻なので名前順 = 時刻順）"""
+    directory = Path(root)
+    if not directory.exists():
+        return []
+    return sorted(directory.glob("*.json.gz"))
+
+
+def write_shard(data: dict, root: str = SHARD_DIR) -> Path:
+    """結果を新しいシャードとして書き出す（同じ名前のファイルがあれば上書きせずエラー）"""
+    run_id = data.setdefault("run_id", current_run_id())
+    timestamp = datetime.fromisoformat(data["timestamp"])
+    path = Path(root) / f"{timestamp:%Y%m%d_%H%M%S}_{run_id}.json.gz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    with open(path, "xb") as f:
+        f.write(gzip.compress(body, mtime=0))
+    return path
+
+
+def read_shard(path) -> dict:
+    return json.loads(gzip.decompress(Path(path).read_bytes()))
+
+
+# =============================
+# 反映済みの記録
+# =============================
+def load_ledger(root: str = SHARD_DIR) -> dict:
+    try:
+        return json.loads((Path(root) / LEDGER_NAME).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"latest": None, "runs": {}}
+
+
+def save_ledger(ledger: dict, now: datetime, root: str = SHARD_DIR):
+    cutoff = (now - LEDGER_RETENTION).isoformat()
+    ledger["runs"] = {run_id: entry for run_id, entry in sorted(ledger["runs"].items(), key=lambda kv: kv[1]["timestamp"])
+                      if entry["compacted_at"] >= cutoff}
+    path = Path(root) / LEDGER_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(ledger, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+def merge_state(updates: dict):
+    """{ファイル名: {キー: 値}} を各JSONファイルへキー単位で上書き（probe_state.json・selector_cache.json など）"""
+    for name, entries in updates.items():
+        path = Path(name)
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            state = {}
+        state.update(entries)
+        path.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+# =============================
+# コンパクション
+# =============================
+def apply_shard(app, shard: dict, excel_path: str, latest: bool):
+    """シャード1つを main() の保存以降と同じ順で反映する。latest=False（遅れて届いた）ならシートと状態は触らない"""
+    from job_model import jobs_from_dicts
+    from job_stats import RunStats, update_trends
+    from revisit_scheduler import OpenJobTracker
+
+    taken_at = datetime.fromisoformat(shard["timestamp"])
+    notifier = app.CompleteJobsNotifier()
+    notifier.clock = lambda: taken_at
+    jobs = jobs_from_dicts(shard.get("jobs", []))
+
+    # 追跡は main() と同じく「今回の一覧を記録 → 期限切れを外す → 再確認の結果」の順。
+    # 一覧外の募集中の案件は、実行時点ではなく反映時点の追跡状態から決める（並行した実行の再確認も含める）
+    tracker = OpenJobTracker(app.OPEN_JOBS_PATH)
+    if latest:
+        tracker.track(jobs, taken_at)
+        tracker.prune(taken_at)
+    tracker.merge(shard.get("revisited", {}))
+    tracker.save()
+    if latest:
+        merge_state(shard.get("state", {}))
+    if not jobs:
+        return
+
+    stats = RunStats(jobs)
+    update_trends(stats, taken_at)
+    notifier.save_data(jobs, stats)
+    if latest:
+        app.clean_excel_data(excel_path, taken_at)
+        carried = tracker.open_jobs(exclude=[job.job_id for job in jobs])
+        sheet = {"timestamp": shard["timestamp"], "jobs": jobs + carried}
+        app.replace_lancers_sheet(sheet, excel_path, taken_at)
+        app.clean_excel_data(excel_path, taken_at)
+
+
+def compact(root: str = SHARD_DIR, excel_path: str = None, keep: bool = False) -> dict:
+    """未反映のシャードを時刻順に反映し、件数を返す"""
+    import fetch_lancers_improved as app  # EXCEL_PATH などの環境変数を反映させるため、ここで読み込む
+
+    excel_path = excel_path or app.EXCEL_PATH
+    ledger = load_ledger(root)
+    result = {"applied": 0, "late": 0, "skipped": 0}
+    for path in list_shards(root):
+        shard = read_shard(path)
+        run_id = shard["run_id"]
+        if run_id in ledger["runs"]:
+            result["skipped"] += 1
+        else:
+            latest = ledger["latest"] is None or shard["timestamp"] >= ledger["latest"]
+            print(f"\n📦 シャードを反映: {path.name}（{len(shard.get('jobs', []))}件{'' if latest else '・遅延分は履歴のみ'}）")
+            apply_shard(app, shard, excel_path, latest)
+            now = datetime.now()
+            ledger["runs"][run_id] = {"timestamp": shard["timestamp"], "compacted_at": now.isoformat(timespec="seconds")}
+            if latest:
+                ledger["latest"] = shard["timestamp"]
+            save_ledger(ledger, now, root)  # 1つ反映するごとに記録（途中で止まっても反映済みは繰り返さない）
+            result["applied" if latest else "late"] += 1
+        if not keep:
+            path.unlink()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="実行ごとの結果シャードを履歴・Excelへまとめて反映")
+    parser.add_argument("command", nargs="?", choices=["list", "compact"], default="list")
+    parser.add_argument("--dir", default=SHARD_DIR, help="シャードの置き場所")
+    parser.add_argument("--excel", help="反映先のブック（既定: 本体の EXCEL_PATH）")
+    parser.add_argument("--keep", action="store_true", help="反映したシャードファイルを削除しない")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        ledger = load_ledger(args.dir)
+        shards = list_shards(args.dir)
+        print(f"📦 シャード {len(shards)}個（最後に反映した取得時刻: {ledger['latest'] or 'なし'}）")
+        for path in shards:
+            shard = read_shard(path)
+            state = "反映済み" if shard["run_id"] in ledger["runs"] else "未反映"
+            print(f"   {path.name}  {len(shard.get('jobs', []))}件  {state}")
+        return
+
+    started = time.perf_counter()
+    result = compact(args.dir, args.excel, args.keep)
+    print(f"\n✅ コンパクション: 反映 {result['applied']} / 遅延分（履歴のみ） {result['late']} / "
+          f"反映済みでスキップ {result['skipped']} / {time.perf_counter() - started:.2f}秒")
+
+
+if __name__ == "__main__":
+    main()
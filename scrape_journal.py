@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+取得途中のチェックポイント（再開用ジャーナル）
+
+抽出した案件を1件ずつ JSON Lines で追記します。取得が途中で失敗・中断した場合は
+ジャーナルが残り、次の実行は記録済みの案件を読み込んで、未処理のカードだけを抽出します。
+取得が最後まで終わるとジャーナルは削除されます。
+
+形式（.scrape_journal.jsonl）:
+    {"type": "run", "url": "...", "started_at": "..."}
+    {"type": "job", "job": {...}}   ← Job.to_dict()
+    ...
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from job_model import Job
+
+JOURNAL_PATH = ".scrape_journal.jsonl"
+JOURNAL_MAX_AGE = timedelta(hours=6)  # これより古いジャーナルは再開に使わない
+
+
+class ScrapeJournal:
+    def __init__(self, path: str = JOURNAL_PATH, url: str = ""):
+        self.path = path
+        self.url = url
+        self._file = None
+
+    def resume(self) -> list:
+        """同じURL・有効期限内のジャーナルがあれば記録済みの案件を返す（壊れた末尾行は無視）"""
+        try:
+            lines = Path(self.path).read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return []
+        jobs = []
+        try:
+            header = json.loads(lines[0])
+            started_at = datetime.fromisoformat(header["started_at"])
+            if header.get("url") != self.url or datetime.now() - started_at > JOURNAL_MAX_AGE:
+                print("🗑️ 古い取得ジャーナルを破棄します")
+                self.discard()
+                return []
+            for line in lines[1:]:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # 書き込み途中で止まった行
+                if record.get("type") == "job":
+                    jobs.append(Job.from_dict(record["job"]))
+        except Exception as e:
+            print(f"⚠️ 取得ジャーナルの読み込みエラー（最初から取得します）: {e}")
+            self.discard()
+            return []
+        if jobs:
+            print(f"♻️ 前回の取得を再開: 記録済み {len(jobs)}件")
+        return jobs
+
+    def _open(self):
+        if self._file is None:
+            fresh = not Path(self.path).exists()
+            self._file = open(self.path, "a", encoding="utf-8")
+            if fresh:
+                self._write({"type": "run", "url": self.url, "started_at": datetime.now().isoformat()})
+        return self._file
+
+    def _write(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def record(self, job: Job):
+        self._open()
+        self._write({"type": "job", "job": job.to_dict()})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def complete(self):
+        """取得が最後まで終わったらジャーナルを消す"""
+        self.close()
+        self.discard()
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
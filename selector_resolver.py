@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+案件一覧ページのセレクタ自動判定（レイアウトの指紋ごとにキャッシュ）
+
+config.py のセレクタ候補（JOB_SELECTORS・PRICE_SELECTORS など）をページ上で一度だけ試し、
+当たったものを「レイアウトの指紋」ごとに selector_cache.json へ保存します。
+- 指紋は、ページ内の要素の「タグ名＋クラス名」の組み合わせ（数字を含む可変のクラスは除く）を並べたハッシュ
+- 次回以降は指紋を取るだけでキャッシュのセレクタを使い、候補の試行はしない
+- 指紋が変わった（サイトの改修など）・候補の一覧が変わった・キャッシュのセレクタで案件が見つからない、
+  のいずれかのときだけ判定し直す
+- 候補がどれも当たらない項目は、クラス名に "price" などを含む要素から具体的なクラスを割り出す
+  （[class*='price'] のような全体検索は判定のときだけ行い、毎回の取得では使わない）
+
+使い方:
+    python selector_resolver.py            # キャッシュ済みのレイアウトと採用したセレクタ
+    python selector_resolver.py --clear    # キャッシュを消す（次回の取得で判定し直す）
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from config import (APPLICANT_SELECTORS, CARD_SELECTORS, DEADLINE_SELECTORS, JOB_SELECTORS,
+                    MORE_BUTTON_SELECTORS, PRICE_SELECTORS, SELECTOR_CLASS_HINTS)
+
+SELECTOR_CACHE_PATH = os.getenv("SELECTOR_CACHE_PATH", "selector_cache.json")
+MAX_LAYOUTS = 8        # キャッシュに残すレイアウト数（判定の新しい順）
+SAMPLE_CARDS = 30      # カード内の項目を判定するときに調べるカード数
+JOB_COVERAGE = 0.9     # 案件リンクの候補は、ページ内の案件IDをこの割合以上拾えること
+
+FIELDS = {
+    "price": PRICE_SELECTORS,
+    "deadline": DEADLINE_SELECTORS,
+    "applicant": APPLICANT_SELECTORS,
+}
+# カード内の項目として採用する条件（テキストに対する正規表現）
+FIELD_PATTERNS = {"price": "円", "deadline": r"\S", "applicant": r"\d"}
+
+# 判定できなかった項目は候補をまとめたセレクタで探す（ワイルドカードは使わない）
+DEFAULT_SELECTORS = {
+    "job": JOB_SELECTORS[0],
+    "card": ", ".join(CARD_SELECTORS),
+    "price": ", ".join(PRICE_SELECTORS),
+    "deadline": ", ".join(DEADLINE_SELECTORS),
+    "applicant": ", ".join(APPLICANT_SELECTORS),
+    "more": ", ".join(MORE_BUTTON_SELECTORS),
+}
+
+# =============================
+# ページ内で実行するスクリプト
+# =============================
+_FINGERPRINT_JS = """() => {
+    const seen = new Set();
+    for (const el of document.body.querySelectorAll('[class]')) {
+        const classes = [...el.classList].filter(c => !/\\d{2,}/.test(c)).sort();
+        if (classes.length) seen.add(el.tagName.toLowerCase() + '.' + classes.join('.'));
+    }
+    return [...seen].sort();
+}"""
+
+_JOB_ID_JS = """
+    const jobId = el => {
+        const m = (el.getAttribute('href') || '').match(/\\/work\\/detail\\/(\\d+)/);
+        return m ? m[1] : null;
+    };
+    const queryAll = (root, selector) => {
+        try { return [...root.querySelectorAll(selector)]; } catch (e) { return null; }
+    };
+"""
+
+# 案件リンクの候補ごとに、要素数と拾える案件IDの数
+_PROBE_JOBS_JS = """(candidates) => {""" + _JOB_ID_JS + """
+    const total = new Set(queryAll(document, "a[href*='/work/detail/']").map(jobId).filter(Boolean)).size;
+    const results = candidates.map(selector => {
+        const elements = queryAll(document, selector);
+        if (elements === null) return {selector, error: true, elements: 0, ids: 0};
+        const ids = new Set(elements.map(jobId).filter(Boolean));
+        return {selector, elements: elements.length, ids: ids.size};
+    });
+    return {total, results};
+}"""
+
+# カードの候補ごとに、案件リンクから辿って「案件1件だけを含む要素」に行き着く数
+_PROBE_CARDS_JS = """({job, candidates, sample}) => {""" + _JOB_ID_JS + """
+    const anchors = [];
+    const seen = new Set();
+    for (const a of queryAll(document, job) || []) {
+        const id = jobId(a);
+        if (id && !seen.has(id)) { seen.add(id); anchors.push(a); }
+        if (anchors.length >= sample) break;
+    }
+    const results = candidates.map(selector => {
+        let hits = 0;
+        for (const a of anchors) {
+            let card = null;
+            try { card = a.closest(selector); } catch (e) { return {selector, error: true, hits: 0}; }
+            if (!card) continue;
+            const ids = new Set(queryAll(card, "a[href*='/work/detail/']").map(jobId).filter(Boolean));
+            if (ids.size === 1) hits += 1;
+        }
+        return {selector, hits};
+    });
+    return {sampled: anchors.length, results};
+}"""
+
+# カード内の項目（価格など）と「もっと見る」ボタンの候補ごとの当たり数。
+# 候補が当たらない場合に備え、クラス名にヒントの語を含む要素のクラスも数える
+_PROBE_FIELDS_JS = """({job, card, fields, patterns, hints, more, sample}) => {""" + _JOB_ID_JS + """
+    const cards = [];
+    const seen = new Set();
+    for (const a of queryAll(document, job) || []) {
+        const id = jobId(a);
+        if (!id || seen.has(id)) continue;
+        seen.add(id);
+        const c = a.closest(card);
+        if (c) cards.push(c);
+        if (cards.length >= sample) break;
+    }
+    const derive = (elements, hint, accept) => {
+        const counts = new Map();
+        for (const group of elements) {
+            const tokens = new Set();
+            for (const el of group) {
+                if (!accept(el)) continue;
+                for (const c of el.classList) {
+                    if (c.toLowerCase().includes(hint) && !/\\d{2,}/.test(c)) tokens.add(c);
+                }
+            }
+            for (const t of tokens) counts.set(t, (counts.get(t) || 0) + 1);
+        }
+        return [...counts].sort((a, b) => b[1] - a[1]).slice(0, 3)
+            .map(([token, hits]) => ({selector: '.' + CSS.escape(token), hits, derived: true}));
+    };
+    const results = {};
+    for (const [role, candidates] of Object.entries(fields)) {
+        const pattern = new RegExp(patterns[role]);
+        const matches = el => !!el && pattern.test(el.textContent || '');
+        results[role] = candidates.map(selector => {
+            let hits = 0;
+            for (const c of cards) {
+                try { if (matches(c.querySelector(selector))) hits += 1; }
+                catch (e) { return {selector, error: true, hits: 0}; }
+            }
+            return {selector, hits};
+        });
+        if (hints[role]) {
+            const groups = cards.map(c => queryAll(c, `[class*='${hints[role]}' i]`) || []);
+            results[role].push(...derive(groups, hints[role], matches));
+        }
+    }
+    results.more = more.map(selector => ({selector, hits: (queryAll(document, selector) || []).length}));
+    if (hints.more) {
+        const buttons = queryAll(document, `a[class*='${hints.more}' i], button[class*='${hints.more}' i]`) || [];
+        results.more.push(...derive(buttons.map(el => [el]), hints.more, () => true));
+    }
+    return {sampled: cards.length, results};
+}"""
+
+
+def layout_fingerprint(signatures) -> str:
+    """「タグ名.クラス名」の一覧からレイアウトの指紋を作る"""
+    return hashlib.sha1("\n".join(signatures).encode("utf-8")).hexdigest()[:16]
+
+
+def candidates_key() -> str:
+    """候補の一覧のハッシュ（config.py の候補を変えたら判定し直す）"""
+    candidates = {"job": JOB_SELECTORS, "card": CARD_SELECTORS, "more": MORE_BUTTON_SELECTORS,
+                  "hints": SELECTOR_CLASS_HINTS, **FIELDS}
+    return hashlib.sha1(json.dumps(candidates, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def _best(results, minimum: int = 1):
+    """当たり数が最も多い候補（同数なら候補の順）。minimum 未満なら None"""
+    best = None
+    for r in results:
+        if not r.get("error") and r["hits"] >= minimum and (best is None or r["hits"] > best["hits"]):
+            best = r
+    return best["selector"] if best else None
+
+
+def choose_job_selector(probe: dict):
+    """
+    ページ内の案件IDを JOB_COVERAGE 以上拾える候補のうち、要素あたりの案件IDが最も多いもの
+    （タイトルのリンクだけに当たる候補を、サムネイルなども拾う広い候補より優先する）
+    """
+    total = probe["total"]
+    if not total:
+        return None
+    best, best_precision = None, 0.0
+    for r in probe["results"]:
+        if r.get("error") or not r["elements"] or r["ids"] < total * JOB_COVERAGE:
+            continue
+        precision = r["ids"] / r["elements"]
+        if precision > best_precision:
+            best, best_precision = r["selector"], precision
+    return best
+
+
+def with_defaults(chosen: dict) -> dict:
+    """判定できなかった項目を既定値で埋める（「もっと見る」は見つからなければ押さない）"""
+    selectors = {role: chosen.get(role) or default for role, default in DEFAULT_SELECTORS.items()}
+    selectors["more"] = chosen.get("more")
+    return selectors
+
+
+# =============================
+# キャッシュ
+# =============================
+def load_cache(path: str = SELECTOR_CACHE_PATH) -> dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"⚠️ セレクタのキャッシュを読み込めません（判定し直します）: {e}")
+        return {}
+
+
+def save_cache(cache: dict, path: str = SELECTOR_CACHE_PATH):
+    # 判定の新しいレイアウトから MAX_LAYOUTS 個だけ残す
+    newest = sorted(cache.items(), key=lambda kv: kv[1].get("probed_at", ""), reverse=True)[:MAX_LAYOUTS]
+    # 一時ファイルはプロセスごとに分ける（シャード並列取得で同時に書いても、互いの書きかけを置き換えない）
+    tmp = Path(f"{path}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(dict(newest), ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+class ResolvedSelectors:
+    def __init__(self, selectors: dict, fingerprint: str = None, probed: bool = False, report: dict = None):
+        self.selectors = selectors
+        self.fingerprint = fingerprint
+        self.probed = probed    # 今回ページ上で候補を試したか（False ならキャッシュ・既定値）
+        self.report = report    # 判定時の候補ごとの当たり数
+
+
+class SelectorResolver:
+    def __init__(self, cache_path: str = SELECTOR_CACHE_PATH):
+        self.cache_path = cache_path
+
+    async def fingerprint(self, page) -> str:
+        return layout_fingerprint(await page.evaluate(_FINGERPRINT_JS))
+
+    async def probe(self, page):
+        """候補をページ上で試し、採用するセレクタと候補ごとの当たり数を返す"""
+        jobs = await page.evaluate(_PROBE_JOBS_JS, JOB_SELECTORS)
+        job = choose_job_selector(jobs)
+        anchor = job or DEFAULT_SELECTORS["job"]
+        cards = await page.evaluate(_PROBE_CARDS_JS, {"job": anchor, "candidates": CARD_SELECTORS,
+                                                       "sample": SAMPLE_CARDS})
+        # 案件リンクの半数以上で、案件1件分のカードに辿り着けること
+        card = _best(cards["results"], max(1, (cards["sampled"] + 1) // 2))
+        fields = await page.evaluate(_PROBE_FIELDS_JS, {
+            "job": anchor, "card": card or DEFAULT_SELECTORS["card"], "fields": FIELDS,
+            "patterns": FIELD_PATTERNS, "hints": SELECTOR_CLASS_HINTS,
+            "more": MORE_BUTTON_SELECTORS, "sample": SAMPLE_CARDS,
+        })
+        chosen = {"job": job, "card": card}
+        for role, results in fields["results"].items():
+            chosen[role] = _best(results)
+        report = {"total_ids": jobs["total"], "sampled_cards": fields["sampled"], "job": jobs["results"],
+                  "card": cards["results"], **fields["results"]}
+        return chosen, report
+
+    async def resolve(self, page, force: bool = False) -> ResolvedSelectors:
+        """
+        レイアウトの指紋がキャッシュにあればそのセレクタを、無ければ判定して保存したものを返す。
+        判定できなかった項目は DEFAULT_SELECTORS で埋める（"more" が None ならボタンを押さない）
+        """
+        try:
+            fingerprint = await self.fingerprint(page)
+            cache = load_cache(self.cache_path)
+            entry = cache.get(fingerprint)
+            if entry and entry.get("candidates") == candidates_key() and not force:
+                print(f"🧭 セレクタ: キャッシュを使用（レイアウト {fingerprint[:8]}）")
+                return ResolvedSelectors(with_defaults(entry["selectors"]), fingerprint)
+
+            chosen, report = await self.probe(page)
+            if not chosen["job"] and not report["total_ids"]:
+                # 案件の無いページ（エラー画面など）は保存しない
+                print("⚠️ セレクタ判定: ページに案件リンクがありません（既定のセレクタを使用）")
+                return ResolvedSelectors(dict(DEFAULT_SELECTORS), fingerprint, True, report)
+            cache[fingerprint] = {
+                "selectors": chosen,
+                "candidates": candidates_key(),
+                "probed_at": datetime.now().isoformat(timespec="seconds"),
+                "url": page.url,
+            }
+            try:
+                save_cache(cache, self.cache_path)
+            except OSError as e:
+                # 保存できなくても今回の判定結果は使う（次回は判定し直す）
+                print(f"⚠️ セレクタキャッシュの保存エラー: {e}")
+            print(f"🧭 セレクタを判定しました（レイアウト {fingerprint[:8]}）: "
+                  + " / ".join(f"{role}={selector}" for role, selector in chosen.items()))
+            return ResolvedSelectors(with_defaults(chosen), fingerprint, True, report)
+        except Exception as e:
+            print(f"⚠️ セレクタ判定エラー（既定のセレクタを使用）: {e}")
+            return ResolvedSelectors(dict(DEFAULT_SELECTORS))
+
+
+def print_report(report: dict):
+    """判定時の候補ごとの当たり数（debug_lancers.py 用）"""
+    print(f"   ページ内の案件ID: {report['total_ids']}件 / 調べたカード: {report['sampled_cards']}枚")
+    for role in ("job", "card", *FIELDS, "more"):
+        for r in report.get(role, []):
+            if role == "job":
+                detail = "エラー" if r.get("error") else f"要素 {r['elements']} / 案件ID {r['ids']}"
+            else:
+                detail = "エラー" if r.get("error") else f"{r['hits']}件"
+            mark = "（クラス名から割り出し）" if r.get("derived") else ""
+            print(f"   {role:<10} {r['selector']:<34} {detail}{mark}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="案件一覧ページのセレクタ（レイアウトの指紋ごとのキャッシュ）")
+    parser.add_argument("--cache", default=SELECTOR_CACHE_PATH)
+    parser.add_argument("--clear", action="store_true", help="キャッシュを消して次回の取得で判定し直す")
+    args = parser.parse_args()
+
+    if args.clear:
+        Path(args.cache).unlink(missing_ok=True)
+        print(f"🗑️ セレクタのキャッシュを削除しました: {args.cache}")
+        return
+    cache = load_cache(args.cache)
+    if not cache:
+        print(f"📄 キャッシュはありません（次回の取得で判定します）: {args.cache}")
+        return
+    current = candidates_key()
+    for fingerprint, entry in sorted(cache.items(), key=lambda kv: kv[1].get("probed_at", ""), reverse=True):
+        stale = "" if entry.get("candidates") == current else "（候補が変わったため次回判定し直し）"
+        print(f"🧭 レイアウト {fingerprint}  判定 {entry.get('probed_at')}{stale}")
+        for role, selector in entry["selectors"].items():
+            print(f"   {role:<10} {selector or '（なし）'}")
+
+
+if __name__ == "__main__":
+    main()
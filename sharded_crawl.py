@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数プロセスでの分割取得（シャード）
+
+検索ページをページ番号・検索キーワードごとの「シャード」に分け、プロセスプールで並列に取得します。
+各ワーカーは自分のブラウザを起動し、カードの抽出・スキル判定・スコア計算までをワーカー側で行います。
+親プロセスは結果を案件IDで重複排除し、再掲載の集約・並び替え（finalize_jobs）を1回だけ行います。
+
+設定（環境変数）:
+    CRAWL_SHARDS   同時に動かすプロセス数（既定: CPUコア数）
+    CRAWL_PAGES    取得する検索結果のページ数（既定: 1）
+    CRAWL_QUERIES  カンマ区切りの検索キーワード（既定: なし＝新着一覧のみ）
+本体で使う場合は FETCH_MODE=sharded を指定します。
+
+使い方:
+    python sharded_crawl.py --shards 4 --pages 8          # 取得だけ行い、シャードごとの所要時間を表示
+    python sharded_crawl.py --queries "Python,AI,自動化"
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import fetch_lancers_improved as app
+from job_model import jobs_from_dicts, jobs_to_dicts, parse_job_id
+
+CRAWL_SHARDS = int(os.getenv("CRAWL_SHARDS", "0")) or os.cpu_count() or 1
+CRAWL_PAGES = int(os.getenv("CRAWL_PAGES", "1"))
+CRAWL_QUERIES = [q.strip() for q in os.getenv("CRAWL_QUERIES", "").split(",") if q.strip()]
+SHARD_JOURNAL_TEMPLATE = ".scrape_journal.shard{index}.jsonl"
+
+
+def with_params(url: str, **params) -> str:
+    """URLのクエリ文字列の一部を差し替える"""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query.update({k: str(v) for k, v in params.items()})
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def build_shards(base_url: str, pages: int = 1, queries=()) -> list:
+    """(キーワード × ページ) の組をシャードにする。キーワード指定なしは新着一覧のページ分割のみ"""
+    shards = []
+    for query in (queries or [None]):
+        for page in range(1, pages + 1):
+            params = {"page": page} if page > 1 else {}
+            if query is not None:
+                params["keyword"] = query
+            shards.append({"index": len(shards), "url": with_params(base_url, **params) if params else base_url})
+    return shards
+
+
+# =============================
+# ワーカー（別プロセス）
+# =============================
+def crawl_shard(shard: dict) -> dict:
+    """1シャード分を専用のブラウザで取得し、除外判定前の全案件を返す"""
+    started = time.perf_counter()
+    # HARの記録は1ファイルに複数プロセスから書けないため、再生のときだけ引き継ぐ
+    notifier = app.CompleteJobsNotifier(har_mode=app.HAR_MODE if app.HAR_MODE == "replay" else "")
+    error = None
+    try:
+        asyncio.run(notifier.collect_jobs(shard["url"], SHARD_JOURNAL_TEMPLATE.format(index=shard["index"])))
+    except Exception as e:
+        error = f"{type(e).__name__}: {(str(e).splitlines() or [''])[0]}"
+    return {
+        **shard,
+        "jobs": jobs_to_dicts(notifier.candidate_jobs),
+        "elapsed": time.perf_counter() - started,
+        "pid": os.getpid(),
+        "error": error,
+    }
+
+
+# =============================
+# コーディネーター
+# =============================
+def merge_shard_results(notifier, results) -> list:
+    """シャード順に案件IDで重複排除して候補に加え、通知対象を返す（並び替え前）"""
+    seen_ids = set()
+    all_jobs = []
+    duplicates = 0
+    for result in sorted(results, key=lambda r: r["index"]):
+        for job_info in jobs_from_dicts(result["jobs"]):
+            key = parse_job_id(job_info.link) or job_info.link
+            if key in seen_ids:
+                duplicates += 1
+                continue
+            seen_ids.add(key)
+            notifier.seen_links.add(job_info.link)
+            notifier.add_candidate(job_info, all_jobs)
+    if duplicates:
+        print(f"🔗 シャード間の重複: {duplicates}件を除外")
+    return all_jobs
+
+
+def print_shard_timings(results, wall: float):
+    print("\n⏱️ シャード別の所要時間:")
+    for r in sorted(results, key=lambda r: r["index"]):
+        status = f"❌ {r['error']}" if r["error"] else f"{len(r['jobs'])}件"
+        print(f"   #{r['index']:<3} pid {r['pid']:<7} {r['elapsed']:7.1f}秒  {status}  {r['url'][-60:]}")
+    total = sum(r["elapsed"] for r in results)
+    if wall > 0:
+        print(f"   合計 {total:.1f}秒 / 実時間 {wall:.1f}秒（並列化の効果 {total / wall:.1f}倍）")
+
+
+async def fetch_jobs_sharded(notifier, shards: int = CRAWL_SHARDS, pages: int = CRAWL_PAGES,
+                             queries=CRAWL_QUERIES) -> list:
+    """全シャードをプロセスプールで取得し、finalize_jobs 済みの案件を返す"""
+    units = build_shards(app.LANCERS_SEARCH_URL, pages, queries)
+    processes = max(1, min(shards, len(units)))
+    print(f"🧩 分割取得: {len(units)}シャード / {processes}プロセス")
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    # spawn: Windows と同じ起動方式にそろえ、親のイベントループを子に持ち込まない
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = await asyncio.gather(*(loop.run_in_executor(pool, crawl_shard, unit) for unit in units))
+    print_shard_timings(results, time.perf_counter() - started)
+
+    all_jobs = merge_shard_results(notifier, results)
+    return notifier.finalize_jobs(all_jobs) if all_jobs else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="複数プロセスでの分割取得")
+    parser.add_argument("--shards", type=int, default=CRAWL_SHARDS, help="同時に動かすプロセス数")
+    parser.add_argument("--pages", type=int, default=CRAWL_PAGES, help="検索結果のページ数")
+    parser.add_argument("--queries", default=",".join(CRAWL_QUERIES), help="カンマ区切りの検索キーワード")
+    args = parser.parse_args()
+    queries = [q.strip() for q in args.queries.split(",") if q.strip()]
+
+    notifier = app.CompleteJobsNotifier()
+    jobs = asyncio.run(fetch_jobs_sharded(notifier, args.shards, args.pages, queries))
+    print(f"\n📊 通知対象 {len(jobs)}件 / 候補 {len(notifier.candidate_jobs)}件")
+    for job in jobs[:10]:
+        print(f"   {job.priority_score:>4}  {job.title[:50]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スナップショット間の差分と案件の入れ替わり（チャーン）分析
+
+スナップショットごとに「案件IDのソート済み配列＋内容ハッシュ・応募者数・状態の列」を作り、
+2つの実行の間の 新規 / 消えた / 内容が変わった 案件を、ソート済み配列のマージ比較で求めます。
+- 列は .snapshot_diff_index.pkl にキャッシュ（ファイル名とサイズがキー。2回目以降は新しいものだけ読む）
+- 内容ハッシュは snapshots/ のストアと同じ（scraped_at を除いたレコードの sha1）の先頭64bit
+- アーカイブ全体から、案件ごとの掲載期間・終了までの時間・応募者数の推移も出せます
+
+使い方:
+    python snapshot_diff.py                          # 直近2回の差分
+    python snapshot_diff.py all_jobs_20260217_2033 all_jobs_20260218_0233
+    python snapshot_diff.py --report --json churn.json
+    python snapshot_diff.py --job 5423720            # 1案件の応募者数の推移
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import statistics
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from history_analytics import snapshot_time
+from job_model import parse_job_id
+from job_stats import day_key
+from rule_pack import get_rules
+from snapshot_store import OBSERVED_FIELDS, _dumps, iter_snapshot_jobs, list_snapshot_paths, load_snapshot, snapshot_name
+
+INDEX_PATH = ".snapshot_diff_index.pkl"
+INDEX_VERSION = 1
+AGE_BUCKETS = (6, 24, 72, 168)          # 応募者数の推移を見る掲載後の経過時間（h）
+COMPARE_FIELDS = ("title", "price", "deadline", "applicant_count", "recruitment_count", "status", "priority_score")
+
+
+# =============================
+# スナップショットの列
+# =============================
+class SnapshotColumns:
+    """1スナップショット分の列（案件IDの昇順）"""
+    __slots__ = ("name", "time", "ids", "digests", "applicants", "statuses")
+
+    def __init__(self, name, time, ids, digests, applicants, statuses):
+        self.name = name
+        self.time = time
+        self.ids = ids                  # array('q')
+        self.digests = digests          # array('Q')
+        self.applicants = applicants    # array('l')（不明は -1）
+        self.statuses = statuses        # list[str]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getstate__(self):
+        return [getattr(self, k) for k in self.__slots__]
+
+    def __setstate__(self, state):
+        for key, value in zip(self.__slots__, state):
+            setattr(self, key, value)
+
+
+def _content_digest(job: dict) -> int:
+    record = {k: v for k, v in job.items() if k not in OBSERVED_FIELDS}
+    return int.from_bytes(hashlib.sha1(_dumps(record)).digest()[:8], "big")
+
+
+def build_columns(path: str) -> SnapshotColumns:
+    """1ファイル分の列を作る（ワーカープロセスで実行）"""
+    rows = {}
+    for job in iter_snapshot_jobs(path):
+        job_id = parse_job_id(job.get("link"))
+        if job_id is None or job_id in rows:
+            continue
+        applicants = str(job.get("applicant_count", ""))
+        rows[job_id] = (_content_digest(job), int(applicants) if applicants.isdigit() else -1, job.get("status", ""))
+    ids = sorted(rows)
+    return SnapshotColumns(
+        snapshot_name(path), snapshot_time(path), array("q", ids),
+        array("Q", (rows[i][0] for i in ids)), array("l", (rows[i][1] for i in ids)), [rows[i][2] for i in ids],
+    )
+
+
+def _load_index(path: str) -> dict:
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") == INDEX_VERSION:
+            return data["files"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️ 差分インデックス読み込みエラー（作り直します）: {e}")
+    return {}
+
+
+def load_columns(files, index_path: str = INDEX_PATH, workers: int = None):
+    """ファイルごとの列を返す。インデックスに無いファイルだけを並列で読む"""
+    cache = _load_index(index_path) if index_path else {}
+    keys = {str(f): f"{Path(f).name}:{os.path.getsize(f)}" for f in files}
+    missing = [f for f in files if keys[str(f)] not in cache]
+
+    if missing:
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(build_columns, map(str, missing), chunksize=32))
+        else:
+            results = [build_columns(str(f)) for f in missing]
+        for f, columns in zip(missing, results):
+            cache[keys[str(f)]] = columns
+        if index_path:
+            live = set(keys.values())
+            tmp = f"{index_path}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump({"version": INDEX_VERSION, "files": {k: v for k, v in cache.items() if k in live}}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, index_path)
+
+    return [cache[keys[str(f)]] for f in files], len(missing)
+
+
+# =============================
+# 2回の実行の差分（マージ比較）
+# =============================
+def diff_columns(old: SnapshotColumns, new: SnapshotColumns) -> dict:
+    """新規 / 消えた / 内容が変わった 案件ID"""
+    a, b = old.ids, new.ids
+    da, db = old.digests, new.digests
+    added, removed, changed = [], [], []
+    i = j = 0
+    na, nb = len(a), len(b)
+    while i < na and j < nb:
+        x, y = a[i], b[j]
+        if x == y:
+            if da[i] != db[j]:
+                changed.append(x)
+            i += 1
+            j += 1
+        elif x < y:
+            removed.append(x)
+            i += 1
+        else:
+            added.append(y)
+            j += 1
+    removed.extend(a[i:])
+    added.extend(b[j:])
+    return {"new": added, "removed": removed, "changed": changed}
+
+
+def _first_by_id(snapshot: dict) -> dict:
+    """案件ID → レコード（同じIDが複数あれば build_columns と同じく最初の1件）"""
+    jobs = {}
+    for job in snapshot.get("jobs", []):
+        jobs.setdefault(parse_job_id(job.get("link")), job)
+    return jobs
+
+
+def field_changes(old_path, new_path, job_ids) -> dict:
+    """内容が変わった案件について、項目ごとの変更前後"""
+    wanted = set(job_ids)
+    before, after = _first_by_id(load_snapshot(old_path)), _first_by_id(load_snapshot(new_path))
+    changes = {}
+    for job_id in wanted:
+        old, new = before.get(job_id, {}), after.get(job_id, {})
+        fields = {k: (old.get(k), new.get(k)) for k in COMPARE_FIELDS if old.get(k) != new.get(k)}
+        others = sorted(k for k in set(old) | set(new)
+                        if k not in COMPARE_FIELDS and k not in OBSERVED_FIELDS and old.get(k) != new.get(k))
+        if others:
+            fields["その他"] = (None, ", ".join(others))
+        changes[job_id] = {"title": new.get("title") or old.get("title", ""), "fields": fields}
+    return changes
+
+
+# =============================
+# アーカイブ全体の集計
+# =============================
+def _hours(start: str, end: str) -> float:
+    return (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds() / 3600
+
+
+def build_lifetimes(snapshots) -> dict:
+    """案件IDごとの初出・最終観測・締切表示の時刻と、応募者数の推移（変化した時点のみ）"""
+    is_closed = get_rules().is_closed
+    lifetimes = {}
+    for snap in snapshots:
+        ts = snap.time
+        for job_id, applicants, status in zip(snap.ids, snap.applicants, snap.statuses):
+            rec = lifetimes.get(job_id)
+            if rec is None:
+                rec = lifetimes[job_id] = {"first_seen": ts, "last_seen": ts, "observations": 0,
+                                           "closed_at": None, "curve": []}
+            rec["last_seen"] = ts
+            rec["observations"] += 1
+            if applicants >= 0 and (not rec["curve"] or rec["curve"][-1][1] != applicants):
+                rec["curve"].append((ts, applicants))
+            if rec["closed_at"] is None and status and is_closed(status):
+                rec["closed_at"] = ts
+    return lifetimes
+
+
+def applicants_at(rec: dict, hours: float):
+    """掲載から hours 時間時点の応募者数（その時点まで観測できていない場合は None）"""
+    if _hours(rec["first_seen"], rec["last_seen"]) < hours:
+        return None
+    value = None
+    for ts, applicants in rec["curve"]:
+        if _hours(rec["first_seen"], ts) > hours:
+            break
+        value = applicants
+    return value
+
+
+def _summary(values) -> dict:
+    if not values:
+        return {"count": 0, "median": None, "p90": None}
+    values = sorted(values)
+    return {"count": len(values), "median": round(statistics.median(values), 1),
+            "p90": round(values[min(len(values) - 1, int(len(values) * 0.9))], 1)}
+
+
+def churn_report(snapshots) -> dict:
+    """実行ごとの入れ替わり（日別集計）と、案件の掲載期間・終了までの時間・応募者数の推移"""
+    days = {}
+    for old, new in zip(snapshots, snapshots[1:]):
+        d = diff_columns(old, new)
+        b = days.setdefault(day_key(datetime.fromisoformat(new.time)),
+                            {"runs": 0, "new": 0, "removed": 0, "changed": 0, "listed": 0})
+        b["runs"] += 1
+        b["listed"] += len(new)
+        for key in ("new", "removed", "changed"):
+            b[key] += len(d[key])
+
+    lifetimes = build_lifetimes(snapshots)
+    first = snapshots[0].time if snapshots else None
+    latest = snapshots[-1].time if snapshots else None
+    lifetime_hours, fill_hours, gone_hours = [], [], []
+    growth = {h: [] for h in AGE_BUCKETS}
+    for rec in lifetimes.values():
+        if rec["first_seen"] == first:
+            continue  # 最初のスナップショット以前から掲載されていた案件は掲載開始が分からない
+        if rec["last_seen"] < latest:
+            lifetime_hours.append(_hours(rec["first_seen"], rec["last_seen"]))
+            if rec["closed_at"] is None:
+                gone_hours.append(_hours(rec["first_seen"], rec["last_seen"]))
+        if rec["closed_at"]:
+            fill_hours.append(_hours(rec["first_seen"], rec["closed_at"]))
+        for h in AGE_BUCKETS:
+            value = applicants_at(rec, h)
+            if value is not None:
+                growth[h].append(value)
+
+    return {
+        "snapshots": len(snapshots),
+        "jobs": len(lifetimes),
+        "days": {k: days[k] for k in sorted(days)},
+        "lifetime_hours": _summary(lifetime_hours),
+        "hours_to_closed_status": _summary(fill_hours),
+        "hours_to_disappear": _summary(gone_hours),
+        "applicant_growth": {
+            f"{h}h": {"jobs": len(v), "mean": round(statistics.mean(v), 2) if v else None,
+                      "median": statistics.median(v) if v else None}
+            for h, v in growth.items()
+        },
+    }
+
+
+# =============================
+# 表示
+# =============================
+def _find(snapshots, name: str) -> int:
+    name = snapshot_name(name)
+    for i, snap in enumerate(snapshots):
+        if snap.name == name:
+            return i
+    raise SystemExit(f"❌ スナップショットが見つかりません: {name}")
+
+
+def print_diff(old, new, old_path, new_path, d: dict, elapsed_ms: float, limit: int):
+    print(f"🔀 {old.name}（{len(old)}件） → {new.name}（{len(new)}件） / {elapsed_ms:.2f}ms")
+    print(f"   新規 {len(d['new'])}件 / 消えた {len(d['removed'])}件 / 変更 {len(d['changed'])}件")
+    for label, key in (("🆕 新規", "new"), ("👋 消えた", "removed")):
+        if d[key]:
+            print(f"{label}: " + ", ".join(map(str, d[key][:limit])) + (" …" if len(d[key]) > limit else ""))
+    if d["changed"]:
+        print("✏️ 変更:")
+        changes = field_changes(old_path, new_path, d["changed"][:limit])
+        for job_id in d["changed"][:limit]:
+            c = changes[job_id]
+            print(f"   {job_id} {c['title'][:40]}")
+            for field, (before, after) in c["fields"].items():
+                print(f"      {field}: {before} → {after}")
+
+
+def print_report(report: dict):
+    print(f"{'日付':<11} {'実行':>4} {'掲載/回':>7} {'新規':>6} {'消えた':>6} {'変更':>6} {'入替率':>6}")
+    for key, b in report["days"].items():
+        listed = b["listed"] / b["runs"]
+        turnover = (b["new"] + b["removed"]) / b["listed"] * 100 if b["listed"] else 0
+        print(f"{key:<11} {b['runs']:>4} {listed:>7.1f} {b['new']:>6} {b['removed']:>6} {b['changed']:>6} {turnover:>5.1f}%")
+    for label, key in (("掲載期間", "lifetime_hours"), ("締切表示まで", "hours_to_closed_status"),
+                       ("一覧から消えるまで", "hours_to_disappear")):
+        s = report[key]
+        if s["count"]:
+            print(f"⏳ {label}: 中央値 {s['median']}h / 90%点 {s['p90']}h（{s['count']}件）")
+    print("👥 掲載後の応募者数: " + " / ".join(
+        f"{age} 平均{g['mean']}（{g['jobs']}件）" for age, g in report["applicant_growth"].items() if g["jobs"]))
+
+
+def print_job(snapshots, job_id: int):
+    rec = build_lifetimes(snapshots).get(job_id)
+    if rec is None:
+        raise SystemExit(f"❌ 案件 {job_id} はどのスナップショットにもありません")
+    print(f"📌 案件 {job_id}: 初出 {rec['first_seen']} / 最終 {rec['last_seen']}（{rec['observations']}回観測）")
+    if rec["closed_at"]:
+        print(f"   締切表示: {rec['closed_at']}（{_hours(rec['first_seen'], rec['closed_at']):.0f}h）")
+    for ts, applicants in rec["curve"]:
+        print(f"   {ts}  +{_hours(rec['first_seen'], ts):6.1f}h  応募 {applicants}人")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スナップショット間の差分とチャーン分析")
+    parser.add_argument("old", nargs="?", help="比較元（省略時は最後から2番目）")
+    parser.add_argument("new", nargs="?", help="比較先（省略時は最新）")
+    parser.add_argument("--report", action="store_true", help="アーカイブ全体の入れ替わり・掲載期間を集計")
+    parser.add_argument("--job", type=int, help="1案件の掲載期間と応募者数の推移")
+    parser.add_argument("--limit", type=int, default=10, help="差分で一覧表示する件数")
+    parser.add_argument("--workers", type=int, help="並列プロセス数（既定: CPUコア数）")
+    parser.add_argument("--index", default=INDEX_PATH, help="列のキャッシュ（空文字で無効）")
+    parser.add_argument("--json", help="結果をJSONで出力")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    files = list_snapshot_paths()
+    if len(files) < 2:
+        raise SystemExit("❌ スナップショットが2つ以上必要です")
+    snapshots, read_count = load_columns(files, args.index or None, args.workers)
+    print(f"📚 {len(files)}スナップショット（新規読込 {read_count}） / {time.perf_counter() - started:.2f}秒")
+
+    if args.job is not None:
+        print_job(snapshots, args.job)
+        return
+
+    if args.report:
+        started = time.perf_counter()
+        result = churn_report(snapshots)
+        elapsed = time.perf_counter() - started
+        print_report(result)
+        print(f"⏱️ 全{len(snapshots) - 1}区間の差分と案件{result['jobs']}件の集計: {elapsed:.2f}秒")
+    else:
+        i = _find(snapshots, args.old) if args.old else len(snapshots) - 2
+        j = _find(snapshots, args.new) if args.new else (min(i + 1, len(snapshots) - 1) if args.old else len(snapshots) - 1)
+        started = time.perf_counter()
+        result = diff_columns(snapshots[i], snapshots[j])
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print_diff(snapshots[i], snapshots[j], files[i], files[j], result, elapsed_ms, args.limit)
+        result = {"old": snapshots[i].name, "new": snapshots[j].name, **result}
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"💾 結果を保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スナップショットの内容アドレス型・圧縮ストレージ
+
+連続するスナップショットはほぼ同じ案件の繰り返しなので、案件レコードを
+内容ハッシュで重複排除して共有オブジェクトとして保存し、各実行は小さな
+マニフェスト（案件ID・ハッシュ・実行ごとに変わる項目）だけを持ちます。
+
+    snapshots/
+      objects/ab/cdef….json.gz            # 案件レコード（scraped_at を除く）
+      manifests/all_jobs_YYYYMMDD_HHMM.json.gz
+
+読み出し時は従来の all_jobs_*.json と同じ形式に復元します。
+
+使い方:
+    python snapshot_store.py migrate [--delete]   # 既存の all_jobs_*.json を取り込む
+    python snapshot_store.py export all_jobs_20250903_2340 [-o out.json]
+    python snapshot_store.py stats
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+from job_model import parse_job_id
+
+SNAPSHOT_GLOB = "all_jobs_*.json"
+STORE_ROOT = "snapshots"
+OBSERVED_FIELDS = ("scraped_at",)  # 実行ごとに変わるためマニフェスト側に持つ項目
+CHUNK_SIZE = 64 * 1024
+
+_WS = " \t\r\n,"
+
+try:
+    import ijson  # 任意: あれば C 実装のストリーミングパーサを使う
+except ImportError:
+    ijson = None
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def snapshot_name(path) -> str:
+    """all_jobs_YYYYMMDD_HHMM（拡張子なし）"""
+    name = Path(path).name
+    for suffix in (".json.gz", ".json"):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+class SnapshotStore:
+    def __init__(self, root: str = STORE_ROOT):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.manifests = self.root / "manifests"
+
+    # ---- オブジェクト ----
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest[2:]}.json.gz"
+
+    def put_job(self, job: dict):
+        """案件を保存し (ハッシュ, 観測値) を返す。同一内容は1度しか書かない"""
+        record = {k: v for k, v in job.items() if k not in OBSERVED_FIELDS}
+        observed = {k: job[k] for k in OBSERVED_FIELDS if k in job}
+        body = _dumps(record)
+        digest = hashlib.sha1(body).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(gzip.compress(body, mtime=0))
+        return digest, observed
+
+    def get_job(self, digest: str, observed: dict = None) -> dict:
+        job = json.loads(gzip.decompress(self._object_path(digest).read_bytes()))
+        if observed:
+            job.update(observed)
+        return job
+
+    # ---- マニフェスト ----
+    def manifest_path(self, name: str) -> Path:
+        return self.manifests / f"{snapshot_name(name)}.json.gz"
+
+    def write(self, data: dict, name: str) -> Path:
+        """従来形式のスナップショットを保存する"""
+        entries = []
+        for job in data.get("jobs", []):
+            digest, observed = self.put_job(job)
+            entries.append([parse_job_id(job.get("link")), digest, observed])
+        manifest = {k: v for k, v in data.items() if k != "jobs"}
+        manifest["jobs"] = entries
+        path = self.manifest_path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(gzip.compress(_dumps(manifest), mtime=0))
+        return path
+
+    def read_manifest(self, name: str) -> dict:
+        return json.loads(gzip.decompress(self.manifest_path(name).read_bytes()))
+
+    def read(self, name: str) -> dict:
+        """従来の all_jobs_*.json と同じ形式で返す"""
+        manifest = self.read_manifest(name)
+        manifest["jobs"] = [self.get_job(digest, observed) for _, digest, observed in manifest["jobs"]]
+        return manifest
+
+    def iter_jobs(self, name: str):
+        for _, digest, observed in self.read_manifest(name)["jobs"]:
+            yield self.get_job(digest, observed)
+
+    def names(self):
+        if not self.manifests.exists():
+            return []
+        return sorted(snapshot_name(p) for p in self.manifests.glob("*.json.gz"))
+
+
+# =============================
+# 形式を問わない読み出し（従来JSON / ストア）
+# =============================
+def list_snapshot_paths(root: str = ".", store_root: str = None):
+    """全スナップショットのパスを時刻順に返す（同名ならストア側を優先）"""
+    root = Path(root)
+    store = SnapshotStore(store_root or root / STORE_ROOT)
+    paths = {snapshot_name(p): p for p in root.glob(SNAPSHOT_GLOB)}
+    for name in store.names():
+        paths[name] = store.manifest_path(name)
+    return [paths[name] for name in sorted(paths)]
+
+
+def _is_manifest(path) -> bool:
+    return str(path).endswith(".json.gz")
+
+
+def _store_for(path) -> SnapshotStore:
+    return SnapshotStore(Path(path).parent.parent)
+
+
+def load_snapshot(path) -> dict:
+    if _is_manifest(path):
+        return _store_for(path).read(path)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_snapshot_jobs(path):
+    """スナップショットの jobs を1件ずつ返す（従来JSONはストリーミングで読む）"""
+    if _is_manifest(path):
+        yield from _store_for(path).iter_jobs(path)
+        return
+
+    if ijson is not None:
+        with open(path, "rb") as f:
+            yield from ijson.items(f, "jobs.item")
+        return
+
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf = ""
+        # "jobs": [ の直後まで読み飛ばす
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            buf += chunk
+            key = buf.find('"jobs"')
+            start = buf.find("[", key) if key >= 0 else -1
+            if start >= 0:
+                buf = buf[start + 1:]
+                break
+            buf = buf[-16:]
+
+        eof = False
+        while True:
+            buf = buf.lstrip(_WS)
+            if buf.startswith("]"):
+                return
+            try:
+                item, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(CHUNK_SIZE)
+                eof = not chunk
+                buf += chunk
+                continue
+            yield item
+            buf = buf[end:]
+
+
+# =============================
+# CLI
+# =============================
+def migrate(delete: bool = False, store_root: str = STORE_ROOT):
+    store = SnapshotStore(store_root)
+    files = sorted(Path(".").glob(SNAPSHOT_GLOB))
+    for file in files:
+        data = load_snapshot(file)
+        store.write(data, file.name)
+        if store.read(file.name) != data:
+            raise RuntimeError(f"復元結果が一致しません: {file}")
+        if delete:
+            file.unlink()
+    print(f"✅ {len(files)}件を {store_root}/ に取り込みました" + ("（元ファイル削除）" if delete else ""))
+
+
+def print_stats(store_root: str = STORE_ROOT):
+    store = SnapshotStore(store_root)
+    objects = list(store.objects.rglob("*.json.gz")) if store.objects.exists() else []
+    manifests = list(store.manifests.glob("*.json.gz")) if store.manifests.exists() else []
+    legacy = list(Path(".").glob(SNAPSHOT_GLOB))
+    size = lambda paths: sum(p.stat().st_size for p in paths)
+    print(f"📦 オブジェクト: {len(objects)}件 / {size(objects):,} bytes")
+    print(f"📄 マニフェスト: {len(manifests)}件 / {size(manifests):,} bytes")
+    print(f"🗂️ 従来形式JSON: {len(legacy)}件 / {size(legacy):,} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スナップショットの圧縮ストレージ")
+    parser.add_argument("--root", default=STORE_ROOT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_migrate = sub.add_parser("migrate", help="all_jobs_*.json を取り込む")
+    p_migrate.add_argument("--delete", action="store_true", help="取り込み・検証後に元ファイルを削除")
+    p_export = sub.add_parser("export", help="従来形式で書き出す")
+    p_export.add_argument("name")
+    p_export.add_argument("-o", "--output")
+    sub.add_parser("stats", help="容量を表示")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate(args.delete, args.root)
+    elif args.command == "export":
+        data = SnapshotStore(args.root).read(args.name)
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        if args.output:
+            Path(args.output).write_text(text, encoding="utf-8")
+            print(f"💾 書き出し: {args.output}")
+        else:
+            print(text)
+    else:
+        print_stats(args.root)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,12 @@ if (-not (Get-Command git -ErrorAction SilentlyContinue)) {
   $Git = "C:\Program Files\Git\bin\git.exe"
 }
 
+# Python（py ランチャーしか無い環境にも対応）
+$Python = "python"
+if (-not (Get-Command python -ErrorAction SilentlyContinue)) {
+  $Python = "py"
+}
+
 & $Git fetch origin main | Out-Null
 $local  = & $Git rev-parse HEAD
 $remote = & $Git rev-parse origin/main
@@ -19,11 +25,12 @@ if ($Force -or ($local -ne $remote)) {
   $dst = "C:\Users\SUZUKI Natsumi\株式会社ReySolid\【B】IT-Solution@ReySolid - 案件管理 - ドキュメント\案件管理\案件情報.xlsx"
 
   if (Test-Path $src) {
-    try {
-      Copy-Item $src $dst -Force
+    # ファイルごと上書きせず、追加・更新・削除された行だけを反映（共有ブック側の追加列は保持）
+    & $Python merge_workbook.py $src $dst
+    if ($LASTEXITCODE -eq 0) {
       Write-Host "✅ Excel同期: $(Get-Date)  $dst"
-    } catch {
-      Write-Host " コピー失敗: $($_.Exception.Message)"
+    } else {
+      Write-Host " マージ失敗（終了コード $LASTEXITCODE）"
     }
   } else {
     Write-Host "ℹ Excel未生成（まだGitHub Actionsが出力していない可能性）"
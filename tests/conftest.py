@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""テスト共通の設定（本体モジュールの読み込み前に、保存先がリポジトリやローカルのブックに向かないようにする）"""
+
+import os
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = ROOT / "fixtures"
+
+os.environ.setdefault("EXCEL_PATH", str(Path(tempfile.mkdtemp(prefix="lancers_tests_")) / "案件情報.xlsx"))
+os.environ.setdefault("RULES_PATH", str(ROOT / "rules.json"))
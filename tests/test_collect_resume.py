@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""collect_jobs: ページが落ちたら同じ実行の中で開き直し、ジャーナルに記録済みの案件を読み飛ばして続きから取得する"""
+
+import asyncio
+
+import fetch_lancers_improved as app
+from selector_resolver import DEFAULT_SELECTORS, ResolvedSelectors
+
+TITLES = ["Pythonでスクレイピングツール開発", "ChatGPT API 連携の業務ボット", "Django 管理画面の改修",
+          "Next.js と TypeScript のサイト制作", "機械学習モデルの API 化"]
+
+
+class Browser:
+    """Playwright の代わりの最小限のブラウザ（1回目の起動では3枚目のカードでページが落ちる。extracted は詳細を読んだカード）"""
+    launches = 0
+
+    def __init__(self):
+        Browser.launches += 1
+        self.crash_at = 2 if Browser.launches == 1 else None
+        self.connected = True
+        self.extracted = []
+
+    async def new_context(self, **options):
+        return Context(self)
+
+    def is_connected(self):
+        return self.connected
+
+    async def close(self):
+        self.connected = False
+
+
+class Context:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return Page(self.browser)
+
+    async def close(self):
+        pass
+
+
+class Response:
+    status = 200
+
+
+class Page:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    def on(self, event, handler):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url, **options):
+        return Response()
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+    async def query_selector_all(self, selector):
+        return [Card(self, i) for i in range(len(TITLES))]
+
+
+class Card:
+    def __init__(self, page, index):
+        self.page = page
+        self.index = index
+
+    async def text_content(self):
+        if self.page.browser.crash_at == self.index:
+            self.page.closed = True
+            raise RuntimeError("Target page, context or browser has been closed")
+        return TITLES[self.index]
+
+    async def get_attribute(self, name):
+        return f"/work/detail/{9800000 + self.index}"
+
+
+class Playwright:
+    class chromium:
+        browsers = []
+
+        @classmethod
+        async def launch(cls, **options):
+            cls.browsers.append(Browser())
+            return cls.browsers[-1]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class Resolver:
+    async def resolve(self, page, force=False):
+        return ResolvedSelectors(dict(DEFAULT_SELECTORS), probed=True)
+
+
+def test_reopens_page_and_skips_journaled_cards(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "async_playwright", Playwright)
+    monkeypatch.setattr(app, "SelectorResolver", Resolver)
+    monkeypatch.setattr(app, "SCRAPE_ATTEMPTS", 2)
+    Browser.launches = 0
+    Playwright.chromium.browsers = []
+
+    notifier = app.CompleteJobsNotifier(har_mode="")
+
+    async def no_scroll(page):
+        pass
+
+    async def default_details(element):
+        element.page.browser.extracted.append(element.index)
+        return notifier.default_recruitment_info()
+
+    notifier.scroll_and_load_more = no_scroll
+    notifier.extract_recruitment_details = default_details
+    journal = tmp_path / "journal.jsonl"
+    jobs = asyncio.run(notifier.collect_jobs("https://www.lancers.jp/work/search/system", str(journal)))
+
+    first, second = Playwright.chromium.browsers
+    assert first.extracted == [0, 1]
+    assert second.extracted == [2, 3, 4]  # 記録済みの2件は詳細を読まずに飛ばし、落ちたカードから続ける
+    assert [job.job_id for job in notifier.candidate_jobs] == [9800000 + i for i in range(len(TITLES))]
+    assert len(jobs) == len(notifier.candidate_jobs)
+    assert not journal.exists()  # 最後まで取得できたのでジャーナルは消える
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""job_search.py: スナップショットの差分取り込みと、キーワード・スキル・予算・日付による検索"""
+
+import json
+
+from job_search import JobSearchIndex
+
+
+def _job(job_id, title, price, skills, score=100):
+    return {"title": title, "link": f"https://www.lancers.jp/work/detail/{job_id}", "price": price,
+            "applicant_count": "3", "status": "募集中", "priority_score": score,
+            "skill_matches": [{"skill": s, "priority": "高優先度"} for s in skills]}
+
+
+def _write(path, jobs):
+    path.write_text(json.dumps({"timestamp": "", "jobs": jobs}, ensure_ascii=False), encoding="utf-8")
+
+
+def _ids(result):
+    total, rows = result
+    assert total == len(rows)
+    return sorted(row[0] for row in rows)
+
+
+def test_update_and_search(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write(tmp_path / "all_jobs_20261001_0900.json", [
+        _job(1, "Django 管理画面の改修", "50,000 円 ~ 100,000 円 / 固定", ["Python", "Django"]),
+        _job(2, "ChatGPT API 連携の AI ボット", "300,000 円 ~ 500,000 円 / 固定", ["Python", "ChatGPT"]),
+    ])
+    _write(tmp_path / "all_jobs_20261019_0900.json", [
+        _job(2, "ChatGPT API 連携の AI ボット", "400,000 円 ~ 500,000 円 / 固定", ["Python", "ChatGPT"], score=150),
+        _job(3, "Next.js でコーポレートサイト制作", "200,000 円 / 固定", ["Next.js"]),
+    ])
+    index = JobSearchIndex(str(tmp_path / ".job_search.db"))
+    try:
+        assert index.update() == 2
+        assert index.update() == 0  # 取り込み済みのスナップショットは読み直さない
+        assert index.count() == 3
+
+        # キーワード: 3文字以上は FTS5（trigram）、3文字未満は LIKE
+        assert _ids(index.search(["管理画面"])) == [1]
+        assert _ids(index.search(["AI"])) == [2]
+        assert _ids(index.search(["ChatGPT", "AI"])) == [2]
+        assert _ids(index.search(["管理画面", "AI"])) == []
+
+        # スキル（大文字小文字を区別しない完全一致）・予算・日付
+        assert _ids(index.search(skills=["python"])) == [1, 2]
+        assert _ids(index.search(skills=["PYTHON", "chatgpt"])) == [2]
+        assert _ids(index.search(skills=["next"])) == []
+        assert _ids(index.search(min_price=300000)) == [2]
+        assert _ids(index.search(max_price=100000)) == [1]
+        assert _ids(index.search(min_price=150000, max_price=250000)) == [3]
+        assert _ids(index.search(since="2026-10-10")) == [2, 3]
+
+        # 再び掲載された案件は初出を保ち、最終掲載日と内容を新しい観測で更新する
+        _, rows = index.search(["ChatGPT"])
+        job_id, title, price, score, first_seen, last_seen, status, link = rows[0]
+        assert (first_seen, last_seen) == ("2026-10-01T09:00", "2026-10-19T09:00")
+        assert (price, score) == ("400,000 円 ~ 500,000 円 / 固定", 150)
+    finally:
+        index.close()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""job_stats.py: 1回走査の統計と、スナップショット名で重複を防ぐトレンドの累積"""
+
+import json
+from datetime import datetime
+
+from job_model import Job, SkillMatch
+from job_stats import RunStats, TrendStore, update_trends
+
+
+def _jobs():
+    return [
+        Job("Pythonでスクレイピング", "https://www.lancers.jp/work/detail/1", price="10,000 円 ~ 50,000 円",
+            skill_matches=[SkillMatch.of("Python", "超高優先度")]),
+        Job("ロゴ作成", "https://www.lancers.jp/work/detail/2", price="価格情報なし"),
+    ]
+
+
+def test_run_stats_single_pass():
+    stats = RunStats(_jobs())
+    assert stats.total_jobs == 2
+    assert stats.no_skill_match == 1
+    assert stats.priced_jobs == 1 and stats.price_sum == 50000
+    assert stats.skill_summary == {"Python": 1}
+
+
+def test_add_run_skips_recorded_snapshot(tmp_path):
+    store = TrendStore(tmp_path / "trends.json", load=False)
+    taken_at = datetime(2026, 2, 18, 2, 33)
+    assert store.add_run(RunStats(_jobs()), taken_at) is True
+    assert store.add_run(RunStats(_jobs()), taken_at) is False
+    assert store.add_run(RunStats(_jobs()), taken_at, "all_jobs_20260218_0233") is False
+    assert store.daily["2026-02-18"]["runs"] == 1
+    assert store.weekly["2026-W08"]["runs"] == 1
+    assert store.weekly["2026-W08"]["jobs"] == 2
+
+
+def test_update_trends_is_idempotent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # スナップショットの無いディレクトリ（作成時のバックフィルは空）
+    path = tmp_path / "skill_trends.json"
+    taken_at = datetime(2026, 2, 18, 2, 33)
+    update_trends(RunStats(_jobs()), taken_at, path)
+    first = path.read_text(encoding="utf-8")
+    update_trends(RunStats(_jobs()), taken_at, path)
+    assert path.read_text(encoding="utf-8") == first
+    assert json.loads(first)["weekly"]["2026-W08"]["snapshots"] == ["all_jobs_20260218_0233"]
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""jobs_api.py: 最新スナップショットのページ分割・ETag による 304・gzip 本文・不正なページ指定"""
+
+import asyncio
+import gzip
+import json
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from jobs_api import JobsApi
+
+
+def _job(job_id):
+    return {"title": f"案件{job_id}", "link": f"https://www.lancers.jp/work/detail/{job_id}", "priority_score": 100}
+
+
+def _write(path, timestamp, job_ids):
+    data = {"timestamp": timestamp, "count": len(job_ids), "skill_summary": {"Python": len(job_ids)},
+            "skill_distribution": {"total_jobs": len(job_ids)}, "jobs": [_job(i) for i in job_ids]}
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+async def _requests(root):
+    client = TestClient(TestServer(JobsApi(str(root)).app()), auto_decompress=False)
+    await client.start_server()
+    try:
+        plain = {"Accept-Encoding": "identity"}
+        results = {}
+        r = await client.get("/jobs?per_page=2", headers=plain)
+        results["first"] = (r.status, r.headers.get("Content-Encoding"), await r.json(), r.headers["ETag"])
+        etag = r.headers["ETag"]
+        r = await client.get("/jobs?per_page=2", headers=dict(plain, **{"If-None-Match": etag}))
+        results["not_modified"] = (r.status, await r.read())
+        r = await client.get("/jobs?per_page=2", headers={"Accept-Encoding": "gzip"})
+        results["gzip"] = (r.status, r.headers.get("Content-Encoding"), await r.read())
+        r = await client.get("/jobs?per_page=2&page=2", headers=plain)
+        results["page2"] = (r.status, await r.json())
+        for key, query in (("bad_page", "page=abc"), ("bad_per_page", "per_page=x"), ("past_last", "per_page=2&page=3")):
+            r = await client.get(f"/jobs?{query}", headers=plain)
+            results[key] = r.status
+        return results
+    finally:
+        await client.close()
+
+
+def test_jobs_pages_etag_and_gzip(tmp_path):
+    _write(tmp_path / "all_jobs_20261018_0900.json", "2026-10-18T09:00:00", [1, 2])
+    _write(tmp_path / "all_jobs_20261019_0900.json", "2026-10-19T09:00:00", [3, 4, 5])
+    results = asyncio.run(_requests(tmp_path))
+
+    status, encoding, body, etag = results["first"]
+    assert status == 200 and encoding is None
+    assert body["snapshot"] == "all_jobs_20261019_0900" and body["count"] == 3 and body["pages"] == 2
+    assert [j["link"].rsplit("/", 1)[1] for j in body["jobs"]] == ["3", "4"]
+    assert etag.startswith('"all_jobs_20261019_0900-')
+
+    assert results["not_modified"] == (304, b"")  # If-None-Match が一致すれば本文なし
+
+    status, encoding, raw = results["gzip"]
+    assert status == 200 and encoding == "gzip"
+    assert json.loads(gzip.decompress(raw)) == body
+
+    status, page2 = results["page2"]
+    assert status == 200 and [j["link"].rsplit("/", 1)[1] for j in page2["jobs"]] == ["5"]
+
+    assert (results["bad_page"], results["bad_per_page"], results["past_last"]) == (400, 400, 404)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""lancers_rss.py / lancers_detail.py: フィードの解析と、詳細ページを案件自身の要素だけから読む段階的取得"""
+
+import asyncio
+
+from conftest import FIXTURES
+from lancers_detail import parse_detail_page
+from lancers_rss import html_to_text, parse_feed, parse_listing_text
+
+DETAIL_DIR = FIXTURES / "lancers_detail"
+
+
+def _detail(job_id):
+    return parse_detail_page((DETAIL_DIR / f"{job_id}.html").read_text(encoding="utf-8"),
+                             f"https://www.lancers.jp/work/detail/{job_id}")
+
+
+def test_parse_feed_fixture():
+    feed = parse_feed((FIXTURES / "lancers_rss.xml").read_bytes())
+    assert [item["job_id"] for item in feed] == [9900001, 9900002, 9900003, 5423720, 5460267]
+    assert parse_listing_text(feed[0]["description"]) == {
+        "price": "100,000 円 ~ 300,000 円 / 固定", "deadline": "あと5日", "applicant_count": "3", "recruitment_count": "1",
+    }
+
+
+def test_detail_page_ignores_related_and_sidebar_blocks():
+    page = (DETAIL_DIR / "9900002.html").read_text(encoding="utf-8")
+    whole_page = parse_listing_text(html_to_text(page))
+    assert whole_page.get("status") == "募集終了" and whole_page.get("urgency")  # ページ全体を読むと関連案件の値を拾う
+
+    assert _detail(9900002) == {
+        "price": "50,000 円 ~ 100,000 円 / 固定", "applicant_count": "4", "recruitment_count": "1",
+        "deadline": "あと6日", "status": "募集中",
+    }
+    assert _detail(9900003) == {"price": "10,000 円 / 固定", "applicant_count": "12", "status": "募集終了"}
+    assert _detail(5423720) == {"price": "300,000 円 ~ 500,000 円 / 固定", "applicant_count": "2"}
+
+
+def test_fetch_jobs_tiered_with_fixtures(tmp_path, monkeypatch):
+    import fetch_lancers_improved as app
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app, "LANCERS_RSS_URL", str(FIXTURES / "lancers_rss.xml"))
+    monkeypatch.setattr(app, "LANCERS_DETAIL_DIR", str(DETAIL_DIR))
+    monkeypatch.setattr(app, "RSS_STATE_PATH", str(tmp_path / "rss_state.json"))
+
+    notifier = app.CompleteJobsNotifier()
+    jobs = asyncio.run(notifier.fetch_jobs_tiered())
+    assert jobs is not None
+    found = {job.job_id: job for job in notifier.candidate_jobs}
+    assert sorted(found) == [5423720, 5460267, 9900001, 9900002, 9900003]
+
+    # フィードの説明文だけで足りる案件（詳細ページは読まない）
+    assert found[9900001].applicant_count == "3" and found[9900001].urgency is False
+    # 詳細ページの案件自身の値（関連案件の 募集終了・急募・予算は拾わない）
+    assert (found[9900002].applicant_count, found[9900002].status, found[9900002].urgency) == ("4", "募集中", False)
+    assert found[9900002].price == "50,000 円 ~ 100,000 円 / 固定"
+    assert (found[9900003].applicant_count, found[9900003].status) == ("12", "募集終了")
+    assert (found[5423720].applicant_count, found[5423720].status) == ("2", "募集中")
+    # 詳細ページが無い案件はフィードの値のまま
+    assert (found[5460267].price, found[5460267].applicant_count) == ("500,000 円 ~ 1,000,000 円 / 固定", "0")
+
+    notifier.save_feed_state()
+    assert asyncio.run(app.CompleteJobsNotifier().fetch_jobs_tiered()) is None  # 未読が無ければ以降を省略
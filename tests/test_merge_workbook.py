@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""merge_workbook.py: 共有ブックの追加列・記入のある行・他のシート・グラフ・入力規則を残したまま行単位でマージする"""
+
+import zipfile
+
+import openpyxl
+from openpyxl.chart import BarChart, Reference
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from excel_archive import SHEET_HEADER
+from merge_workbook import merge_workbook
+
+
+def _link(job_id):
+    return f"https://www.lancers.jp/work/detail/{job_id}"
+
+
+def _source_row(job_id, price="50,000 円 / 固定"):
+    return ["2026-10-19 09:00", f"案件{job_id}", "システム開発", price, "あと5日", _link(job_id), 100, "🔥Python"]
+
+
+def _write_source(path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "ランサーズ"
+    ws.append(SHEET_HEADER)
+    for row in (_source_row(3), _source_row(1, "80,000 円 / 固定"), _source_row(2)):
+        ws.append(row)
+    wb.save(path)
+
+
+def _write_target(path):
+    """列を並べ替え、担当・メモ列・入力規則・グラフ付きの別シートを足した共有ブック"""
+    header = ["URL", "タイトル", "担当", "取得日時", "カテゴリ", "価格", "締切", "優先度スコア", "スキル概要", "メモ"]
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "ランサーズ"
+    ws.append(header)
+    rows = {1: ("佐藤", None), 2: (None, None), 4: (None, "商談中"), 5: (None, None)}
+    for job_id, (owner, note) in rows.items():
+        source = dict(zip(SHEET_HEADER, _source_row(job_id)))
+        ws.append([source.get(name) for name in header[:2]] + [owner] + [source[name] for name in header[3:9]] + [note])
+        ws.cell(row=ws.max_row, column=1).hyperlink = _link(job_id)
+        ws.cell(row=ws.max_row, column=1).style = "Hyperlink"
+    validation = DataValidation(type="list", formula1='"佐藤,鈴木"')
+    validation.add("C2:C500")
+    ws.add_data_validation(validation)
+
+    summary = wb.create_sheet("集計")
+    for row in (["担当", "件数"], ["佐藤", 3], ["鈴木", 5]):
+        summary.append(row)
+    chart = BarChart()
+    chart.add_data(Reference(summary, min_col=2, min_row=1, max_row=3), titles_from_data=True)
+    summary.add_chart(chart, "D2")
+    wb.save(path)
+
+
+def _sheet_rows(path):
+    ws = openpyxl.load_workbook(path)["ランサーズ"]
+    header = [c.value for c in ws[1]]
+    return header, [dict(zip(header, (c.value for c in row))) for row in ws.iter_rows(min_row=2)], ws
+
+
+def test_merge_keeps_annotations_extra_columns_and_sheets(tmp_path):
+    source, target = tmp_path / "src.xlsx", tmp_path / "shared.xlsx"
+    _write_source(source)
+    _write_target(target)
+    with zipfile.ZipFile(target) as zf:
+        chart_before = {n: zf.read(n) for n in zf.namelist() if n.startswith(("xl/charts/", "xl/drawings/"))}
+
+    result = merge_workbook(source, target)
+    assert (result["inserted"], result["updated"], result["deleted"], result["kept"]) == (1, 1, 1, 1)
+    assert result["cells"] == 1
+
+    header, rows, ws = _sheet_rows(target)
+    assert header == ["URL", "タイトル", "担当", "取得日時", "カテゴリ", "価格", "締切", "優先度スコア", "スキル概要", "メモ"]
+    by_url = {row["URL"]: row for row in rows}
+    assert [row["URL"] for row in rows] == [_link(3), _link(1), _link(2), _link(4)]
+    assert by_url[_link(1)]["価格"] == "80,000 円 / 固定" and by_url[_link(1)]["担当"] == "佐藤"  # 追加列はそのまま
+    assert by_url[_link(4)]["メモ"] == "商談中"   # 一覧から消えても記入があれば残る
+    assert by_url[_link(3)]["タイトル"] == "案件3" and by_url[_link(3)]["担当"] is None
+    for row in range(2, ws.max_row + 1):
+        assert ws.cell(row=row, column=1).hyperlink.target == ws.cell(row=row, column=1).value
+
+    with zipfile.ZipFile(target) as zf:
+        assert {n: zf.read(n) for n in zf.namelist() if n.startswith(("xl/charts/", "xl/drawings/"))} == chart_before
+        assert b"<dataValidation " in zf.read("xl/worksheets/sheet1.xml")
+    assert openpyxl.load_workbook(target)["集計"]["B3"].value == 5
+
+    before = target.read_bytes()
+    assert merge_workbook(source, target)["updated"] == 0
+    assert target.read_bytes() == before  # 変更が無ければ保存しない
+
+    result = merge_workbook(source, target, keep_annotated=False)
+    assert (result["deleted"], result["kept"]) == (1, 0)
+    assert [row["URL"] for row in _sheet_rows(target)[1]] == [_link(3), _link(1), _link(2)]
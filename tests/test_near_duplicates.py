@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""near_duplicates.py: 再掲載（近似重複）の集約と、別案件を集約しないこと"""
+
+from job_model import Job
+from near_duplicates import NearDuplicateIndex, collapse_reposts
+from snapshot_store import SnapshotStore
+
+
+def _job(job_id, title):
+    return Job(title, f"https://www.lancers.jp/work/detail/{job_id}")
+
+
+def test_index_is_cached_and_updated_incrementally(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = SnapshotStore()
+    store.write({"timestamp": "2026-02-18T02:33:00", "jobs": [_job(1, "案件A の開発").to_dict()]},
+                "all_jobs_20260218_0233.json")
+    assert len(NearDuplicateIndex.load_or_build()) == 1
+    store.write({"timestamp": "2026-02-18T03:33:00", "jobs": [_job(2, "ロゴデザインの作成").to_dict()]},
+                "all_jobs_20260218_0333.json")
+    index = NearDuplicateIndex.load_or_build()
+    assert sorted(index.texts) == [1, 2]
+    assert index.indexed_snapshots == {"all_jobs_20260218_0233", "all_jobs_20260218_0333"}
+    assert sorted(NearDuplicateIndex.load().texts) == [1, 2]
+
+
+def test_reposts_in_run_collapse_to_newest():
+    jobs = [
+        _job(5001, "【Python】業務自動化ツールの開発"),
+        _job(5200, "NEW 【Python】業務自動化ツールの開発！"),
+        _job(5100, "2回目 【Python】 業務自動化ツールの開発"),
+        _job(5300, "WordPressサイトのデザイン修正"),
+    ]
+    result = collapse_reposts(jobs)
+    assert [j.job_id for j in result] == [5200, 5300]  # 元の並び順のまま、最新IDだけを残す
+    assert result[0].previous_ids == (5001, 5100)
+    assert result[1].previous_ids == ()
+
+
+def test_distinct_jobs_are_not_merged():
+    jobs = [
+        _job(6001, "【Python】業務自動化ツールの開発"),
+        _job(6002, "【Python】在庫管理システムの開発"),
+        _job(6003, "【PHP】業務自動化ツールの保守"),
+        _job(6004, "限定公開の仕事"),
+        _job(6005, "限定公開の仕事"),  # 非公開案件は共通タイトルなので照合しない
+    ]
+    result = collapse_reposts(jobs)
+    assert [j.job_id for j in result] == [6001, 6002, 6003, 6004, 6005]
+    assert all(j.previous_ids == () for j in result)
+
+
+def test_history_index_records_previous_ids_without_dropping():
+    index = NearDuplicateIndex()
+    index.add(4000, "ChatGPT API を使ったチャットボット開発")
+    index.add(9000, "ChatGPT API を使ったチャットボット開発")  # 今回より新しいIDは過去の掲載ではない
+    jobs = [_job(7000, "NEW ChatGPT APIを使ったチャットボット開発"), _job(7001, "ロゴデザインの作成")]
+    result = collapse_reposts(jobs, index)
+    assert [j.job_id for j in result] == [7000, 7001]
+    assert result[0].previous_ids == (4000,)
+
+
+def test_previous_ids_serialized_only_when_present():
+    job = _job(8000, "ChatGPT API を使ったチャットボット開発")
+    assert "previous_ids" not in job.to_dict()
+    job.previous_ids = (7000,)
+    assert Job.from_dict(job.to_dict()).previous_ids == (7000,)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""probe.py: 条件付きリクエストと案件IDの比較による変更検知と、$GITHUB_OUTPUT 経由での結果の受け渡し"""
+
+import asyncio
+import sys
+
+from aiohttp import web
+
+import probe
+from probe import ProbeResult, probe_listing
+
+
+async def _probe_served(state_path, pages):
+    """
+    pages の (ETag, 案件ID) を1回ずつ順に返すローカルサーバーでプローブを繰り返す。
+    If-None-Match がその回の ETag と一致すれば 304 を返す
+    """
+    requests = []
+
+    async def search(request):
+        etag, job_ids = pages[len(requests)]
+        requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        links = "".join(f'<a href="/work/detail/{i}">案件{i}</a>' for i in job_ids)
+        return web.Response(text=f"<html><body>{links}</body></html>", content_type="text/html", headers={"ETag": etag})
+
+    app = web.Application()
+    app.router.add_get("/work/search/system", search)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        url = f"http://127.0.0.1:{runner.addresses[0][1]}/work/search/system"
+        results = []
+        for _ in pages:
+            result = await probe_listing(url, state_path)
+            result.save(state_path)  # 本体の実行が終わった後の保存と同じ
+            results.append(result)
+        return results, requests
+    finally:
+        await runner.cleanup()
+
+
+def test_probe_listing_against_local_server(tmp_path):
+    pages = [
+        ('"v1"', [101, 102]),          # 初回 → 変更あり
+        ('"v1"', [101, 102]),          # 前回の ETag と一致 → 304
+        ('"v2"', [101, 102]),          # ETag は変わったが案件IDは同じ → 変更なし
+        ('"v3"', [103, 101, 102]),     # 新しい案件ID → 変更あり
+    ]
+    results, requests = asyncio.run(_probe_served(str(tmp_path / "probe_state.json"), pages))
+
+    assert [r.changed for r in results] == [True, False, False, True]
+    assert results[1].reason == "304 Not Modified"
+    assert results[3].reason == "新しい案件ID 1件"
+    assert requests == [None, '"v1"', '"v1"', '"v1"']  # 変更なしの回は状態を保存しない
+    state = probe.load_state(str(tmp_path / "probe_state.json"))
+    assert [(e["etag"], e["job_ids"]) for e in state.values()] == [('"v3"', [103, 101, 102])]
+
+
+def test_result_passes_through_github_output(tmp_path, monkeypatch):
+    entry = {"etag": '"abc"', "last_modified": None, "job_ids": [5423720, 5460267], "checked_at": "2026-10-19T09:00:00"}
+
+    async def fake_probe(url, state_path):
+        return ProbeResult(url, True, "新しい案件ID 2件\n（改行を含む理由）", entry)
+
+    output = tmp_path / "github_output"
+    monkeypatch.setattr(probe, "probe_listing", fake_probe)
+    monkeypatch.setenv("GITHUB_OUTPUT", str(output))
+    monkeypatch.setattr(sys, "argv", ["probe.py", "--url", "https://example.invalid/search"])
+    probe.main()
+
+    lines = dict(line.split("=", 1) for line in output.read_text(encoding="utf-8").splitlines())
+    assert lines["changed"] == "true"
+    passed = ProbeResult.from_json(lines["result"])
+    assert (passed.url, passed.changed, passed.entry) == ("https://example.invalid/search", True, entry)
+
+    passed.save(str(tmp_path / "probe_state.json"))
+    assert probe.load_state(str(tmp_path / "probe_state.json")) == {"https://example.invalid/search": entry}
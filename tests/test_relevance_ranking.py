@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""relevance_ranking.py: 学習済みモデルのキャッシュと、今回分だけの解析で作り直しと同じスコアになること"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from relevance_ranking import HistoryModel, RelevanceRanker, analyze, score_titles  # noqa: E402
+from snapshot_store import SnapshotStore  # noqa: E402
+
+SKILLS = {"超高優先度": ["Python", "AI"], "中優先度": ["WordPress"]}
+HISTORY = [
+    ["【Python】業務自動化ツールの開発", "WordPressサイトの保守", "AIチャットボットの開発"],
+    ["メールマガジンの原稿作成", "Python スクレイピング", "【急募】WordPress テーマの修正"],
+]
+
+
+def _write_history(root, batches):
+    store = SnapshotStore(root / "snapshots")
+    job_id = 1000
+    for i, titles in enumerate(batches):
+        jobs = []
+        for title in titles:
+            job_id += 1
+            jobs.append({"title": title, "link": f"https://www.lancers.jp/work/detail/{job_id}", "priority_score": 0})
+        store.write({"timestamp": f"2026-02-18T0{i}:00:00", "jobs": jobs}, f"all_jobs_20260218_0{i}00.json")
+
+
+def test_ascii_words_do_not_match_inside_other_words():
+    assert {" ai", "ai "} <= set(analyze("AI 開発"))
+    assert not {" ai", "ai "} & set(analyze("mail 配信"))
+
+
+def test_cached_scores_equal_full_refit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_history(tmp_path, HISTORY)
+    titles = ["Pythonでmail配信の自動化", "AI 画像生成", "ロゴ作成"]
+    cache = tmp_path / "model.pkl"
+
+    scored = score_titles(SKILLS, titles, str(cache))
+    assert cache.exists()
+    assert score_titles(SKILLS, titles, str(cache)).tolist() == pytest.approx(scored.tolist())
+
+    corpus = [t for batch in HISTORY for t in batch] + titles
+    expected = RelevanceRanker().fit(corpus).set_profile(SKILLS).score(titles)
+    assert scored.tolist() == pytest.approx(expected.tolist())
+    assert scored[0] > scored[2] and scored[1] > scored[2]
+
+
+def test_history_model_updates_incrementally_and_rebuilds(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_history(tmp_path, HISTORY[:1])
+    cache = str(tmp_path / "model.pkl")
+    assert len(HistoryModel.load_or_build(cache).titles) == 3
+
+    _write_history(tmp_path, HISTORY)  # 2つ目のスナップショットを追加（1つ目は同じ内容で書き直し）
+    model = HistoryModel.load_or_build(cache)
+    assert len(model.titles) == 6 and len(model.snapshots) == 2
+    fresh = RelevanceRanker().fit([t for batch in HISTORY for t in batch])
+    assert model.history_matrix()[2].tolist() == pytest.approx(fresh.transform([t for t, _ in model.titles])[2].tolist())
+
+    (tmp_path / "snapshots" / "manifests" / "all_jobs_20260218_0000.json.gz").unlink()
+    assert len(HistoryModel.load_or_build(cache).titles) == 3  # 取り込み済みのスナップショットが消えたら作り直す
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""revisit_scheduler.py: 再確認の順番（重要度と期限）と、募集中/募集終了は案件自身の状態の要素（と 404/410）だけで決めること"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+from conftest import FIXTURES
+from job_model import Job
+from revisit_scheduler import OpenJobTracker, recheck, revisit_interval
+
+DETAIL_DIR = FIXTURES / "lancers_detail"
+
+
+async def _recheck_served(job_ids):
+    """fixtures/lancers_detail/<案件ID>.html を返すローカルサーバーで再確認する（ファイルが無い案件は 404）"""
+    async def detail(request):
+        path = DETAIL_DIR / f"{request.match_info['job_id']}.html"
+        if not path.exists():
+            raise web.HTTPNotFound()
+        return web.Response(text=path.read_text(encoding="utf-8"), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/work/detail/{job_id}", detail)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        port = runner.addresses[0][1]
+        return await recheck({str(i): f"http://127.0.0.1:{port}/work/detail/{i}" for i in job_ids})
+    finally:
+        await runner.cleanup()
+
+
+def test_recheck_ignores_closed_status_in_related_blocks(tmp_path):
+    page = (DETAIL_DIR / "9900002.html").read_text(encoding="utf-8")
+    assert "募集終了" in page  # 関連案件・サイドバー・説明文にだけある
+
+    results = asyncio.run(_recheck_served([9900002, 9900003, 9900099]))
+    assert results["9900002"]["status"] == "募集中"
+    assert results["9900003"]["status"] == "募集終了"   # 案件自身の状態
+    assert results["9900099"] == {"status": "募集終了"}  # 404
+
+    now = datetime(2026, 10, 19, 9, 0)
+    tracker = OpenJobTracker(str(tmp_path / "open_jobs.json"))
+    tracker.track([Job(f"案件{i}", f"https://www.lancers.jp/work/detail/{i}") for i in (9900002, 9900003, 9900099)],
+                  datetime(2026, 10, 18, 9, 0))
+    for key, fields in results.items():
+        tracker.apply(key, fields, now)
+
+    assert not tracker.is_closed("9900002")
+    assert tracker.is_closed("9900003") and tracker.is_closed("9900099")
+    carried = tracker.open_jobs()
+    assert [job.job_id for job in carried] == [9900002]
+    assert carried[0].applicant_count == "4" and carried[0].urgency is False
+
+
+def _entry(now, score, deadline, applicants, first_seen_days, checked_hours, closed=False):
+    checked = (now - timedelta(hours=checked_hours)).isoformat(timespec="seconds")
+    job = Job("案件", "https://www.lancers.jp/work/detail/1", deadline=deadline, applicant_count=applicants,
+              priority_score=score).to_dict()
+    return {"job": job, "first_seen": (now - timedelta(days=first_seen_days)).isoformat(timespec="seconds"),
+            "last_checked": checked, "checks": 1, "closed_at": checked if closed else None}
+
+
+def test_due_prefers_urgent_high_score_jobs_within_budget(tmp_path):
+    now = datetime(2026, 10, 19, 9, 0)
+    tracker = OpenJobTracker(str(tmp_path / "open_jobs.json"))
+    tracker.entries = {
+        # 高スコア・締切間近・応募少 → 間隔は下限の1時間、3時間経過
+        "hot": _entry(now, 300, "あと1日", "1", first_seen_days=1, checked_hours=3),
+        # 低スコア・応募多・20日前に初出 → 間隔は上限の1週間、10日経過
+        "stale": _entry(now, 0, "あと20日", "25", first_seen_days=20, checked_hours=240),
+        "normal": _entry(now, 100, "あと10日", "5", first_seen_days=2, checked_hours=30),
+        # 高スコアでも確認したばかり（間隔6時間・2時間経過）→ まだ期限前
+        "fresh": _entry(now, 300, "あと10日", "5", first_seen_days=1, checked_hours=2),
+        "closed": _entry(now, 300, "あと1日", "1", first_seen_days=1, checked_hours=48, closed=True),
+    }
+
+    intervals = {key: revisit_interval(entry, now) for key, entry in tracker.entries.items()}
+    assert intervals["hot"] == timedelta(hours=1)
+    assert intervals["stale"] == timedelta(days=7)
+    assert intervals["normal"] == timedelta(hours=24)
+    assert intervals["fresh"] == timedelta(hours=6)
+
+    assert tracker.due(now, budget=2) == ["hot", "normal"]   # 予算内では古いだけの低スコア案件より先
+    assert tracker.due(now, budget=10) == ["hot", "normal", "stale"]  # 期限前・募集終了は選ばない
+    assert tracker.due(now, budget=10, exclude=["hot"]) == ["normal", "stale"]
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""rule_pack.py: 内容ハッシュのキャッシュ・rules.json の再読み込み・検証エラー時は直前のルールのまま"""
+
+import json
+
+import rule_pack
+from conftest import ROOT
+from rule_pack import RuleWatcher, compile_rules
+
+
+def _rules(tmp_path, **changes):
+    data = json.loads((ROOT / "rules.json").read_text(encoding="utf-8"))
+    data.update(changes)
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def _count_compiles(monkeypatch):
+    """検証・コンパイルした回数（キャッシュから返したときは validate を通らない）"""
+    calls = []
+    original = rule_pack.validate
+
+    def counting(data):
+        calls.append(data)
+        return original(data)
+
+    monkeypatch.setattr(rule_pack, "validate", counting)
+    return calls
+
+
+def test_compile_rules_skips_compilation_on_cache_hit(tmp_path, monkeypatch):
+    calls = _count_compiles(monkeypatch)
+    cache = str(tmp_path / ".rule_pack_cache.pkl")
+    raw = _rules(tmp_path).read_bytes()
+
+    first = compile_rules(raw, cache)
+    second = compile_rules(raw, cache)
+    assert len(calls) == 1  # 2回目は内容ハッシュが同じなのでキャッシュから
+    assert second.source_hash == first.source_hash and second.skill_keys == first.skill_keys
+
+    changed = compile_rules(_rules(tmp_path, exclude_keywords=["テスト除外"]).read_bytes(), cache)
+    assert len(calls) == 2 and changed.source_hash != first.source_hash
+    assert changed.exclude_keys == ("テスト除外",)
+
+
+def test_watcher_reloads_and_keeps_rules_on_invalid_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(rule_pack, "RELOAD_CHECK_SEC", 0)
+    path = _rules(tmp_path)
+    watcher = RuleWatcher(str(path), str(tmp_path / ".rule_pack_cache.pkl"))
+    before = watcher.current()
+    assert not before.is_excluded("テスト除外の案件")
+
+    # rules.json が変わったら再起動せずに差し替える
+    _rules(tmp_path, exclude_keywords=["テスト除外"])
+    reloaded = watcher.current()
+    assert reloaded.source_hash != before.source_hash
+    assert reloaded.is_excluded("テスト除外の案件")
+
+    # 検証に通らない内容（未定義の優先度）なら直前のルールのまま
+    _rules(tmp_path, additional_keywords={"Rust": "未定義の優先度"})
+    assert watcher.current() is reloaded
+    path.write_text("{ 壊れた JSON", encoding="utf-8")
+    assert watcher.current() is reloaded
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""run_shards.py: コンパクションは取得時刻の順に反映し、何度実行しても同じ結果（遅れて届いたシャードは履歴だけ）"""
+
+import json
+from pathlib import Path
+
+import openpyxl
+
+import run_shards
+from job_model import Job
+from snapshot_store import list_snapshot_paths, snapshot_name
+
+
+def _job(job_id, price="50,000 円 / 固定"):
+    return Job(f"Python 案件 その{job_id} の開発", f"https://www.lancers.jp/work/detail/{job_id}", price=price).to_dict()
+
+
+def _shard(root, timestamp, run_id, jobs):
+    run_shards.write_shard({"timestamp": timestamp, "run_id": run_id, "jobs": jobs}, str(root))
+
+
+def _sheet(excel):
+    ws = openpyxl.load_workbook(excel)["ランサーズ"]
+    return {row[5].rsplit("/", 1)[1]: row[3] for row in ws.iter_rows(min_row=2, values_only=True)}
+
+
+def _trend_runs(path="skill_trends.json"):
+    weekly = json.loads(Path(path).read_text(encoding="utf-8"))["weekly"]
+    return sum(b["runs"] for b in weekly.values()), sorted(n for b in weekly.values() for n in b["snapshots"])
+
+
+def _state(excel, root):
+    return {"sheet": _sheet(excel), "trends": _trend_runs(), "snapshots": [snapshot_name(p) for p in list_snapshot_paths()],
+            "tracked": sorted(json.loads(Path("open_jobs.json").read_text(encoding="utf-8"))["jobs"]),
+            "latest": run_shards.load_ledger(str(root))["latest"]}
+
+
+def test_compaction_is_ordered_and_idempotent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root, excel = tmp_path / "run_shards", str(tmp_path / "案件情報.xlsx")
+    # 後の実行のシャードが先に届いても、取得時刻の順に反映する
+    _shard(root, "2026-10-19T12:00:00", "r2", [_job(2, "80,000 円 / 固定"), _job(3)])
+    _shard(root, "2026-10-19T10:00:00", "r1", [_job(1), _job(2)])
+
+    assert run_shards.compact(str(root), excel, keep=True) == {"applied": 2, "late": 0, "skipped": 0}
+    state = _state(excel, root)
+    assert state["latest"] == "2026-10-19T12:00:00"
+    assert state["sheet"] == {"2": "80,000 円 / 固定", "3": "50,000 円 / 固定", "1": "50,000 円 / 固定"}  # 1 は募集中の追跡分
+    assert state["trends"] == (2, ["all_jobs_20261019_1000", "all_jobs_20261019_1200"])
+    assert state["snapshots"] == ["all_jobs_20261019_1000", "all_jobs_20261019_1200"]
+
+    # 2回目は反映済みとして読み飛ばし、何も変わらない
+    book = Path(excel).read_bytes()
+    assert run_shards.compact(str(root), excel, keep=True) == {"applied": 0, "late": 0, "skipped": 2}
+    assert Path(excel).read_bytes() == book and _state(excel, root) == state
+
+    # 反映済みの記録が失われても、やり直した結果は同じ（トレンドはスナップショット名で二重に数えない）
+    (root / run_shards.LEDGER_NAME).unlink()
+    assert run_shards.compact(str(root), excel, keep=True)["applied"] == 2
+    assert _state(excel, root) == state
+
+    # 遅れて届いた古いシャードは履歴・トレンドにだけ加え、シートと最新の取得時刻は変えない
+    _shard(root, "2026-10-19T08:00:00", "r0", [_job(9)])
+    assert run_shards.compact(str(root), excel) == {"applied": 0, "late": 1, "skipped": 2}
+    late = _state(excel, root)
+    assert late["sheet"] == state["sheet"] and late["latest"] == state["latest"] and late["tracked"] == state["tracked"]
+    assert late["trends"] == (3, ["all_jobs_20261019_0800"] + state["trends"][1])
+    assert late["snapshots"] == ["all_jobs_20261019_0800"] + state["snapshots"]
+    assert run_shards.list_shards(str(root)) == []  # --keep なしなら反映したシャードは消える
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""selector_resolver.py: キャッシュはプロセスごとの一時ファイル経由で保存し、保存できなくても判定結果は使う"""
+
+import asyncio
+import os
+
+from selector_resolver import SelectorResolver, load_cache, save_cache
+
+CHOSEN = {"job": "a.p-search-job__title", "card": ".p-search-job-media", "price": ".p-search-job-media__price",
+          "deadline": None, "applicant": None, "more": None}
+
+
+class Page:
+    url = "https://www.lancers.jp/work/search/system"
+
+
+def _resolver(cache_path):
+    resolver = SelectorResolver(str(cache_path))
+
+    async def fingerprint(page):
+        return "f" * 16
+
+    async def probe(page):
+        return dict(CHOSEN), {"total_ids": 30}
+
+    resolver.fingerprint = fingerprint
+    resolver.probe = probe
+    return resolver
+
+
+def test_save_cache_uses_per_process_temp_file(tmp_path):
+    path = tmp_path / "selector_cache.json"
+    save_cache({"a": {"probed_at": "2026-10-19T09:00:00"}}, str(path))
+    save_cache({"b": {"probed_at": "2026-10-19T10:00:00"}}, str(path))
+    assert load_cache(str(path)) == {"b": {"probed_at": "2026-10-19T10:00:00"}}
+    assert sorted(os.listdir(tmp_path)) == ["selector_cache.json"]  # 一時ファイルは残らない
+
+
+def test_probed_selectors_survive_failed_save(tmp_path):
+    cache_path = tmp_path / "missing_dir" / "selector_cache.json"  # 保存先のディレクトリが無い
+    resolved = asyncio.run(_resolver(cache_path).resolve(Page()))
+    assert resolved.probed
+    assert resolved.selectors["job"] == CHOSEN["job"] and resolved.selectors["price"] == CHOSEN["price"]
+    assert not cache_path.parent.exists()
+
+    cache_path = tmp_path / "selector_cache.json"
+    asyncio.run(_resolver(cache_path).resolve(Page()))
+    assert load_cache(str(cache_path))["f" * 16]["selectors"] == CHOSEN
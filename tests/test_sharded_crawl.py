@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""sharded_crawl.py: シャードの結果は案件IDで重複排除し、同じ案件はシャード番号の小さい方を採る"""
+
+from sharded_crawl import merge_shard_results
+
+
+class Notifier:
+    """merge_shard_results が使う部分だけ（候補と通知対象をそのまま記録する）"""
+
+    def __init__(self, excluded=()):
+        self.seen_links = set()
+        self.candidate_jobs = []
+        self.excluded = set(excluded)
+
+    def add_candidate(self, job_info, all_jobs):
+        self.candidate_jobs.append(job_info)
+        if job_info.title not in self.excluded:
+            all_jobs.append(job_info)
+
+
+def _job(link, title, price="50,000 円 / 固定"):
+    return {"title": title, "link": link, "price": price}
+
+
+def _result(index, jobs):
+    return {"index": index, "url": f"https://www.lancers.jp/work/search/system?page={index + 1}", "jobs": jobs,
+            "elapsed": 1.0, "pid": 1000 + index, "error": None}
+
+
+def test_merge_dedupes_by_job_id_in_shard_order():
+    detail = "https://www.lancers.jp/work/detail"
+    results = [  # 完了した順（シャード番号順ではない）
+        _result(2, [_job(f"{detail}/3", "案件3 シャード2"), _job(f"{detail}/4", "除外される案件")]),
+        _result(0, [_job(f"{detail}/1", "案件1 シャード0"), _job(f"{detail}/2", "案件2 シャード0", "80,000 円 / 固定")]),
+        _result(1, [_job(f"{detail}/2?ref=search", "案件2 シャード1"), _job(f"{detail}/3", "案件3 シャード1")]),
+    ]
+    notifier = Notifier(excluded={"除外される案件"})
+    all_jobs = merge_shard_results(notifier, results)
+
+    # 同じ案件IDは URL の形が違っても1件。シャード番号の小さい方の内容を採る
+    assert [(j.link, j.title) for j in notifier.candidate_jobs] == [
+        (f"{detail}/1", "案件1 シャード0"), (f"{detail}/2", "案件2 シャード0"),
+        (f"{detail}/3", "案件3 シャード1"), (f"{detail}/4", "除外される案件"),
+    ]
+    assert notifier.candidate_jobs[1].price == "80,000 円 / 固定"
+    assert [j.title for j in all_jobs] == ["案件1 シャード0", "案件2 シャード0", "案件3 シャード1"]
+    assert notifier.seen_links == {f"{detail}/{i}" for i in (1, 2, 3, 4)}
+
+    assert merge_shard_results(Notifier(), []) == []
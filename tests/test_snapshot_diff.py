@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""snapshot_diff.py: 2回の実行の 新規 / 消えた / 内容が変わった 案件と、インデックスのキャッシュ"""
+
+import json
+
+from snapshot_diff import diff_columns, field_changes, load_columns
+
+
+def _job(job_id, scraped_at, price="50,000 円 / 固定", applicants="3"):
+    return {"title": f"案件{job_id}", "link": f"https://www.lancers.jp/work/detail/{job_id}", "price": price,
+            "deadline": "あと5日", "applicant_count": applicants, "status": "募集中", "priority_score": 100,
+            "scraped_at": scraped_at}
+
+
+def _write(path, timestamp, jobs):
+    path.write_text(json.dumps({"timestamp": timestamp, "jobs": jobs}, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def test_diff_reports_new_gone_and_changed(tmp_path):
+    old = _write(tmp_path / "all_jobs_20261018_0900.json", "2026-10-18T09:00:00", [
+        _job(30, "2026-10-18T09:00:01"), _job(10, "2026-10-18T09:00:02"), _job(20, "2026-10-18T09:00:03"),
+        _job(40, "2026-10-18T09:00:04"),
+    ])
+    new = _write(tmp_path / "all_jobs_20261019_0900.json", "2026-10-19T09:00:00", [
+        _job(50, "2026-10-19T09:00:01"),                                   # 新規
+        _job(20, "2026-10-19T09:00:02"),                                   # 取得時刻だけ違う → 変更なし
+        _job(30, "2026-10-19T09:00:03", price="80,000 円 / 固定"),          # 価格が変わった
+        _job(40, "2026-10-19T09:00:04", applicants="7"),                   # 応募数が変わった
+        _job(40, "2026-10-19T09:00:05", applicants="99"),                  # 同じIDの2件目は無視
+    ])
+    index = tmp_path / "index.pkl"
+
+    (before, after), built = load_columns([old, new], str(index), workers=1)
+    assert built == 2 and list(after.ids) == [20, 30, 40, 50]
+    d = diff_columns(before, after)
+    assert (d["new"], d["removed"], d["changed"]) == ([50], [10], [30, 40])
+
+    changes = field_changes(old, new, d["changed"])
+    assert changes[30]["fields"] == {"price": ("50,000 円 / 固定", "80,000 円 / 固定")}
+    assert changes[40]["fields"] == {"applicant_count": ("3", "7")}
+
+    assert diff_columns(after, before) == {"new": [10], "removed": [50], "changed": [30, 40]}
+    assert diff_columns(after, after) == {"new": [], "removed": [], "changed": []}
+
+    (cached_before, cached_after), built = load_columns([old, new], str(index), workers=1)
+    assert built == 0  # 2回目はインデックスから
+    assert diff_columns(cached_before, cached_after) == d
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""snapshot_store.py: 重複排除・圧縮した保存と、従来形式へのバイト単位で同一な復元"""
+
+import json
+import sys
+
+import snapshot_store
+from snapshot_store import SnapshotStore, iter_snapshot_jobs, list_snapshot_paths, load_snapshot
+
+
+def _job(job_id, title, scraped_at, applicants="3"):
+    return {
+        "title": title, "link": f"https://www.lancers.jp/work/detail/{job_id}",
+        "price": "50,000 円 ~ 100,000 円 / 固定", "deadline": "あと5日", "applicant_count": applicants,
+        "recruitment_count": "1", "client_name": "", "status": "募集中", "urgency": False,
+        "category": "システム開発", "skill_matches": [{"skill": "Python", "priority": "超高優先度"}],
+        "skill_count": 1, "priority_score": 130, "scraped_at": scraped_at,
+    }
+
+
+def _snapshot(timestamp, jobs):
+    return {"timestamp": timestamp, "count": len(jobs), "type": "全案件リスト",
+            "skill_summary": {"Python": len(jobs)}, "skill_distribution": {"total_jobs": len(jobs)}, "jobs": jobs}
+
+
+def _write_legacy(path, data):
+    # save_data（SNAPSHOT_FORMAT=json）と同じ書き方
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def test_export_is_byte_identical(tmp_path, monkeypatch):
+    source = tmp_path / "all_jobs_20260218_0233.json"
+    _write_legacy(source, _snapshot("2026-02-18T02:33:00", [
+        _job(1, "【Python】業務自動化ツールの開発", "2026-02-18T02:33:01"),
+        _job(2, "ChatGPT API を使ったチャットボット開発", "2026-02-18T02:33:02", applicants="不明"),
+    ]))
+    root = tmp_path / "snapshots"
+    SnapshotStore(root).write(load_snapshot(source), source.name)
+
+    exported = tmp_path / "exported.json"
+    monkeypatch.setattr(sys, "argv", ["snapshot_store.py", "--root", str(root), "export",
+                                      "all_jobs_20260218_0233", "-o", str(exported)])
+    snapshot_store.main()
+    assert exported.read_bytes() == source.read_bytes()
+
+
+def test_identical_jobs_share_one_object(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots")
+    first = _snapshot("2026-02-18T02:33:00", [_job(1, "案件A の開発", "2026-02-18T02:33:01"),
+                                              _job(2, "案件B の開発", "2026-02-18T02:33:02")])
+    # 同じ案件を別の時刻に観測（scraped_at だけが違う）＋ 応募数が変わった案件
+    second = _snapshot("2026-02-18T03:33:00", [_job(1, "案件A の開発", "2026-02-18T03:33:01"),
+                                               _job(2, "案件B の開発", "2026-02-18T03:33:02", applicants="5")])
+    store.write(first, "all_jobs_20260218_0233.json")
+    store.write(second, "all_jobs_20260218_0333.json")
+
+    assert len(list(store.objects.rglob("*.json.gz"))) == 3
+    assert store.read("all_jobs_20260218_0233") == first
+    assert store.read("all_jobs_20260218_0333") == second
+
+
+def test_readers_accept_both_formats(tmp_path):
+    legacy = _snapshot("2026-02-18T02:33:00", [_job(1, "案件A の開発", "2026-02-18T02:33:01")])
+    stored = _snapshot("2026-02-18T03:33:00", [_job(2, "案件B の開発", "2026-02-18T03:33:02")])
+    _write_legacy(tmp_path / "all_jobs_20260218_0233.json", legacy)
+    _write_legacy(tmp_path / "all_jobs_20260218_0333.json", stored)
+    SnapshotStore(tmp_path / "snapshots").write(stored, "all_jobs_20260218_0333.json")
+
+    paths = list_snapshot_paths(tmp_path)
+    assert [p.name for p in paths] == ["all_jobs_20260218_0233.json", "all_jobs_20260218_0333.json.gz"]  # 同名はストア優先
+    assert list(iter_snapshot_jobs(paths[0])) == legacy["jobs"]
+    assert list(iter_snapshot_jobs(paths[1])) == stored["jobs"]
+    assert load_snapshot(paths[1]) == stored
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""xlsx_stream.py: EXCEL_WRITER=stream の更新・クリーニングが openpyxl で作り直した場合と同じ行・リンク・アーカイブになる"""
+
+import json
+import shutil
+import zipfile
+from datetime import datetime
+
+import openpyxl
+
+import fetch_lancers_improved as app
+import xlsx_stream
+from excel_archive import SHEET_HEADER
+from job_model import Job, SkillMatch
+from xlsx_stream import read_rows, upsert_rows
+
+NOW = datetime(2026, 10, 19, 9, 0)
+TITLES = {1: "Python による業務自動化ツール開発", 2: "ChatGPT API 連携の社内ボット", 3: "Django 管理画面の改修",
+          4: "Next.js でコーポレートサイト制作", 5: "機械学習モデルの API 化と運用", 6: "Excel VBA マクロの修正"}
+
+
+def _job(job_id, price="50,000 円 / 固定", deadline="あと5日"):
+    return Job(TITLES[job_id], f"https://www.lancers.jp/work/detail/{job_id}", price=price, deadline=deadline,
+               priority_score=100 + job_id, skill_matches=[SkillMatch.of("Python", "超高優先度")])
+
+
+def _seed(path):
+    """前回の実行で書いたブックに、重複・30日超・募集終了の行を足したもの"""
+    app.replace_lancers_sheet({"jobs": [_job(1), _job(2), _job(3), _job(4)]}, str(path), datetime(2026, 10, 18, 9, 0))
+    wb = openpyxl.load_workbook(path)
+    ws = wb["ランサーズ"]
+    link = "https://www.lancers.jp/work/detail/"
+    ws.append(["2026-10-17 09:00:00", TITLES[2], "システム開発", "40,000 円 / 固定", "あと6日", f"{link}2", 102, "🔥Python"])
+    ws.append(["2026-09-01 09:00:00", TITLES[6], "システム開発", "30,000 円 / 固定", "あと3日", f"{link}6", 106, "🔥Python"])
+    ws.append(["2026-10-18 09:00:00", "募集が終わった案件のタイトル", "システム開発", "", "募集終了", f"{link}7", 100, ""])
+    for row in range(6, ws.max_row + 1):
+        ws.cell(row=row, column=6).hyperlink = ws.cell(row=row, column=6).value
+    wb.save(path)
+
+
+def _run(path, writer, monkeypatch):
+    monkeypatch.setattr(app, "EXCEL_WRITER", writer)
+    app.replace_lancers_sheet({"jobs": [_job(5), _job(2, price="80,000 円 / 固定"), _job(3)]}, str(path), NOW)
+    app.clean_excel_data(str(path), NOW)
+
+
+def _sheet(path):
+    ws = openpyxl.load_workbook(path)["ランサーズ"]
+    rows = [[c.value for c in row] for row in ws.iter_rows(min_row=2)]
+    links = [ws.cell(row=r, column=6).hyperlink.target if ws.cell(row=r, column=6).hyperlink else None
+             for r in range(2, ws.max_row + 1)]
+    return [c.value for c in ws[1]], rows, links
+
+
+def _archive(path):
+    """待機中の行（JSON Lines）と、書き出し済みの月別ブックの行"""
+    archive = app.ExcelArchive(str(path))
+    pending = sorted(line for f in sorted(archive.dir.glob("pending_*.jsonl"))
+                     for line in f.read_text(encoding="utf-8").splitlines())
+    months = {f.name: [[c.value for c in row] for row in openpyxl.load_workbook(f).active.iter_rows()]
+              for f in archive.month_files()}
+    return pending, months
+
+
+def test_stream_writer_matches_openpyxl(tmp_path, monkeypatch):
+    (tmp_path / "openpyxl").mkdir()
+    (tmp_path / "stream").mkdir()
+    base = tmp_path / "openpyxl" / "案件情報.xlsx"
+    monkeypatch.setattr(app, "EXCEL_WRITER", "openpyxl")
+    _seed(base)
+    stream = tmp_path / "stream" / "案件情報.xlsx"
+    shutil.copyfile(base, stream)
+
+    _run(base, "openpyxl", monkeypatch)
+    _run(stream, "stream", monkeypatch)
+
+    header, expected, expected_links = _sheet(base)
+    stream_header, actual, actual_links = _sheet(stream)
+    assert stream_header == header
+    # openpyxl はシートを作り直して取得日時の順に並べ、stream は既存の並びを保つので、行の内容は URL で突き合わせる
+    assert sorted(actual, key=lambda r: r[5]) == sorted(expected, key=lambda r: r[5])
+    assert [r[5] for r in actual] == actual_links and [r[5] for r in expected] == expected_links
+    assert sorted(r[5].rsplit("/", 1)[1] for r in actual) == ["2", "3", "5"]
+    pending, months = _archive(stream)
+    assert (pending, months) == _archive(base)
+    assert sorted(json.loads(line)["url"].rsplit("/", 1)[1] for line in pending) == ["1", "4", "7"]
+    assert list(months) == ["案件情報_2026-09.xlsx"]  # 30日超の行は月別ブックへ
+
+    # 読み取り: openpyxl で読んだ行と同じ
+    assert read_rows(stream) == app._sheet_rows(openpyxl.load_workbook(stream)["ランサーズ"])
+
+
+def _book(path, existing):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "ランサーズ"
+    ws.append(SHEET_HEADER)
+    for row in existing:
+        ws.append(row)
+        ws.cell(row=ws.max_row, column=6).hyperlink = row[5]
+    wb.create_sheet("統計").append(["timestamp", "count"])
+    wb.save(path)
+
+
+def test_upsert_rows_matches_openpyxl_edit(tmp_path):
+    path = tmp_path / "book.xlsx"
+    existing = [["2026-10-19 09:00:00", TITLES[i], "システム開発", "10,000 円 / 固定", "あと5日",
+                 f"https://www.lancers.jp/work/detail/{i}", i, "🔥Python"] for i in (1, 2, 3)]
+    _book(path, existing)
+
+    replaced = list(existing[1])
+    replaced[3] = "99,000 円 / 固定"
+    added = list(existing[0])
+    added[5], added[1] = "https://www.lancers.jp/work/detail/4", TITLES[4]
+    result = upsert_rows(path, [replaced, added], remove_urls=[existing[2][5]])
+    assert result == {"inserted": 1, "replaced": 1, "deleted": 1}
+
+    rows = [[c.value for c in row] for row in openpyxl.load_workbook(path)["ランサーズ"].iter_rows(min_row=2)]
+    assert rows == [added, existing[0], replaced]
+    assert openpyxl.load_workbook(path)["統計"]["A1"].value == "timestamp"
+
+
+def test_upsert_rows_streams_rels_in_small_chunks(tmp_path, monkeypatch):
+    # シートと .rels を '>' の位置で細かく区切っても、リレーションシップの削除・追加が崩れない
+    monkeypatch.setattr(xlsx_stream, "CHUNK_SIZE", 64)
+    path = tmp_path / "book.xlsx"
+    existing = [["2026-10-19 09:00:00", f"案件 {i}", "システム開発", "10,000 円 / 固定", "あと5日",
+                 f"https://www.lancers.jp/work/detail/{i}?q=a&b={i}", i, ""] for i in range(1, 41)]
+    _book(path, existing)
+    added = list(existing[0])
+    added[5] = "https://www.lancers.jp/work/detail/99?q=a&b=99"
+    assert upsert_rows(path, [added], remove_urls=[r[5] for r in existing[::2]]) == {
+        "inserted": 1, "replaced": 0, "deleted": 20}
+
+    ws = openpyxl.load_workbook(path)["ランサーズ"]
+    urls = [ws.cell(row=r, column=6).value for r in range(2, ws.max_row + 1)]
+    assert urls == [added[5]] + [r[5] for r in existing[1::2]]
+    assert [ws.cell(row=r, column=6).hyperlink.target for r in range(2, ws.max_row + 1)] == urls
+    with zipfile.ZipFile(path) as zf:
+        rels = zf.read("xl/worksheets/_rels/sheet1.xml.rels").decode("utf-8")
+    assert rels.count("<Relationship ") == 21
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+タイトル・価格表記の正規化（共通層）
+
+取得時のタイトル整形（NFKC・空白・NEW/n回目 の接頭辞）と小文字化を1か所にまとめ、
+同じ文字列は1回だけ処理します（上限付きLRUでメモ化）。
+normalize() が返す NormalizedText を、スキル判定・スコア計算・除外判定・再掲載照合が共有します。
+- lower    : 小文字化したタイトル（キーワードの部分一致用）
+- matching : 記号・空白・再掲載の接頭辞を除いた照合キー（near_duplicates.py 用。初回参照時に計算）
+
+使い方:
+    python text_normalize.py --bench     # 過去タイトルでの処理時間（従来の処理との比較）
+"""
+
+import argparse
+import re
+import time
+import unicodedata
+from functools import lru_cache
+
+NORMALIZE_CACHE_SIZE = 8192  # 過去の全タイトル（数千件）が収まる大きさ
+
+_WHITESPACE = re.compile(r"\s+")
+_NEW_PREFIX = re.compile(r"^(NEW\s*){1,}", re.IGNORECASE)
+_ROUND_PREFIX = re.compile(r"^\d+回目\s*")
+_PRICE_SLASH = re.compile(r"円\s*/\s*")
+_REPOST_PREFIX = re.compile(r"^(new\s*)+|^\d+回目\s*")
+_NOISE = re.compile(r"[\s\W_]+")
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def clean_title(raw: str) -> str:
+    """カードのテキストから表示用タイトルを作る"""
+    if not raw:
+        return ""
+    title = unicodedata.normalize("NFKC", raw)
+    title = _WHITESPACE.sub(" ", title.strip())
+    title = _NEW_PREFIX.sub("", title)
+    title = _ROUND_PREFIX.sub("", title)
+    return title.strip()
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def clean_price_text(raw: str) -> str:
+    if not raw:
+        return "価格情報なし"
+    price = unicodedata.normalize("NFKC", raw)
+    price = _WHITESPACE.sub(" ", price.strip())
+    return _PRICE_SLASH.sub("円 / ", price)
+
+
+def matching_key(text: str) -> str:
+    """NFKC・小文字化し、再掲載を示す接頭辞・記号・空白を除く"""
+    text = unicodedata.normalize("NFKC", text or "").lower().strip()
+    text = _REPOST_PREFIX.sub("", text)
+    return _NOISE.sub("", text)
+
+
+class NormalizedText:
+    """1つのタイトルから派生する文字列（各判定で共有する）"""
+    __slots__ = ("text", "lower", "_matching")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self._matching = None
+
+    @property
+    def matching(self) -> str:
+        if self._matching is None:
+            self._matching = matching_key(self.text)
+        return self._matching
+
+    def __repr__(self):
+        return f"NormalizedText({self.text!r})"
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize(text: str) -> NormalizedText:
+    return NormalizedText(text or "")
+
+
+def cache_info() -> dict:
+    return {f.__name__: f.cache_info() for f in (clean_title, clean_price_text, normalize)}
+
+
+def clear_caches():
+    for f in (clean_title, clean_price_text, normalize):
+        f.cache_clear()
+
+
+# =============================
+# ベンチマーク
+# =============================
+def _legacy_pipeline(raw: str, skill_keys, exclude_keys, bonus_keys):
+    """整理前の処理（関数ごとに import・未コンパイルの正規表現・小文字化）"""
+    import unicodedata as ud
+    title = ud.normalize("NFKC", raw)
+    title = re.sub(r"\s+", " ", title.strip())
+    title = re.sub(r"^(NEW\s*){1,}", "", title, flags=re.IGNORECASE)
+    title = re.sub(r"^\d+回目\s*", "", title).strip()
+    hits = [k for k in skill_keys if k.lower() in title.lower()]
+    score = sum(1 for k in bonus_keys if k in title.lower())
+    excluded = any(k.lower() in title.lower() for k in exclude_keys)
+    return hits, score, excluded
+
+
+def _shared_pipeline(raw: str, skill_keys, exclude_keys, bonus_keys):
+    norm = normalize(clean_title(raw))
+    lower = norm.lower
+    hits = [k for k in skill_keys if k in lower]
+    score = sum(1 for k in bonus_keys if k in lower)
+    excluded = any(k in lower for k in exclude_keys)
+    return hits, score, excluded
+
+
+def bench(rounds: int = 5):
+    import fetch_lancers_improved as app
+    from snapshot_store import iter_snapshot_jobs, list_snapshot_paths
+
+    titles = [job.get("title", "") for path in list_snapshot_paths() for job in iter_snapshot_jobs(path)]
+    skills = [k for keywords in app.COMPANY_SKILLS.values() for k in keywords] + list(app.ADDITIONAL_KEYWORDS)
+    legacy_args = (skills, app.EXCLUDE_KEYWORDS, list(app.PRIORITY_KEYWORD_BONUS))
+    shared_args = ([k.lower() for k in skills], [k.lower() for k in app.EXCLUDE_KEYWORDS],
+                   list(app.PRIORITY_KEYWORD_BONUS))
+    print(f"📚 過去タイトル {len(titles)}件（異なり {len(set(titles))}件）× {rounds}回")
+
+    def timed(fn, args):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for title in titles:
+                fn(title, *args)
+        return (time.perf_counter() - started) / (rounds * len(titles)) * 1e6
+
+    legacy = timed(_legacy_pipeline, legacy_args)
+    clear_caches()
+    distinct = list(dict.fromkeys(titles))
+    started = time.perf_counter()
+    for title in distinct:
+        _shared_pipeline(title, *shared_args)
+    cold = (time.perf_counter() - started) / len(distinct) * 1e6
+    warm = timed(_shared_pipeline, shared_args)
+    mismatches = sum(1 for t in titles if _legacy_pipeline(t, *legacy_args)[0] != [
+        k for k in skills if k.lower() in normalize(clean_title(t)).lower])
+    print(f"⏱️ 従来の処理           : {legacy:6.2f}µs/件")
+    print(f"⏱️ 共通層（初出の文字列）: {cold:6.2f}µs/件")
+    print(f"⏱️ 共通層（全件）       : {warm:6.2f}µs/件（{legacy / warm:.1f}倍）")
+    print(f"🔎 スキル判定の不一致: {mismatches}件")
+    for name, info in cache_info().items():
+        print(f"   {name}: hits={info.hits} misses={info.misses} size={info.currsize}/{info.maxsize}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="タイトル正規化の共通層")
+    parser.add_argument("--bench", action="store_true", help="過去タイトルで処理時間を計測")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.rounds)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()